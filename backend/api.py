@@ -2,17 +2,54 @@
 Happy Pastures Creamery - Unified API
 Simple, pragmatic backend for the mobile/web app
 """
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, Literal, Union
+import asyncio
+import hmac
+import logging
+import math
 import os
+import re
+import time
 
 from geoapify_client import GeoapifyClient
 from google_places_client import GooglePlacesClient
-from sales_pitch_generator import SalesPitchGenerator
-from config import GEOAPIFY_API_KEY, ANTHROPIC_API_KEY, GOOGLE_PLACES_API_KEY
+from sales_pitch_generator import SalesPitchGenerator, build_full_pitch_text
+from pitch_cache import PersonaVariantCache, MicroRefinementCache, PitchUpgrades
+from local_pitch_engine import build_local_pitch
+from cheese_matching import cheese_scorer
+from cheese_products import get_cheese_by_id
+from prompts import get_prompt, version_of, prompt_versions
+from model_router import router as model_router
+from llm_client import hedging
+from place_store import PlaceStore
+from cost_ledger import ledger, start_request, end_request, BudgetExceededError
+from telemetry import metrics, span, start_trace, end_trace, current_trace, record_request
+from profiling import profiler, memory_snapshots, PROFILE_FORMATS, ProfilerBusyError
+from circuit_breaker import breakers, CircuitOpenError
+from structured_logging import configure_logging, new_request_id, bind_request_id, reset_request_id
+from config import (
+    GEOAPIFY_API_KEY, ANTHROPIC_API_KEY, GOOGLE_PLACES_API_KEY,
+    GOOGLE_BULK_MAX_CONCURRENCY, GOOGLE_ENRICH_BUDGET_USD, PLACE_STORE_PATH,
+    DAILY_COST_BUDGET_USD, REQUEST_COST_BUDGET_USD,
+    PERSONA_PRERENDER_ENABLED, PERSONA_PRERENDER_CONCURRENCY,
+    PITCH_LLM_DEADLINE_SECONDS, PITCH_UPGRADE_CONCURRENCY, PITCH_CACHE_MAX_AGE_HOURS,
+    MODEL_ROUTING_ADAPTIVE, LLM_HEDGING_ENABLED, LLM_HEDGE_BUDGET_RATIO, LLM_HEDGE_OPERATIONS,
+    CIRCUIT_BREAKERS_ENABLED, CIRCUIT_FAILURE_RATE, CIRCUIT_OPEN_SECONDS, CIRCUIT_WINDOW_SECONDS, CIRCUIT_MIN_CALLS,
+    ADMIN_TOKEN, PROFILE_SAMPLE_INTERVAL_MS, PROFILE_MAX_SECONDS, MEMORY_TRACE_FRAMES,
+    LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE, LOG_QUEUE_SIZE
+)
+
+# Structured logs, written off the request path
+configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, debug_sample_rate=LOG_DEBUG_SAMPLE_RATE, queue_size=LOG_QUEUE_SIZE)
+logger = logging.getLogger(__name__)
+
+# Accepted client-supplied request ids
+_REQUEST_ID = re.compile(r"[A-Za-z0-9._\-]{1,64}")
 
 # Initialize FastAPI
 app = FastAPI(
@@ -30,6 +67,150 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Persistent Geoapify -> Google place id mapping (shared by all requests)
+place_store = PlaceStore(PLACE_STORE_PATH)
+
+# Persona variants rendered in the background after each pitch
+persona_cache = PersonaVariantCache(max_concurrency=PERSONA_PRERENDER_CONCURRENCY)
+
+# Micro-refinements already made, and the version chains they form
+micro_cache = MicroRefinementCache()
+
+# Claude pitches still generating behind an instant local pitch
+pitch_upgrades = PitchUpgrades(max_concurrency=PITCH_UPGRADE_CONCURRENCY)
+
+# Cost ledger budget caps
+ledger.configure(daily_budget_usd=DAILY_COST_BUDGET_USD, request_budget_usd=REQUEST_COST_BUDGET_USD)
+
+# Claude model per operation (latency SLO + quality tier)
+model_router.configure(adaptive=MODEL_ROUTING_ADAPTIVE)
+hedging.configure(
+    enabled=LLM_HEDGING_ENABLED,
+    budget_ratio=LLM_HEDGE_BUDGET_RATIO,
+    operations=LLM_HEDGE_OPERATIONS
+)
+
+# Fail fast (and degrade) while an upstream keeps failing or timing out
+breakers.configure(
+    enabled=CIRCUIT_BREAKERS_ENABLED,
+    window_seconds=CIRCUIT_WINDOW_SECONDS,
+    min_calls=CIRCUIT_MIN_CALLS,
+    failure_rate=CIRCUIT_FAILURE_RATE,
+    open_seconds=CIRCUIT_OPEN_SECONDS
+)
+
+# Admin-only CPU / memory profiling
+profiler.configure(interval_ms=PROFILE_SAMPLE_INTERVAL_MS, max_seconds=PROFILE_MAX_SECONDS)
+memory_snapshots.frames = MEMORY_TRACE_FRAMES
+
+
+def is_admin(request: Request) -> bool:
+    """Whether the request carries the admin token (never, if none is configured)"""
+    token = request.headers.get('x-admin-token')
+    return bool(ADMIN_TOKEN and token) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def require_admin(request: Request) -> None:
+    """
+    Raises:
+        HTTPException: 404 if admin tools are disabled, 403 without the right token
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.middleware("http")
+async def attribute_costs(request: Request, call_next):
+    """Attribute outbound API spend to the endpoint being served"""
+    token = start_request(request.url.path)
+    try:
+        return await call_next(request)
+    finally:
+        end_request(token)
+
+
+@app.middleware("http")
+async def time_request(request: Request, call_next):
+    """Server-Timing header with the request's stage spans, plus request metrics"""
+    token = start_trace()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers['Server-Timing'] = current_trace().server_timing(
+            total_ms=(time.perf_counter() - start) * 1000
+        )
+        return response
+    finally:
+        # Route template, so /api/pitch/upgrade/{token} is one series
+        route = getattr(request.scope.get('route'), 'path', 'unmatched')
+        record_request(route, request.method, status, time.perf_counter() - start)
+        end_trace(token)
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Admin-only: `?profile=collapsed|speedscope` (or an `X-Profile` header)
+    samples the request's stacks and returns the profile instead of its body
+    """
+    fmt = request.query_params.get('profile') or request.headers.get('x-profile')
+    if not fmt or not is_admin(request):
+        return await call_next(request)
+    if fmt not in PROFILE_FORMATS:
+        return JSONResponse(status_code=400, content={
+            'detail': f"profile must be one of: {', '.join(PROFILE_FORMATS)}"
+        })
+
+    try:
+        sampler = profiler.start()
+    except ProfilerBusyError as e:
+        return JSONResponse(status_code=409, content={'detail': str(e)})
+    try:
+        response = await call_next(request)
+        # Drain the body so streamed responses are profiled to the end
+        async for _ in response.body_iterator:
+            pass
+    finally:
+        profile = profiler.stop(sampler, label=f"{request.method} {request.url.path}")
+
+    body, media_type = profile.render(fmt)
+    headers = {
+        'X-Profile-Status': str(response.status_code),
+        'X-Profile-Duration-Ms': f"{profile.duration_ms:.1f}",
+        'X-Profile-Samples': f"{profile.samples - profile.idle_samples}/{profile.samples}",
+    }
+    if 'server-timing' in response.headers:
+        headers['Server-Timing'] = response.headers['server-timing']
+    return PlainTextResponse(body, media_type=media_type, headers=headers)
+
+
+@app.middleware("http")
+async def tag_request(request: Request, call_next):
+    """Request id on every log record of the request (the client's X-Request-ID if sane), echoed back"""
+    request_id = request.headers.get('x-request-id', '')
+    if not _REQUEST_ID.fullmatch(request_id):
+        request_id = new_request_id()
+    token = bind_request_id(request_id)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+        response.headers['X-Request-ID'] = request_id
+        logger.info("%s %s %d", request.method, request.url.path, response.status_code, extra={
+            'endpoint': request.url.path,
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 1),
+        })
+        return response
+    except Exception:
+        logger.exception("Unhandled error in %s %s", request.method, request.url.path)
+        raise
+    finally:
+        reset_request_id(token)
+
 # Mount static files (for serving the frontend)
 static_dir = os.path.join(os.path.dirname(__file__), "..", "frontend")
 if os.path.exists(static_dir):
@@ -47,6 +228,7 @@ class RestaurantProspect(BaseModel):
     phone: Optional[str] = None
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    place_id: Optional[str] = None  # Geoapify place id (pass back to /api/pitch)
 
     # Sales pitch data
     recommended_cheese_id: str
@@ -69,6 +251,90 @@ class ProspectsResponse(BaseModel):
     search_radius_km: float
 
 
+class ProjectedProspectsResponse(BaseModel):
+    """Prospects cut down to the `fields=` projection"""
+    prospects: List[Dict[str, Any]]  # Only the requested RestaurantProspect fields
+    total: int
+    search_center: dict
+    search_radius_km: float
+
+
+class ColumnarProspectsResponse(BaseModel):
+    """Prospects as one array per field (`format=columnar`)"""
+    format: Literal['columnar']
+    fields: List[str]
+    columns: Dict[str, List[Any]]  # field -> value per prospect, in prospect order
+    total: int
+    search_center: dict
+    search_radius_km: float
+
+
+PROSPECT_FIELDS = list(RestaurantProspect.model_fields.keys())
+
+
+def parse_prospect_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields=` projection into a list of field names
+
+    Args:
+        fields: Raw query value, e.g. "name,distance_km,latitude"
+
+    Returns:
+        Ordered, de-duplicated field list, or None if no projection requested
+
+    Raises:
+        HTTPException: 400 if any field is not a RestaurantProspect field
+    """
+    if not fields:
+        return None
+
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    unknown = [f for f in requested if f not in PROSPECT_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Valid fields: {', '.join(PROSPECT_FIELDS)}"
+        )
+
+    return requested or None
+
+
+def shape_prospects(
+    prospects: List[RestaurantProspect],
+    fields: Optional[List[str]],
+    response_format: str
+) -> Dict[str, Any]:
+    """
+    Project prospects to the requested fields and layout
+
+    Args:
+        prospects: Full prospect models
+        fields: Fields to keep (None = all fields)
+        response_format: 'objects' for a list of dicts, 'columnar' for parallel arrays
+
+    Returns:
+        Dict with either a 'prospects' list or a 'columns' mapping
+    """
+    columns = fields or PROSPECT_FIELDS
+
+    if response_format == 'columnar':
+        return {
+            "format": "columnar",
+            "fields": columns,
+            "columns": {
+                field: [getattr(p, field) for p in prospects]
+                for field in columns
+            }
+        }
+
+    return {
+        "prospects": [
+            {field: getattr(p, field) for field in columns}
+            for p in prospects
+        ]
+    }
+
+
 @app.get("/")
 async def root():
     """API root"""
@@ -79,6 +345,10 @@ async def root():
         "endpoints": {
             "prospects": "/api/prospects?lat=X&lon=Y",
             "pitch": "/api/pitch?name=RestaurantName&lat=X&lon=Y",
+            "bulk_enrich": "POST /api/enrich/bulk",
+            "review_search": "/api/reviews/search?q=burgers+or+charcuterie&lat=X&lon=Y",
+            "costs": "/api/metrics/costs",
+            "models": "/api/metrics/models",
             "health": "/health"
         }
     }
@@ -90,12 +360,27 @@ async def health():
     return {"status": "healthy"}
 
 
-@app.get("/api/prospects", response_model=ProspectsResponse)
+# One of three JSON shapes depending on fields= and format=; the models document them
+@app.get(
+    "/api/prospects",
+    response_class=JSONResponse,
+    responses={200: {
+        "model": Union[ProspectsResponse, ProjectedProspectsResponse, ColumnarProspectsResponse],
+        "description": "Full prospects by default, projected with `fields=`, columnar with `format=columnar`"
+    }}
+)
 async def get_prospects(
     lat: float = Query(..., description="Latitude"),
     lon: float = Query(..., description="Longitude"),
     radius: int = Query(2500, description="Search radius in meters", ge=100, le=5000),
-    limit: int = Query(20, description="Max results", ge=5, le=50)
+    limit: int = Query(20, description="Max results", ge=5, le=50),
+    fields: Optional[str] = Query(None, description="Comma-separated prospect fields to return (default: all)"),
+    response_format: str = Query(
+        "objects",
+        alias="format",
+        description="'objects' (list of prospects) or 'columnar' (parallel arrays per field)",
+        pattern="^(objects|columnar)$"
+    )
 ):
     """
     Get restaurant prospects near a location
@@ -108,40 +393,52 @@ async def get_prospects(
 
     Note: Full pitch generation happens on-demand (see /api/pitch)
     to save API costs - we only generate when Hillary selects a restaurant
+
+    Mobile clients can shrink the payload with `fields=name,distance_km,...`
+    and/or `format=columnar`, which returns one array per field instead of
+    one object per prospect.
     """
+    projected_fields = parse_prospect_fields(fields)
+
     try:
         # Initialize clients
         geo_client = GeoapifyClient(GEOAPIFY_API_KEY, ANTHROPIC_API_KEY)
-        pitch_generator = SalesPitchGenerator(ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
 
         # Step 1: Search nearby restaurants
-        results = geo_client.search_places(
-            lat=lat,
-            lon=lon,
-            radius=radius,
-            categories=['catering.restaurant'],
-            limit=150  # Get lots of results to filter
-        )
+        with span('search'):
+            results = geo_client.search_places(
+                lat=lat,
+                lon=lon,
+                radius=radius,
+                categories=['catering.restaurant'],
+                limit=150  # Get lots of results to filter
+            )
 
         # Step 2: Filter for quality
-        if ANTHROPIC_API_KEY:
+        # Over budget -> skip the LLM and use keyword filtering only
+        if ANTHROPIC_API_KEY and ledger.within_budget():
             # First pass: LLM filtering (smart, context-aware)
-            filtered = geo_client.filter_results_with_llm(results, target_type='upscale')
+            with span('llm_filter'):
+                filtered = geo_client.filter_results_with_llm(results, target_type='upscale')
 
             # Second pass: Keyword filtering (safety net for obvious fast food)
             # This catches cases where LLM might miss obvious indicators like "Express", "To Go", etc.
-            filtered = geo_client.filter_results(filtered, target_type='all')
+            with span('keyword_filter'):
+                filtered = geo_client.filter_results(filtered, target_type='all')
         else:
-            filtered = geo_client.filter_results(results, target_type='fine_dining')
+            with span('keyword_filter'):
+                filtered = geo_client.filter_results(results, target_type='fine_dining')
 
         features = filtered.get('features', [])
 
         # Limit to requested number
         features = features[:limit]
 
-        # Step 3: Build prospect list with cheese matches
+        # Step 3: Build prospect list with cheese matches (whole list scored in one pass)
+        with span('match'):
+            cheese_matches = cheese_scorer.match_batch([f.get('properties', {}) for f in features])
         prospects = []
-        for feature in features:
+        for feature, cheese_match in zip(features, cheese_matches):
             props = feature.get('properties', {})
             geometry = feature.get('geometry', {})
             coords = geometry.get('coordinates', [None, None])
@@ -161,60 +458,38 @@ async def get_prospects(
                 "phone": props.get('phone'),
                 "latitude": coords[1],
                 "longitude": coords[0],
+                "place_id": props.get('place_id'),
             }
 
             # Quick cheese match (rule-based, fast)
-            if pitch_generator:
-                # Simple matching based on categories
-                categories = [c.lower() for c in props.get('categories', [])]
-
-                # Fine dining → Pasture Bloom
-                if any(x in ' '.join(categories) for x in ['french', 'italian', 'fine', 'european', 'seafood']):
-                    cheese_id = "pasture_bloom"
-                    cheese_name = "Pasture Bloom Triple Crème"
-                    cheese_subtitle = "Seasonal, Bloomy-Rind"
-                    cheese_price = "$32-38/lb"
-                    confidence = "high"
-                # Gastropub → Smoky Alder
-                elif any(x in ' '.join(categories) for x in ['pub', 'american', 'bar', 'grill', 'tavern']):
-                    cheese_id = "smoky_alder"
-                    cheese_name = "Smoky Alder Wash Rind"
-                    cheese_subtitle = "Small-Batch, Semi-Soft"
-                    cheese_price = "$24-28/lb"
-                    confidence = "high"
-                else:
-                    # Default to more versatile option
-                    cheese_id = "smoky_alder"
-                    cheese_name = "Smoky Alder Wash Rind"
-                    cheese_subtitle = "Small-Batch, Semi-Soft"
-                    cheese_price = "$24-28/lb"
-                    confidence = "medium"
-
-                prospect.update({
-                    "recommended_cheese_id": cheese_id,
-                    "recommended_cheese_name": cheese_name,
-                    "cheese_subtitle": cheese_subtitle,
-                    "cheese_price": cheese_price,
-                    "match_confidence": confidence
-                })
-            else:
-                # Fallback if no AI
-                prospect.update({
-                    "recommended_cheese_id": "smoky_alder",
-                    "recommended_cheese_name": "Smoky Alder Wash Rind",
-                    "cheese_subtitle": "Small-Batch, Semi-Soft",
-                    "cheese_price": "$24-28/lb",
-                    "match_confidence": "medium"
-                })
+            cheese = get_cheese_by_id(cheese_match['primary_cheese'])
+            prospect.update({
+                "recommended_cheese_id": cheese_match['primary_cheese'],
+                "recommended_cheese_name": cheese['name'],
+                "cheese_subtitle": cheese['subtitle'],
+                "cheese_price": f"{cheese['typical_price_lb']}/lb",
+                "match_confidence": cheese_match['confidence']
+            })
 
             prospects.append(RestaurantProspect(**prospect))
 
-        return ProspectsResponse(
-            prospects=prospects,
-            total=len(prospects),
-            search_center={"lat": lat, "lon": lon},
-            search_radius_km=round(radius / 1000, 2)
-        )
+        # Serialized here (not by FastAPI after returning) so it shows up as a span
+        with span('serialize'):
+            if projected_fields or response_format != 'objects':
+                body = shape_prospects(prospects, projected_fields, response_format)
+                body.update({
+                    "total": len(prospects),
+                    "search_center": {"lat": lat, "lon": lon},
+                    "search_radius_km": round(radius / 1000, 2)
+                })
+                return JSONResponse(content=body)
+
+            return JSONResponse(content=ProspectsResponse(
+                prospects=prospects,
+                total=len(prospects),
+                search_center={"lat": lat, "lon": lon},
+                search_radius_km=round(radius / 1000, 2)
+            ).model_dump(mode='json'))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -225,7 +500,9 @@ async def get_full_pitch(
     name: str = Query(..., description="Restaurant name"),
     lat: float = Query(..., description="Restaurant latitude"),
     lon: float = Query(..., description="Restaurant longitude"),
-    skip_asian_check: bool = Query(False, description="Skip Asian cuisine detection")
+    skip_asian_check: bool = Query(False, description="Skip Asian cuisine detection"),
+    place_id: Optional[str] = Query(None, description="Geoapify place id from /api/prospects"),
+    instant: bool = Query(False, description="Return the local pitch now, with an upgrade_token for the Claude version")
 ):
     """
     Generate full sales pitch for a specific restaurant
@@ -233,21 +510,33 @@ async def get_full_pitch(
     Called when Hillary selects a restaurant from the list.
     This is the expensive operation (Google Places + Claude),
     so we only do it on-demand.
+
+    Pitches generated overnight by batch_pitches.py are returned as-is.
+    Otherwise a pitch is always built locally first (reviews + catalog, a few ms).
+    With `instant=true`, or when Claude misses PITCH_LLM_DEADLINE_SECONDS,
+    that pitch is returned with an `upgrade_token`; the Claude version is
+    collected from /api/pitch/upgrade/{token}. Over budget (or without an
+    Anthropic key) the local pitch is the answer.
     """
     try:
         # Initialize clients
-        google_client = GooglePlacesClient(GOOGLE_PLACES_API_KEY)
+        google_client = GooglePlacesClient(GOOGLE_PLACES_API_KEY, place_store=place_store)
         pitch_generator = SalesPitchGenerator(ANTHROPIC_API_KEY)
 
         # Step 1: Get detailed restaurant data (Google Places)
-        restaurant_data = google_client.enrich_restaurant_data(name, lat, lon)
+        # Reviews are only fetched here - list-level lookups stop at the contact tier
+        with span('enrich'):
+            restaurant_data = google_client.enrich_restaurant_data(
+                name, lat, lon, tier='reviews', geoapify_place_id=place_id
+            )
 
         if not restaurant_data:
             raise HTTPException(status_code=404, detail=f"Restaurant '{name}' not found")
 
         # Step 1.5: Check if Asian cuisine (dairy-incompatible) - unless user wants to skip
         if not skip_asian_check:
-            asian_detection = pitch_generator.detect_asian_cuisine(restaurant_data)
+            with span('asian_check'):
+                asian_detection = pitch_generator.detect_asian_cuisine(restaurant_data)
 
             if asian_detection['is_asian']:
                 # Return warning instead of generating pitch
@@ -265,12 +554,41 @@ async def get_full_pitch(
                 }
 
         # Step 2: Determine cheese match
-        cheese_match = pitch_generator.determine_cheese_match(restaurant_data)
-
-        # Step 3: Generate pitch
-        pitch = pitch_generator.generate_sales_pitch(restaurant_data, cheese_match)
+        with span('match'):
+            cheese_match = pitch_generator.determine_cheese_match(restaurant_data)
+
+        # Step 3: Pitch generated overnight for this place and cheese
+        with span('batch_pitch_lookup'):
+            batch_pitch = place_store.get_pitch(
+                restaurant_data.get('place_id'),
+                cheese_match['primary_cheese'],
+                max_age_seconds=PITCH_CACHE_MAX_AGE_HOURS * 3600,
+                prompt_version=get_prompt('pitch').version
+            )
+        if batch_pitch:
+            if ANTHROPIC_API_KEY:
+                _prerender_personas(pitch_generator, batch_pitch)
+            return batch_pitch
+
+        # Step 4: Local pitch - always available, no API call
+        with span('local_pitch'):
+            local_pitch = build_local_pitch(restaurant_data, cheese_match)
+        if not ANTHROPIC_API_KEY or not ledger.within_budget() or breakers.is_open('anthropic', 'pitch'):
+            return local_pitch
+
+        # Step 5: Claude pitch in the background (persona variants follow it)
+        token, llm_pitch = pitch_upgrades.submit(
+            _generate_llm_pitch, pitch_generator, restaurant_data, cheese_match
+        )
+        if instant:
+            return {**local_pitch, "upgrade_token": token}
 
-        return pitch
+        try:
+            with span('llm_pitch_wait'):
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(llm_pitch)),
+                                              timeout=PITCH_LLM_DEADLINE_SECONDS)
+        except asyncio.TimeoutError:
+            return {**local_pitch, "upgrade_token": token}
 
     except HTTPException:
         raise
@@ -278,6 +596,153 @@ async def get_full_pitch(
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+def _generate_llm_pitch(
+    pitch_generator: SalesPitchGenerator,
+    restaurant_data: Dict[str, Any],
+    cheese_match: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Claude pitch, then render every persona variant in the background"""
+    with span('llm_pitch'):
+        pitch = pitch_generator.generate_sales_pitch(restaurant_data, cheese_match)
+    if pitch.get('source') == 'llm':
+        _prerender_personas(pitch_generator, pitch)
+    return pitch
+
+
+def _prerender_personas(pitch_generator: SalesPitchGenerator, pitch: Dict[str, Any]) -> None:
+    """Refinement screen is instant once these land (skipped when over budget)"""
+    if PERSONA_PRERENDER_ENABLED:
+        persona_cache.prerender(
+            pitch_generator,
+            build_full_pitch_text(pitch),
+            restaurant_name=pitch['restaurant']['name'],
+            cheese_name=pitch['cheese']['name'],
+            personas=SalesPitchGenerator.PERSONAS
+        )
+
+
+@app.get("/api/pitch/upgrade/{token}")
+async def get_pitch_upgrade(
+    token: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for the Claude pitch")
+):
+    """
+    Collect the Claude pitch behind an instant local pitch
+
+    Returns the pitch once ready, `202 {"status": "pending"}` while it is
+    still generating, or 404 for unknown / expired tokens.
+    """
+    future = pitch_upgrades.get(token)
+    if future is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired upgrade token")
+
+    if not future.done() and wait:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+
+    if not future.done():
+        return JSONResponse(status_code=202, content={"status": "pending", "upgrade_token": token})
+
+    try:
+        return future.result()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating pitch: {str(e)}")
+
+
+class BulkEnrichItem(BaseModel):
+    """A restaurant to enrich with Google Places data"""
+    name: str
+    lat: float
+    lon: float
+    place_id: Optional[str] = None  # Geoapify place id
+
+
+class BulkEnrichRequest(BaseModel):
+    """Request to enrich many restaurants at once"""
+    restaurants: List[BulkEnrichItem]
+    max_concurrency: Optional[int] = None
+    budget_usd: Optional[float] = None  # Capped at GOOGLE_ENRICH_BUDGET_USD
+    mode: str = "per_restaurant"  # or "area": a few Nearby Searches + bulk matching
+
+
+@app.post("/api/enrich/bulk")
+async def bulk_enrich(request: BulkEnrichRequest):
+    """
+    Enrich a list of restaurants with Google Places data in one call
+
+    Lookups run concurrently (bounded by GOOGLE_BULK_MAX_CONCURRENCY) and
+    stop once the estimated spend reaches the budget. Restaurants that
+    didn't fit in the budget come back with status 'skipped_budget'.
+
+    mode="area" covers the prospects with a few Nearby Search calls and
+    matches the results in bulk, falling back to per-name search only for
+    restaurants it couldn't match.
+    """
+    if len(request.restaurants) > 50:
+        raise HTTPException(status_code=400, detail="At most 50 restaurants per bulk request")
+    if request.mode not in ("per_restaurant", "area"):
+        raise HTTPException(status_code=400, detail="mode must be 'per_restaurant' or 'area'")
+
+    try:
+        google_client = GooglePlacesClient(GOOGLE_PLACES_API_KEY, place_store=place_store)
+
+        max_concurrency = min(request.max_concurrency or GOOGLE_BULK_MAX_CONCURRENCY, GOOGLE_BULK_MAX_CONCURRENCY)
+        budget_usd = GOOGLE_ENRICH_BUDGET_USD
+        if request.budget_usd is not None:
+            budget_usd = min(request.budget_usd, GOOGLE_ENRICH_BUDGET_USD)
+
+        items = [(r.name, r.lat, r.lon, r.place_id) for r in request.restaurants]
+
+        enrich = google_client.enrich_area if request.mode == "area" else google_client.enrich_restaurants_bulk
+        # Off the event loop: the lookups block until the whole batch is done
+        # (to_thread runs it in a copy of this context, so costs and spans are attributed)
+        with span('enrich', description=request.mode):
+            return await asyncio.to_thread(enrich, items, max_concurrency=max_concurrency, budget_usd=budget_usd)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error enriching restaurants: {str(e)}")
+
+
+@app.get("/api/reviews/search")
+async def search_reviews(
+    q: str = Query(..., description="Menu terms, e.g. 'burgers or charcuterie'"),
+    lat: float = Query(..., description="Latitude"),
+    lon: float = Query(..., description="Longitude"),
+    radius: int = Query(2000, description="Search radius in meters", ge=100, le=5000),
+    limit: int = Query(20, description="Max results", ge=1, le=50)
+):
+    """
+    Search cached Google reviews for menu mentions near a location
+
+    Runs entirely against the local review index (no Google or Claude calls),
+    so it only covers restaurants we've already enriched. Each match comes
+    with the cheese recommendation computed from its stored reviews.
+    """
+    try:
+        with span('review_search'):
+            matches = place_store.search_reviews(q, lat, lon, radius_m=radius, limit=limit)
+            stored = [place_store.get_place(match['place_id']) or match for match in matches]
+
+        with span('match'):
+            cheese_matches = cheese_scorer.match_batch(stored)
+        for match, cheese_match in zip(matches, cheese_matches):
+            match['recommended_cheese_id'] = cheese_match['primary_cheese']
+            match['match_confidence'] = cheese_match['confidence']
+
+        return {
+            "query": q,
+            "matches": matches,
+            "total": len(matches),
+            "search_center": {"lat": lat, "lon": lon},
+            "search_radius_km": round(radius / 1000, 2)
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching reviews: {str(e)}")
+
+
 class PitchRefinementRequest(BaseModel):
     """Request to refine an existing pitch"""
     original_pitch: str
@@ -296,20 +761,36 @@ async def refine_pitch(request: PitchRefinementRequest):
     - chef: Technical, culinary-focused
     - manager: Business ROI, margins
     - gatekeeper: Quick pitch to reach decision maker
+
+    Variants pre-rendered after /api/pitch are returned straight from the
+    cache (or awaited if still rendering); anything else is rendered live.
     """
     try:
+        prerendered = persona_cache.lookup(request.original_pitch, request.persona)
+        if prerendered is not None:
+            try:
+                cached = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(prerendered)), timeout=60)
+                return {**cached, "restaurant_name": request.restaurant_name, "cheese_name": request.cheese_name}
+            except Exception:
+                pass  # Render failed or timed out - fall through to a live call
+
         pitch_generator = SalesPitchGenerator(ANTHROPIC_API_KEY)
 
         # Refine the pitch using persona-specific template
-        refined_pitch = pitch_generator.refine_pitch_for_persona(
-            original_pitch=request.original_pitch,
-            restaurant_name=request.restaurant_name,
-            cheese_name=request.cheese_name,
-            persona=request.persona
-        )
+        with span('llm_refine', description=request.persona):
+            refined_pitch = pitch_generator.refine_pitch_for_persona(
+                original_pitch=request.original_pitch,
+                restaurant_name=request.restaurant_name,
+                cheese_name=request.cheese_name,
+                persona=request.persona
+            )
 
         return refined_pitch
 
+    except BudgetExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error refining pitch: {str(e)}")
 
@@ -332,23 +813,156 @@ async def micro_refine_pitch(request: MicroRefinementRequest):
     - casual: More conversational tone
     - formal: More professional tone
     - strong_opener: Punch up the opening
+
+    The same tweak on the same text is answered from cache. Responses carry
+    `pitch_hash` / `parent_hash` / `redo_hash` for undo and redo via
+    `/api/pitch/versions/{pitch_hash}`.
     """
     try:
-        pitch_generator = SalesPitchGenerator(ANTHROPIC_API_KEY)
-
-        # Apply micro-refinement
-        refined_pitch = pitch_generator.apply_micro_refinement(
-            current_pitch=request.current_pitch,
-            micro_type=request.micro_type,
-            restaurant_name=request.restaurant_name
-        )
-
-        return refined_pitch
+        prompt_version = version_of(f"micro:{request.micro_type}")
+        version = micro_cache.get(request.current_pitch, request.micro_type, prompt_version)
+        cached = version is not None
+
+        if not cached:
+            pitch_generator = SalesPitchGenerator(ANTHROPIC_API_KEY)
+
+            # Apply micro-refinement
+            with span('llm_micro_refine', description=request.micro_type):
+                refined_pitch = pitch_generator.apply_micro_refinement(
+                    current_pitch=request.current_pitch,
+                    micro_type=request.micro_type,
+                    restaurant_name=request.restaurant_name
+                )
+            version = micro_cache.record(
+                request.current_pitch,
+                request.micro_type,
+                prompt_version,
+                refined_pitch['refined_text']
+            )
+
+        return {
+            **version,
+            "micro_type": request.micro_type,
+            "restaurant_name": request.restaurant_name,
+            "cached": cached
+        }
 
+    except BudgetExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error applying micro-refinement: {str(e)}")
 
 
+@app.get("/api/pitch/versions/{pitch_hash}")
+async def get_pitch_version(pitch_hash: str):
+    """
+    Fetch an earlier (undo) or later (redo) version of a micro-refined pitch
+
+    Use `parent_hash` from a micro-refine response to undo and `redo_hash`
+    to redo; no model call is made.
+    """
+    version = micro_cache.version(pitch_hash)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired pitch version")
+    return version
+
+
+@app.get("/api/metrics/costs")
+async def cost_metrics():
+    """
+    Actual spend on Geoapify, Google Places and Anthropic
+
+    Aggregated per day (and provider) and per endpoint, with token counts,
+    average latency, the most recent calls and the current budget status.
+    """
+    return ledger.summary()
+
+
+@app.get("/api/metrics/models")
+async def model_metrics():
+    """
+    Claude model routing: which model each operation was sent to, and the
+    observed p50/p95 latency per model and per operation vs. its SLO,
+    plus request hedging counts and the current prompt versions
+    """
+    return {**model_router.summary(), 'hedging': hedging.summary(), 'prompts': prompt_versions()}
+
+
+@app.get("/api/metrics/circuits")
+async def circuit_metrics():
+    """
+    Circuit breaker per upstream and operation: state (closed / open /
+    half_open), failed and slow calls in the current window, how often it
+    opened and how many calls it rejected
+    """
+    return breakers.summary()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Latency histograms and counters in Prometheus text format: per request
+    stage (the spans also sent as Server-Timing), per route and per
+    outbound provider
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/admin/memory")
+async def memory_status(request: Request):
+    """
+    Admin-only: whether tracemalloc is tracing, traced memory and the
+    snapshots kept
+    """
+    require_admin(request)
+    return memory_snapshots.status()
+
+
+@app.post("/api/admin/memory/snapshot")
+async def memory_snapshot(
+    request: Request,
+    limit: int = Query(20, ge=0, le=200, description="Top allocation sites to return"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")
+):
+    """
+    Admin-only: take a tracemalloc snapshot (tracing starts on the first one)
+
+    Only allocations made after tracing started are seen: snapshot before
+    e.g. a large territory search, run it, then diff against the snapshot.
+    """
+    require_admin(request)
+    return await asyncio.to_thread(memory_snapshots.take, limit, group_by)
+
+
+@app.get("/api/admin/memory/diff")
+async def memory_diff(
+    request: Request,
+    base: int = Query(..., description="Earlier snapshot id"),
+    current: Optional[int] = Query(None, description="Later snapshot id (default: take one now)"),
+    limit: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")
+):
+    """
+    Admin-only: allocation sites that grew (or shrank) most between two
+    snapshots, i.e. what is still holding memory
+    """
+    require_admin(request)
+    try:
+        return await asyncio.to_thread(memory_snapshots.diff, base, current, limit, group_by)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown or dropped snapshot id")
+
+
+@app.delete("/api/admin/memory")
+async def memory_reset(request: Request):
+    """Admin-only: stop tracemalloc (and its overhead) and drop all snapshots"""
+    require_admin(request)
+    memory_snapshots.reset()
+    return memory_snapshots.status()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,385 @@
+"""
+Nightly Batch Pitch Generation for Happy Pastures Creamery
+
+For next-day route planning latency doesn't matter but cost does: this job
+collects every prospect in a territory, submits all pitch prompts through
+Anthropic's Message Batches API (half the interactive price), polls until
+the batch has ended and stores the pitches in the place store. The next
+day's /api/pitch calls for those restaurants are then served from there.
+
+Usage:
+    python batch_pitches.py --lat 42.0451 --lon -87.6877 --radius 2500
+    python batch_pitches.py --local   # no batch API: run prompts one by one
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, Any, List, Optional, Callable, Iterator
+
+import requests
+
+from config import (
+    GEOAPIFY_API_KEY, GOOGLE_PLACES_API_KEY, ANTHROPIC_API_KEY, PLACE_STORE_PATH,
+    GOOGLE_BULK_MAX_CONCURRENCY, GOOGLE_ENRICH_BUDGET_USD, PITCH_CACHE_MAX_AGE_HOURS,
+    BATCH_POLL_INTERVAL_SECONDS, ANTHROPIC_BASE_URL,
+    LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE
+)
+from cost_ledger import ledger, anthropic_cost
+from geoapify_client import GeoapifyClient
+from google_places_client import GooglePlacesClient
+from llm_client import call_anthropic
+from model_router import router, MODEL_TIERS
+from place_store import PlaceStore
+from prompts import get_prompt
+from review_features import review_features
+from sales_pitch_generator import SalesPitchGenerator
+from structured_logging import configure_logging
+
+
+ANTHROPIC_BATCHES_URL = f"{ANTHROPIC_BASE_URL}/v1/messages/batches"
+
+logger = logging.getLogger(__name__)
+
+
+class AnthropicBatchQueue:
+    """Anthropic Message Batches API (results within 24h, 50% cheaper)"""
+
+    def __init__(self, api_key: str):
+        """
+        Args:
+            api_key: Anthropic API key
+        """
+        self.headers = {
+            'x-api-key': api_key,
+            'anthropic-version': '2023-06-01',
+            'content-type': 'application/json'
+        }
+
+    def submit(self, batch_requests: List[Dict[str, Any]]) -> str:
+        """
+        Create a batch
+
+        Args:
+            batch_requests: [{'custom_id': ..., 'params': <Messages API body>}]
+
+        Returns:
+            Batch id
+        """
+        ledger.check_budget()
+        response = requests.post(
+            ANTHROPIC_BATCHES_URL,
+            headers=self.headers,
+            json={'requests': batch_requests},
+            timeout=60
+        )
+        response.raise_for_status()
+        return response.json()['id']
+
+    def is_done(self, batch_id: str) -> bool:
+        """True once every request in the batch has finished (or expired)"""
+        response = requests.get(f"{ANTHROPIC_BATCHES_URL}/{batch_id}", headers=self.headers, timeout=30)
+        response.raise_for_status()
+        return response.json().get('processing_status') == 'ended'
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream finished results, recording their (discounted) cost
+
+        Yields:
+            {'custom_id', 'text' (None if the request failed)}
+        """
+        response = requests.get(f"{ANTHROPIC_BATCHES_URL}/{batch_id}", headers=self.headers, timeout=30)
+        response.raise_for_status()
+        results_url = response.json()['results_url']
+
+        results = requests.get(results_url, headers=self.headers, timeout=300)
+        results.raise_for_status()
+
+        for line in results.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            result = entry.get('result', {})
+
+            if result.get('type') != 'succeeded':
+                yield {'custom_id': entry.get('custom_id'), 'text': None}
+                continue
+
+            message = result['message']
+            usage = message.get('usage', {}) or {}
+            ledger.record(
+                'anthropic',
+                message.get('model', ''),
+                cost_usd=anthropic_cost(message.get('model', ''), usage, batch=True),
+                input_tokens=usage.get('input_tokens', 0),
+                output_tokens=usage.get('output_tokens', 0),
+                cached_tokens=usage.get('cache_read_input_tokens', 0),
+                operation='pitch_batch',
+                status=200
+            )
+            yield {'custom_id': entry.get('custom_id'), 'text': message['content'][0]['text']}
+
+
+class LocalBatchQueue:
+    """
+    In-process stand-in for the batch API
+
+    Requests are answered by `responder` (one at a time) the first time the
+    batch is polled. Used in tests and where the batch API isn't available.
+    """
+
+    def __init__(self, responder: Callable[[Dict[str, Any]], Optional[str]]):
+        """
+        Args:
+            responder: Messages API params -> reply text (None = failed)
+        """
+        self.responder = responder
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    def submit(self, batch_requests: List[Dict[str, Any]]) -> str:
+        batch_id = f"local_batch_{len(self._batches) + 1}"
+        self._batches[batch_id] = {'requests': list(batch_requests), 'results': None}
+        return batch_id
+
+    def is_done(self, batch_id: str) -> bool:
+        batch = self._batches[batch_id]
+        if batch['results'] is None:
+            batch['results'] = []
+            for item in batch['requests']:
+                try:
+                    text = self.responder(item['params'])
+                except Exception as e:
+                    logger.warning("Batch request %s failed: %s", item['custom_id'], e)
+                    text = None
+                batch['results'].append({'custom_id': item['custom_id'], 'text': text})
+        return True
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        yield from self._batches[batch_id]['results'] or []
+
+
+def interactive_responder(api_key: str) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """Responder for LocalBatchQueue that makes normal (full price) Claude calls"""
+
+    def respond(params: Dict[str, Any]) -> Optional[str]:
+        response = call_anthropic(
+            api_key,
+            params['messages'][0]['content'],
+            max_tokens=params['max_tokens'],
+            timeout=60,
+            operation='pitch_batch',
+            temperature=params.get('temperature'),
+            model=params['model']
+        )
+        if response.status_code != 200:
+            return None
+        return response.json()['content'][0]['text']
+
+    return respond
+
+
+def collect_prospects(
+    geo_client: GeoapifyClient,
+    lat: float,
+    lon: float,
+    radius: int,
+    limit: int
+) -> List[Dict[str, Any]]:
+    """Restaurants in the territory, filtered the same way as /api/prospects"""
+    results = geo_client.search_places(
+        lat=lat,
+        lon=lon,
+        radius=radius,
+        categories=['catering.restaurant'],
+        limit=150
+    )
+
+    if geo_client.anthropic_api_key and ledger.within_budget():
+        filtered = geo_client.filter_results_with_llm(results, target_type='upscale')
+        filtered = geo_client.filter_results(filtered, target_type='all')
+    else:
+        filtered = geo_client.filter_results(results, target_type='fine_dining')
+
+    return filtered.get('features', [])[:limit]
+
+
+def run_territory_batch(
+    lat: float,
+    lon: float,
+    radius: int,
+    queue: Any,
+    geo_client: GeoapifyClient,
+    google_client: GooglePlacesClient,
+    pitch_generator: SalesPitchGenerator,
+    store: PlaceStore,
+    limit: int = 50,
+    enrich_budget_usd: float = GOOGLE_ENRICH_BUDGET_USD,
+    max_age_hours: float = PITCH_CACHE_MAX_AGE_HOURS,
+    poll_interval: float = BATCH_POLL_INTERVAL_SECONDS,
+    max_wait_seconds: float = 24 * 3600,
+    processes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Generate pitches for every prospect in a territory through a batch queue
+
+    Args:
+        lat / lon / radius: Territory (meters)
+        queue: AnthropicBatchQueue or LocalBatchQueue
+        geo_client / google_client / pitch_generator: API clients
+        store: Place store the pitches are saved to
+        limit: Max prospects
+        enrich_budget_usd: Max Google Places spend for fetching reviews
+        max_age_hours: Pitches younger than this are not regenerated
+        poll_interval: Seconds between batch status checks
+        max_wait_seconds: Give up polling after this long
+        processes: Extract review features across this many processes
+
+    Returns:
+        Summary counts plus the batch id
+    """
+    summary = {'prospects': 0, 'enriched': 0, 'skipped_asian': 0, 'already_cached': 0,
+               'submitted': 0, 'saved': 0, 'failed': 0, 'batch_id': None}
+
+    features = collect_prospects(geo_client, lat, lon, radius, limit)
+    summary['prospects'] = len(features)
+
+    items = []
+    for feature in features:
+        props = feature.get('properties', {})
+        coords = feature.get('geometry', {}).get('coordinates', [None, None])
+        if props.get('name'):
+            items.append((props['name'], coords[1], coords[0], props.get('place_id')))
+
+    # Reviews are needed for good pitches - same tier as /api/pitch
+    bulk = google_client.enrich_restaurants_bulk(
+        items,
+        max_concurrency=GOOGLE_BULK_MAX_CONCURRENCY,
+        budget_usd=enrich_budget_usd,
+        tier='reviews'
+    )
+
+    # Scan every restaurant's reviews up front (cached for the cuisine and
+    # cheese checks below)
+    enriched = [r['data'] for r in bulk['results'] if r['status'] == 'ok' and r.get('data')]
+    review_features.extract_batch(enriched, processes=processes)
+
+    # One batch request per restaurant that doesn't have a fresh pitch yet
+    model = MODEL_TIERS[router.route_for('pitch')[0]]
+    prompt_version = get_prompt('pitch').version
+    batch_requests = []
+    pending: Dict[str, tuple] = {}
+    for result in bulk['results']:
+        restaurant_data = result.get('data')
+        if result['status'] != 'ok' or not restaurant_data:
+            continue
+        summary['enriched'] += 1
+
+        if pitch_generator.detect_asian_cuisine(restaurant_data)['is_asian']:
+            summary['skipped_asian'] += 1
+            continue
+
+        cheese_match = pitch_generator.determine_cheese_match(restaurant_data)
+        if store.get_pitch(restaurant_data['place_id'], cheese_match['primary_cheese'],
+                           max_age_seconds=max_age_hours * 3600, prompt_version=prompt_version):
+            summary['already_cached'] += 1
+            continue
+
+        custom_id = f"pitch-{len(batch_requests):04d}"
+        pending[custom_id] = (restaurant_data, cheese_match)
+        batch_requests.append({
+            'custom_id': custom_id,
+            'params': {
+                'model': model,
+                'max_tokens': SalesPitchGenerator.PITCH_MAX_TOKENS,
+                'temperature': SalesPitchGenerator.PITCH_TEMPERATURE,
+                'messages': [
+                    {'role': 'user', 'content': pitch_generator.build_pitch_prompt(restaurant_data, cheese_match)}
+                ]
+            }
+        })
+
+    if not batch_requests:
+        return summary
+
+    batch_id = queue.submit(batch_requests)
+    summary['batch_id'] = batch_id
+    summary['submitted'] = len(batch_requests)
+    logger.info("Submitted batch %s with %d pitches", batch_id, len(batch_requests),
+                extra={'batch_id': batch_id, 'batch_size': len(batch_requests)})
+
+    waited = 0.0
+    while not queue.is_done(batch_id):
+        if waited >= max_wait_seconds:
+            logger.warning("Batch %s not finished after %.1fh, giving up", batch_id, waited / 3600,
+                           extra={'batch_id': batch_id})
+            return summary
+        time.sleep(poll_interval)
+        waited += poll_interval
+
+    for result in queue.results(batch_id):
+        restaurant_data, cheese_match = pending.get(result['custom_id'], (None, None))
+        if restaurant_data is None or result['text'] is None:
+            summary['failed'] += 1
+            continue
+        try:
+            pitch = pitch_generator.parse_pitch_response(result['text'], restaurant_data, cheese_match, source='batch')
+        except ValueError:
+            summary['failed'] += 1
+            continue
+        store.save_pitch(restaurant_data['place_id'], pitch, prompt_version=prompt_version)
+        summary['saved'] += 1
+
+    return summary
+
+
+def main():
+    """Nightly CLI entry point"""
+    parser = argparse.ArgumentParser(description="Generate tomorrow's pitches for a territory in one batch")
+    parser.add_argument('--lat', type=float, default=42.0451, help='Territory center latitude (default: Evanston)')
+    parser.add_argument('--lon', type=float, default=-87.6877, help='Territory center longitude')
+    parser.add_argument('--radius', type=int, default=2500, help='Territory radius in meters')
+    parser.add_argument('--limit', type=int, default=50, help='Max prospects')
+    parser.add_argument('--budget', type=float, default=GOOGLE_ENRICH_BUDGET_USD,
+                        help='Max Google Places spend (USD) for fetching reviews')
+    parser.add_argument('--poll-interval', type=float, default=BATCH_POLL_INTERVAL_SECONDS,
+                        help='Seconds between batch status checks')
+    parser.add_argument('--local', action='store_true',
+                        help='Run prompts one by one instead of using the batch API (full price)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Worker processes for scanning reviews (large territories)')
+    args = parser.parse_args()
+    configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, queue_size=LOG_QUEUE_SIZE)
+
+    if not (GEOAPIFY_API_KEY and GOOGLE_PLACES_API_KEY and ANTHROPIC_API_KEY):
+        print("❌ Error: GEOAPIFY_API_KEY, GOOGLE_PLACES_API_KEY and ANTHROPIC_API_KEY must be set")
+        sys.exit(1)
+
+    store = PlaceStore(PLACE_STORE_PATH)
+    queue = LocalBatchQueue(interactive_responder(ANTHROPIC_API_KEY)) if args.local \
+        else AnthropicBatchQueue(ANTHROPIC_API_KEY)
+
+    print(f"\n🌙 Nightly pitches for ({args.lat}, {args.lon}), radius {args.radius}m")
+    summary = run_territory_batch(
+        args.lat, args.lon, args.radius, queue,
+        geo_client=GeoapifyClient(GEOAPIFY_API_KEY, ANTHROPIC_API_KEY),
+        google_client=GooglePlacesClient(GOOGLE_PLACES_API_KEY, place_store=store),
+        pitch_generator=SalesPitchGenerator(ANTHROPIC_API_KEY),
+        store=store,
+        limit=args.limit,
+        enrich_budget_usd=args.budget,
+        poll_interval=args.poll_interval,
+        processes=args.processes
+    )
+
+    print(f"\n✅ {summary['saved']} pitches saved "
+          f"({summary['already_cached']} already fresh, {summary['skipped_asian']} skipped as Asian cuisine, "
+          f"{summary['failed']} failed) from {summary['prospects']} prospects")
+    costs = ledger.summary()['by_day']
+    for day, totals in costs.items():
+        print(f"💰 {day}: ${totals['total']['cost_usd']:.3f} across {totals['total']['calls']} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Cheese Matching Engine for Happy Pastures Creamery
+
+One scoring engine for every place that recommends a cheese (/api/prospects,
+/api/pitch, review search, nightly batch). Scoring is driven by the
+`match_rules` table of each cheese in CHEESE_PRODUCTS, compiled once:
+
+- each restaurant type keyword found in the types / categories: +2
+- any menu keyword found in the first reviews: +1
+- price level the cheese is positioned for: +1
+
+Keyword hits come from the shared review feature extractor
+(review_features.py). Restaurants are scored in batches: the hits become
+a feature matrix that is multiplied with the rules table in one pass
+(numpy when installed, a sparse pure-Python loop otherwise). Ties are
+broken by catalog similarity (cheese_vectors.py), then by the default
+cheese.
+"""
+import heapq
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional: pure-Python scoring below
+    np = None
+
+from cheese_products import CHEESE_PRODUCTS
+from cheese_vectors import cheese_index, restaurant_profile
+from review_features import ReviewFeatureExtractor, review_features
+
+
+TYPE_WEIGHT = 2
+MENU_WEIGHT = 1
+PRICE_WEIGHT = 1
+
+# Score at which a clear winner is a high-confidence match
+HIGH_CONFIDENCE_SCORE = 3
+
+# Most versatile cheese, used when nothing distinguishes the options
+DEFAULT_CHEESE = 'smoky_alder'
+
+
+class CheeseScorer:
+    """Rules table compiled from the catalog, scoring restaurants in batches"""
+
+    def __init__(self, catalog: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Compile the rules of every cheese
+
+        Args:
+            catalog: cheese_id -> product dict with `match_rules`
+                (default: CHEESE_PRODUCTS)
+        """
+        self._extractor = review_features if catalog is None else ReviewFeatureExtractor(catalog)
+        catalog = catalog if catalog is not None else CHEESE_PRODUCTS
+        self.cheese_ids = list(catalog)
+        self._order = {cheese_id: i for i, cheese_id in enumerate(self.cheese_ids)}
+
+        # keyword / price level -> columns (cheeses) it counts for
+        self._type_index: Dict[str, List[int]] = {}
+        self._menu_index: Dict[str, List[int]] = {}
+        self._price_index: Dict[str, List[int]] = {}
+        for column, cheese_id in enumerate(self.cheese_ids):
+            rules = catalog[cheese_id].get('match_rules', {})
+            for keyword in rules.get('type_keywords', []):
+                self._type_index.setdefault(keyword.lower(), []).append(column)
+            for keyword in rules.get('menu_keywords', []):
+                self._menu_index.setdefault(keyword.lower(), []).append(column)
+            for level in rules.get('price_levels', []):
+                self._price_index.setdefault(level, []).append(column)
+
+        # Feature rows -> cheese columns, for the numpy path
+        self._type_keywords = list(self._type_index)
+        self._menu_keywords = list(self._menu_index)
+        self._price_levels = list(self._price_index)
+        if np is not None:
+            self._type_weights = self._weight_matrix(self._type_keywords, self._type_index)
+            self._menu_weights = self._weight_matrix(self._menu_keywords, self._menu_index)
+            self._price_weights = self._weight_matrix(self._price_levels, self._price_index)
+
+    def _weight_matrix(self, features: List[str], index: Dict[str, List[int]]):
+        matrix = np.zeros((len(features), len(self.cheese_ids)), dtype=np.int32)
+        for row, feature in enumerate(features):
+            matrix[row, index[feature]] = 1
+        return matrix
+
+    def _features(
+        self,
+        restaurants: List[Dict[str, Any]],
+        processes: Optional[int] = None
+    ) -> List[Tuple[FrozenSet[str], FrozenSet[str], Optional[str]]]:
+        """Type keyword hits, menu keyword hits and price level of each restaurant"""
+        return [
+            (f['type_hits'], f['menu_hits'], f['price'])
+            for f in self._extractor.extract_batch(restaurants, processes=processes)
+        ]
+
+    def score_batch(self, restaurants: List[Dict[str, Any]], processes: Optional[int] = None) -> List[Dict[str, int]]:
+        """
+        Rule scores for a batch of restaurants
+
+        Args:
+            restaurants: Google Places data or Geoapify properties
+            processes: Extract review features across this many processes
+
+        Returns:
+            One {cheese_id: score} dict per restaurant, with only the
+            cheeses that scored
+        """
+        features = self._features(restaurants, processes)
+        if not features:
+            return []
+
+        if np is not None:
+            def indicator(found: List[FrozenSet[str]], columns: List[str]):
+                matrix = np.zeros((len(found), len(columns)), dtype=np.int32)
+                position = {c: i for i, c in enumerate(columns)}
+                for row, hits in enumerate(found):
+                    for hit in hits:
+                        if hit in position:
+                            matrix[row, position[hit]] = 1
+                return matrix
+
+            types = indicator([f[0] for f in features], self._type_keywords)
+            menus = indicator([f[1] for f in features], self._menu_keywords)
+            prices = indicator([{f[2]} for f in features], self._price_levels)
+            scores = (
+                TYPE_WEIGHT * (types @ self._type_weights)
+                + MENU_WEIGHT * ((menus @ self._menu_weights) > 0)
+                + PRICE_WEIGHT * (prices @ self._price_weights)
+            )
+            return [{self.cheese_ids[c]: int(row[c]) for c in row.nonzero()[0]} for row in scores]
+
+        # Only the cheeses indexed under a hit are touched (hits also hold
+        # the other heuristics' keywords, which index no cheese)
+        rows = []
+        for type_hits, menu_hits, price in features:
+            row: Dict[int, int] = {}
+            for keyword in type_hits:
+                for column in self._type_index.get(keyword, ()):
+                    row[column] = row.get(column, 0) + TYPE_WEIGHT
+            for column in {c for keyword in menu_hits for c in self._menu_index.get(keyword, ())}:
+                row[column] = row.get(column, 0) + MENU_WEIGHT
+            for column in self._price_index.get(price, []):
+                row[column] = row.get(column, 0) + PRICE_WEIGHT
+            rows.append({self.cheese_ids[c]: score for c, score in row.items()})
+        return rows
+
+    def match_batch(
+        self,
+        restaurants: List[Dict[str, Any]],
+        k: int = 3,
+        processes: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Recommend cheeses for each restaurant
+
+        Args:
+            restaurants: Google Places data or Geoapify properties
+            k: Number of ranked cheeses returned per restaurant
+            processes: Extract review features across this many processes
+
+        Returns:
+            One dict per restaurant with primary_cheese, secondary_cheese,
+            confidence ('high' / 'medium' / 'low'), top_cheeses (up to k
+            {'id', 'score'}, best first) and scores (per catalog cheese)
+        """
+        rows = self.score_batch(restaurants, processes)
+
+        # Similarity is only needed where the rules tie (or nothing matched)
+        tied = [i for i, row in enumerate(rows) if len(self._leaders(row)) != 1]
+        similarities = dict(zip(tied, cheese_index.similarities(
+            [restaurant_profile(restaurants[i]) for i in tied]
+        )))
+
+        return [self._decide(row, similarities.get(i), k) for i, row in enumerate(rows)]
+
+    def match(self, restaurant: Dict[str, Any], k: int = 3) -> Dict[str, Any]:
+        """match_batch for a single restaurant"""
+        return self.match_batch([restaurant], k=k)[0]
+
+    @staticmethod
+    def _leaders(row: Dict[str, int]) -> List[str]:
+        top = max(row.values(), default=0)
+        return [c for c, score in row.items() if score == top] if top else []
+
+    def _decide(self, row: Dict[str, int], similarity: Optional[Dict[str, float]], k: int) -> Dict[str, Any]:
+        leaders = self._leaders(row)
+
+        if len(leaders) == 1:
+            ranked = heapq.nlargest(max(k, 2), row, key=lambda c: (row[c], -self._order[c]))
+            top = row[ranked[0]]
+            confidence = "high" if top >= HIGH_CONFIDENCE_SCORE else "medium"
+        else:
+            # Tie (or nothing matched): closest cheese by catalog similarity,
+            # else the default cheese
+            similarity = similarity or {}
+            if leaders:
+                candidates = leaders
+            else:
+                # Anything similar, else the default and the first catalog entries
+                candidates = list(dict.fromkeys(
+                    list(similarity) + [DEFAULT_CHEESE] + self.cheese_ids[:max(k, 2)]
+                ))
+            ranked = heapq.nlargest(max(k, 2), candidates, key=lambda c: (
+                similarity.get(c, 0.0), similarity.get(c, 0.0) == 0 and c == DEFAULT_CHEESE, -self._order[c]
+            ))
+            confidence = "low"
+
+        scores = dict.fromkeys(self.cheese_ids, 0)
+        scores.update(row)
+        return {
+            "primary_cheese": ranked[0],
+            "secondary_cheese": ranked[1] if len(ranked) > 1 else None,
+            "confidence": confidence,
+            "top_cheeses": [{"id": c, "score": scores[c]} for c in ranked[:k]],
+            "scores": scores
+        }
+
+
+# Rules compiled once at startup
+cheese_scorer = CheeseScorer()
@@ -5,137 +5,106 @@ Contains full descriptions of artisan cheese products for:
 - Sales pitch generation
 - Semantic matching with restaurant menus
 - Text embeddings for recommendation systems
-"""
-
-# Product catalog
-CHEESE_PRODUCTS = {
-    "pasture_bloom": {
-        "name": "Pasture Bloom Triple Crème",
-        "subtitle": "Seasonal, Bloomy-Rind",
-        "full_description": "A decadent, high-fat, triple-crème cheese infused with a touch of cultured cream and aged just long enough to develop a delicate, edible white rind. Its texture is almost custard-like at room temp, making it ideal for fine-dining dishes like savory pastries, cheese-forward sauces, or composed appetizers. Too rich and delicate for retail, it works beautifully on tasting menus where plating precision and immediate table service keep it at peak quality.",
-
-        # Target customers
-        "target_restaurants": [
-            "fine dining",
-            "French cuisine",
-            "Italian restaurants",
-            "European bistros",
-            "tasting menu restaurants",
-            "upscale seafood"
-        ],
-
-        # Ideal menu applications
-        "ideal_uses": [
-            "Savory pastries",
-            "Cheese-forward sauces",
-            "Composed appetizers",
-            "Tasting menus",
-            "Cheese plates",
-            "Amuse-bouche",
-            "Paired with champagne/white wine"
-        ],
-
-        # Key selling points
-        "selling_points": [
-            "Luxurious custard-like texture",
-            "Delicate bloomy rind",
-            "High-fat triple crème (perfect for rich dishes)",
-            "Peak quality when served at room temp",
-            "Locally sourced and sustainably crafted",
-            "Small-batch seasonal production",
-            "Ideal for plated presentations"
-        ],
-
-        # Pairing suggestions
-        "pairings": {
-            "proteins": ["Duck", "Scallops", "Lobster", "Prosciutto"],
-            "produce": ["Figs", "Apples", "Pears", "Truffle", "Mushrooms"],
-            "wines": ["Champagne", "Chardonnay", "Sauvignon Blanc"],
-            "flavors": ["Honey", "Herbs", "Light citrus", "Toasted nuts"]
-        },
-
-        # Price tier (for B2B sales)
-        "price_tier": "premium",
-        "typical_price_lb": "$32-38",
-
-        # Production details
-        "production": {
-            "batch_size": "Small-batch",
-            "availability": "Seasonal",
-            "lead_time_days": 7,
-            "minimum_order_lbs": 3
-        }
-    },
-
-    "smoky_alder": {
-        "name": "Smoky Alder Wash Rind",
-        "subtitle": "Small-Batch, Semi-Soft",
-        "full_description": "A pungent, washed-rind cheese matured with a house brine and cold-smoked over locally sourced alder wood. It delivers deep umami and subtle smoke that pairs perfectly with elevated tavern menus, gastropub burgers, charcuterie programs, and wood-fired dishes. Its assertive aroma makes it unsuitable for grocery shelves but highly prized by chefs who want a bold, signature flavor component.",
-
-        # Target customers
-        "target_restaurants": [
-            "gastropubs",
-            "taverns",
-            "upscale American",
-            "wood-fired restaurants",
-            "craft beer bars",
-            "burger joints (elevated)",
-            "charcuterie-focused"
-        ],
-
-        # Ideal menu applications
-        "ideal_uses": [
-            "Gastropub burgers",
-            "Charcuterie boards",
-            "Wood-fired pizzas",
-            "Mac and cheese",
-            "Grilled cheese sandwiches",
-            "Beer pairing menus",
-            "Smoked meat dishes"
-        ],
-
-        # Key selling points
-        "selling_points": [
-            "Bold, assertive flavor profile",
-            "Locally sourced alder wood smoking",
-            "Deep umami character",
-            "Washed-rind complexity",
-            "Perfect for elevated pub fare",
-            "Pairs beautifully with craft beer",
-            "Signature ingredient for menu differentiation"
-        ],
-
-        # Pairing suggestions
-        "pairings": {
-            "proteins": ["Bacon", "Brisket", "Short rib", "Pulled pork", "Sausage"],
-            "produce": ["Caramelized onions", "Roasted peppers", "Pickles", "Arugula"],
-            "beverages": ["IPA", "Stout", "Porter", "Rye whiskey", "Red wine"],
-            "flavors": ["Smoke", "Mustard", "BBQ sauce", "Pickled vegetables"]
-        },
-
-        # Price tier (for B2B sales)
-        "price_tier": "mid-premium",
-        "typical_price_lb": "$24-28",
-
-        # Production details
-        "production": {
-            "batch_size": "Small-batch",
-            "availability": "Year-round",
-            "lead_time_days": 5,
-            "minimum_order_lbs": 5
-        }
-    }
-}
-
-
-def get_cheese_by_id(cheese_id: str) -> dict:
-    """Get cheese product details by ID"""
-    return CHEESE_PRODUCTS.get(cheese_id)
 
+Products live in data/cheese_catalog.json (one entry per SKU) and are
+loaded once at import into indexed lookups: pairing ingredient -> SKUs,
+target restaurant type -> SKUs, plus the Claude context and embedding
+text of every SKU, so nothing is rebuilt per request.
 
-def get_all_cheeses() -> dict:
-    """Get all cheese products"""
-    return CHEESE_PRODUCTS
+Each SKU has: name, subtitle, full_description, target_restaurants,
+ideal_uses, selling_points, pairings (groups of ingredients / drinks),
+match_rules (see cheese_matching.py), price_tier, typical_price_lb and
+production (batch size, availability, lead time, minimum order).
+"""
+import json
+import re
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+CATALOG_PATH = Path(__file__).parent / 'data' / 'cheese_catalog.json'
+
+# Words in target restaurant descriptions that don't identify a type
+_GENERIC_TYPE_WORDS = {'restaurant', 'cuisine', 'elevated', 'focused', 'joint'}
+
+
+def _type_terms(text: str) -> List[str]:
+    """'European bistros' / 'french_restaurant' -> ['european', 'bistro'] / ['french']"""
+    terms = []
+    for word in re.findall(r"[a-z]+", text.lower()):
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        if len(word) >= 3 and word not in _GENERIC_TYPE_WORDS:
+            terms.append(word)
+    return terms
+
+
+class CheeseCatalog:
+    """Cheese SKUs with lookups precomputed at load time"""
+
+    def __init__(self, products: Dict[str, Dict[str, Any]]):
+        """
+        Index the products
+
+        Args:
+            products: cheese_id -> product dict (see data/cheese_catalog.json)
+        """
+        self.products = products
+        self.by_pairing: Dict[str, List[str]] = {}
+        self.by_target_type: Dict[str, List[str]] = {}
+        self.contexts: Dict[str, str] = {}
+        self.embedding_texts: Dict[str, str] = {}
+
+        for cheese_id, cheese in products.items():
+            for values in cheese['pairings'].values():
+                for ingredient in values:
+                    self.by_pairing.setdefault(ingredient.lower(), []).append(cheese_id)
+            for target in cheese['target_restaurants']:
+                for term in set(_type_terms(target)):
+                    self.by_target_type.setdefault(term, []).append(cheese_id)
+            self.contexts[cheese_id] = build_cheese_context(cheese)
+            self.embedding_texts[cheese_id] = _embedding_text(cheese)
+
+    @classmethod
+    def load(cls, path: Path = CATALOG_PATH) -> 'CheeseCatalog':
+        """Load the catalog from its JSON data file"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def get(self, cheese_id: str) -> Optional[Dict[str, Any]]:
+        return self.products.get(cheese_id)
+
+    def for_pairing(self, ingredient: str) -> List[str]:
+        """SKUs that list an ingredient among their pairings"""
+        return list(self.by_pairing.get(ingredient.lower(), []))
+
+    def for_restaurant_type(self, restaurant_type: str) -> List[str]:
+        """SKUs targeting a restaurant type (free text or a type id like 'french_restaurant')"""
+        found: List[str] = []
+        for term in _type_terms(restaurant_type):
+            for cheese_id in self.by_target_type.get(term, []):
+                if cheese_id not in found:
+                    found.append(cheese_id)
+        return found
+
+    def context(self, cheese_id: str) -> str:
+        """Precomputed cheese context for Claude prompts"""
+        return self.contexts[cheese_id]
+
+
+def build_cheese_context(cheese: Dict[str, Any]) -> str:
+    """Build cheese context string for Claude"""
+    context = f"{cheese['name']} ({cheese['subtitle']})\n\n"
+    context += f"Description: {cheese['full_description']}\n\n"
+    context += f"Ideal Uses: {', '.join(cheese['ideal_uses'][:5])}\n"
+    context += f"Key Selling Points: {', '.join(cheese['selling_points'])}\n"
+    pairings = cheese['pairings']
+    beverages = pairings.get('beverages', pairings.get('wines', []))
+    context += f"Pairs well with - Proteins: {', '.join(pairings['proteins'])}; "
+    context += f"Produce: {', '.join(pairings['produce'])}; "
+    context += f"Beverages: {', '.join(beverages)}\n"
+    context += f"Price: {cheese['typical_price_lb']} per lb\n"
+    return context
 
 
 def get_cheese_for_embedding(cheese_id: str) -> str:
@@ -147,9 +116,15 @@ def get_cheese_for_embedding(cheese_id: str) -> str:
     - Semantic search
     - Vector similarity matching
     """
-    cheese = CHEESE_PRODUCTS.get(cheese_id)
-    if not cheese:
-        return ""
+    return catalog.embedding_texts.get(cheese_id, "")
+
+
+def _embedding_text(cheese: Dict[str, Any]) -> str:
+    # Pairing groups differ per cheese (e.g. wines vs. beverages)
+    pairings = '\n'.join(
+        f"    - {group.capitalize()}: {', '.join(values)}"
+        for group, values in cheese['pairings'].items()
+    )
 
     # Concatenate all relevant text
     embedding_text = f"""
@@ -164,15 +139,26 @@ def get_cheese_for_embedding(cheese_id: str) -> str:
     Key Selling Points: {', '.join(cheese['selling_points'])}
 
     Pairs Well With:
-    - Proteins: {', '.join(cheese['pairings']['proteins'])}
-    - Produce: {', '.join(cheese['pairings']['produce'])}
-    - Beverages: {', '.join(cheese['pairings']['beverages'])}
-    - Flavors: {', '.join(cheese['pairings']['flavors'])}
+{pairings}
     """
 
     return embedding_text.strip()
 
 
+def get_cheese_by_id(cheese_id: str) -> dict:
+    """Get cheese product details by ID"""
+    return catalog.get(cheese_id)
+
+
+def get_all_cheeses() -> dict:
+    """Get all cheese products"""
+    return CHEESE_PRODUCTS
+
+
+# Product catalog, loaded and indexed once
+catalog = CheeseCatalog.load()
+CHEESE_PRODUCTS = catalog.products
+
 # Helper for quick access
 PASTURE_BLOOM = CHEESE_PRODUCTS["pasture_bloom"]
 SMOKY_ALDER = CHEESE_PRODUCTS["smoky_alder"]
@@ -0,0 +1,181 @@
+"""
+Vector Cheese Matching for Happy Pastures Creamery
+
+Local TF-IDF matching of restaurants against the cheese catalog - no
+embedding API, no network. Text is hashed into a fixed number of buckets
+(unigrams and bigrams), so there is no vocabulary to fit or store.
+
+Catalog vectors (from cheese_products.get_cheese_for_embedding) are built
+once at import. A whole prospect list is vectorized together and scored
+against every cheese with one matrix multiply when numpy is installed.
+Without numpy, an inverted index (bucket -> cheeses using it) keeps the
+cost per restaurant proportional to its terms, not to the catalog size.
+"""
+import heapq
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional: pure-Python scoring below
+    np = None
+
+from cheese_products import CHEESE_PRODUCTS, get_cheese_for_embedding
+
+
+N_FEATURES = 2 ** 12
+
+STOP_WORDS = {
+    'the', 'and', 'for', 'with', 'was', 'were', 'this', 'that', 'our', 'are', 'but', 'not', 'you',
+    'they', 'have', 'had', 'its', 'from', 'just', 'very', 'too', 'all', 'can', 'will', 'what',
+    'when', 'there', 'their', 'here', 'also', 'been', 'out', 'get', 'got', 'one', 'really',
+    # Says nothing about which cheese fits
+    'restaurant', 'restaurants', 'catering', 'food', 'place', 'establishment', 'point', 'interest',
+}
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words (crude plural stripping) plus adjacent-word bigrams"""
+    words = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) < 3 or word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.append(word)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _bucket(term: str, n_features: int) -> int:
+    # crc32 is stable across processes (unlike hash())
+    return zlib.crc32(term.encode('utf-8')) % n_features
+
+
+def restaurant_profile(restaurant: Dict[str, Any]) -> str:
+    """
+    Text describing a restaurant for matching
+
+    Works with Google Places data (types, reviews) and Geoapify properties
+    (categories); underscores and dots in type ids become spaces.
+    """
+    parts = [restaurant.get('name') or '']
+    for type_id in list(restaurant.get('types', [])) + list(restaurant.get('categories', [])):
+        parts.append(type_id.replace('_', ' ').replace('.', ' '))
+    for review in restaurant.get('reviews', []):
+        parts.append(review.get('text', ''))
+    return ' '.join(parts)
+
+
+class CheeseVectorIndex:
+    """TF-IDF vectors of the cheese catalog, scored against restaurants in batches"""
+
+    def __init__(self, cheese_ids: Optional[List[str]] = None, n_features: int = N_FEATURES):
+        """
+        Build the catalog vectors
+
+        Args:
+            cheese_ids: Cheeses to index (default: whole catalog)
+            n_features: Number of hash buckets
+        """
+        self.cheese_ids = list(cheese_ids or CHEESE_PRODUCTS)
+        self.n_features = n_features
+
+        counts = [self._bucket_counts(get_cheese_for_embedding(cheese_id)) for cheese_id in self.cheese_ids]
+
+        # Smoothed IDF; terms no cheese uses get the maximum weight
+        n_docs = len(counts)
+        doc_freq: Counter = Counter()
+        for doc in counts:
+            doc_freq.update(doc.keys())
+        self._idf = {b: math.log((1 + n_docs) / (1 + df)) + 1 for b, df in doc_freq.items()}
+        self._unseen_idf = math.log(1 + n_docs) + 1
+
+        self._vectors = [self._weigh(doc) for doc in counts]
+        self._order = {cheese_id: i for i, cheese_id in enumerate(self.cheese_ids)}
+
+        # bucket -> [(cheese column, weight)] for the pure-Python path
+        self._postings: Dict[int, List[Tuple[int, float]]] = {}
+        for column, vector in enumerate(self._vectors):
+            for b, weight in vector.items():
+                self._postings.setdefault(b, []).append((column, weight))
+
+        # Dense (n_features x n_cheeses) matrix for the numpy path
+        self._matrix = None
+        if np is not None:
+            self._matrix = np.zeros((n_features, len(self.cheese_ids)), dtype=np.float32)
+            for column, vector in enumerate(self._vectors):
+                for b, weight in vector.items():
+                    self._matrix[b, column] = weight
+
+    def _bucket_counts(self, text: str) -> Counter:
+        return Counter(_bucket(term, self.n_features) for term in tokenize(text))
+
+    def _weigh(self, counts: Counter) -> Dict[int, float]:
+        """Sublinear TF x IDF, L2-normalized"""
+        vector = {
+            b: (1 + math.log(count)) * self._idf.get(b, self._unseen_idf)
+            for b, count in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {b: w / norm for b, w in vector.items()} if norm else {}
+
+    def vectorize(self, texts: List[str]) -> List[Dict[int, float]]:
+        """Sparse TF-IDF vectors (bucket -> weight) for a batch of texts"""
+        return [self._weigh(self._bucket_counts(text)) for text in texts]
+
+    def similarities(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Cosine similarity of every text to the cheeses
+
+        Returns:
+            One {cheese_id: similarity} dict per text, with only the
+            cheeses sharing at least one term (similarity > 0)
+        """
+        vectors = self.vectorize(texts)
+        if not vectors:
+            return []
+
+        if self._matrix is not None:
+            queries = np.zeros((len(vectors), self.n_features), dtype=np.float32)
+            for row, vector in enumerate(vectors):
+                for b, weight in vector.items():
+                    queries[row, b] = weight
+            return [
+                {self.cheese_ids[c]: float(row[c]) for c in row.nonzero()[0]}
+                for row in queries @ self._matrix
+            ]
+
+        results = []
+        for vector in vectors:
+            scores: Dict[int, float] = {}
+            for b, w in vector.items():
+                for column, weight in self._postings.get(b, ()):
+                    scores[column] = scores.get(column, 0.0) + w * weight
+            results.append({self.cheese_ids[c]: s for c, s in scores.items() if s > 0})
+        return results
+
+    def top_k(self, texts: List[str], k: int = 2) -> List[List[Tuple[str, float]]]:
+        """
+        Best-matching cheeses for each text
+
+        Returns:
+            Per text, up to k (cheese_id, similarity > 0) pairs, best first
+            (catalog order on ties)
+        """
+        return [
+            heapq.nlargest(k, row.items(), key=lambda item: (item[1], -self._order[item[0]]))
+            for row in self.similarities(texts)
+        ]
+
+    def match_restaurants(self, restaurants: List[Dict[str, Any]], k: int = 2) -> List[List[Tuple[str, float]]]:
+        """top_k for restaurant dicts (see restaurant_profile)"""
+        return self.top_k([restaurant_profile(r) for r in restaurants], k=k)
+
+
+# Catalog vectors, built once at startup
+cheese_index = CheeseVectorIndex()
@@ -0,0 +1,293 @@
+"""
+Circuit Breakers for Happy Pastures Creamery
+
+One breaker per upstream and operation (e.g. anthropic/classify_batch,
+google_places/place_details). When recent calls mostly fail or are
+slower than the operation's latency limit, the breaker opens and calls
+are rejected immediately with CircuitOpenError, so callers take their
+degraded path (keyword filtering, the local pitch) at once instead of
+waiting out a timeout per call.
+
+After `open_seconds` the breaker lets a single probe call through
+(half-open): if it succeeds in time the breaker closes, otherwise it
+stays open for another period.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from telemetry import metrics, METRIC_PREFIX
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# HTTP statuses that mean the upstream is struggling (other 4xx are our own mistakes)
+FAILURE_STATUSES = {408, 429, 500, 502, 503, 504, 529}
+
+CIRCUIT_REJECTIONS = f'{METRIC_PREFIX}_circuit_rejections_total'
+CIRCUIT_TRANSITIONS = f'{METRIC_PREFIX}_circuit_transitions_total'
+
+metrics.describe(CIRCUIT_REJECTIONS, 'counter', 'Calls rejected by an open circuit breaker')
+metrics.describe(CIRCUIT_TRANSITIONS, 'counter', 'Circuit breaker state changes, per new state')
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+    def __init__(self, provider: str, operation: str, retry_after: float):
+        super().__init__(f"{provider} {operation} is unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.provider = provider
+        self.operation = operation
+        self.retry_after = retry_after
+
+
+def is_failure(status: Any) -> bool:
+    """Whether a call outcome counts against the upstream"""
+    return status == 'error' or status in FAILURE_STATUSES
+
+
+class CircuitBreaker:
+    """Rolling-window breaker for one upstream operation"""
+
+    def __init__(
+        self,
+        provider: str,
+        operation: str,
+        window_seconds: float,
+        min_calls: int,
+        failure_rate: float,
+        slow_rate: float,
+        open_seconds: float
+    ):
+        self.provider = provider
+        self.operation = operation
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._calls: deque = deque()  # (time, failed, slow)
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _transition(self, state: str, reason: str = '') -> None:
+        # Caller holds the lock
+        self.state = state
+        metrics.inc(CIRCUIT_TRANSITIONS, provider=self.provider, operation=self.operation, state=state)
+        log = logger.warning if state == OPEN else logger.info
+        log("Circuit %s %s %s%s", self.provider, self.operation, state, f" ({reason})" if reason else '',
+            extra={'provider': self.provider, 'operation': self.operation, 'state': state})
+
+    def _prune(self, now: float) -> None:
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            self._calls.popleft()
+
+    def acquire(self) -> None:
+        """
+        Permission to make one call
+
+        Raises:
+            CircuitOpenError: While open, or while a half-open probe is in flight
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            ready_at = self._opened_at + self.open_seconds
+            if self.state == OPEN and now >= ready_at:
+                self._transition(HALF_OPEN)
+                self._probe_started = None
+            # One probe at a time; a probe that never reported is replaced
+            if self.state == HALF_OPEN and (self._probe_started is None
+                                            or now - self._probe_started > self.open_seconds):
+                self._probe_started = now
+                return
+            self.rejected += 1
+        metrics.inc(CIRCUIT_REJECTIONS, provider=self.provider, operation=self.operation)
+        raise CircuitOpenError(self.provider, self.operation, max(0.0, ready_at - now))
+
+    def record(self, failed: bool, slow: bool) -> None:
+        """Outcome of a call made with acquire()"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._probe_started = None
+                if failed or slow:
+                    self._opened_at = now
+                    self._transition(OPEN, 'probe failed' if failed else 'probe slow')
+                else:
+                    self._calls.clear()
+                    self._transition(CLOSED, 'probe succeeded')
+                return
+            if self.state == OPEN:
+                return  # A call from before the breaker opened
+
+            self._calls.append((now, failed, slow))
+            self._prune(now)
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, f, _ in self._calls if f)
+            slow_calls = sum(1 for _, f, s in self._calls if s and not f)
+            if failures / total >= self.failure_rate:
+                reason = f"{failures}/{total} calls failed"
+            elif slow_calls / total >= self.slow_rate:
+                reason = f"{slow_calls}/{total} calls slow"
+            else:
+                return
+            self._opened_at = now
+            self.times_opened += 1
+            self._transition(OPEN, reason)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            total = len(self._calls)
+            return {
+                'state': self.state,
+                'window_calls': total,
+                'window_failures': sum(1 for _, f, _ in self._calls if f),
+                'window_slow': sum(1 for _, f, s in self._calls if s and not f),
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+                'retry_in_seconds': round(max(0.0, self._opened_at + self.open_seconds - now), 1)
+                if self.state == OPEN else None,
+            }
+
+
+class _CallOutcome:
+    """Filled in by the code inside breakers.guard()"""
+
+    __slots__ = ('status',)
+
+    def __init__(self):
+        self.status: Any = None
+
+
+class CircuitBreakers:
+    """Breakers for every upstream operation, created on first use"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        window_seconds: float = 60,
+        min_calls: int = 4,
+        failure_rate: float = 0.5,
+        slow_rate: float = 0.8,
+        open_seconds: float = 30,
+        slow_call_ms: float = 5000
+    ):
+        """
+        Args:
+            enabled: Use breakers at all (off: every call goes through)
+            window_seconds: Calls considered when deciding to open
+            min_calls: Calls needed in the window before the breaker can open
+            failure_rate: Open when this share of calls failed
+            slow_rate: ...or when this share was slower than the latency limit
+            open_seconds: How long to reject calls before probing
+            slow_call_ms: Latency limit for operations that don't pass their own
+        """
+        self._lock = threading.Lock()
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self.configure(enabled, window_seconds, min_calls, failure_rate, slow_rate, open_seconds, slow_call_ms)
+
+    def configure(
+        self,
+        enabled: bool = True,
+        window_seconds: float = 60,
+        min_calls: int = 4,
+        failure_rate: float = 0.5,
+        slow_rate: float = 0.8,
+        open_seconds: float = 30,
+        slow_call_ms: float = 5000
+    ) -> None:
+        """Set breaker options (used by the API at startup); resets all breakers"""
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.slow_call_ms = slow_call_ms
+        with self._lock:
+            self._breakers.clear()
+
+    def get(self, provider: str, operation: str) -> CircuitBreaker:
+        key = (provider, operation)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(
+                    provider, operation, self.window_seconds, self.min_calls,
+                    self.failure_rate, self.slow_rate, self.open_seconds
+                )
+            return breaker
+
+    def is_open(self, provider: str, operation: str) -> bool:
+        """Whether calls would currently be rejected (without taking a probe slot)"""
+        if not self.enabled:
+            return False
+        breaker = self.get(provider, operation)
+        with breaker._lock:
+            return breaker.state == OPEN and time.monotonic() < breaker._opened_at + breaker.open_seconds
+
+    @contextmanager
+    def guard(self, provider: str, operation: str, slow_call_ms: Optional[float] = None) -> Iterator[_CallOutcome]:
+        """
+        Wrap one upstream call: rejects it while the circuit is open, then
+        records its outcome. Set `.status` on the yielded object to the
+        response's HTTP status; an exception counts as a failure.
+
+            with breakers.guard('google_places', 'place_details') as call:
+                response = requests.get(...)
+                call.status = response.status_code
+
+        Args:
+            provider: Upstream, as in the cost ledger ('anthropic', ...)
+            operation: What the call is for (e.g. 'classify_batch')
+            slow_call_ms: Latency limit for this call (default: slow_call_ms)
+
+        Raises:
+            CircuitOpenError: If the circuit is open (the call isn't made)
+        """
+        outcome = _CallOutcome()
+        if not self.enabled:
+            yield outcome
+            return
+        breaker = self.get(provider, operation)
+        breaker.acquire()
+        start = time.perf_counter()
+        try:
+            yield outcome
+        except Exception:
+            breaker.record(failed=True, slow=False)
+            raise
+        latency_ms = (time.perf_counter() - start) * 1000
+        limit = slow_call_ms if slow_call_ms is not None else self.slow_call_ms
+        breaker.record(failed=is_failure(outcome.status), slow=latency_ms > limit)
+
+    def summary(self) -> Dict[str, Any]:
+        """State of every breaker, per provider and operation"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        result: Dict[str, Any] = {'enabled': self.enabled, 'providers': {}}
+        for breaker in sorted(breakers, key=lambda b: (b.provider, b.operation)):
+            result['providers'].setdefault(breaker.provider, {})[breaker.operation] = breaker.summary()
+        return result
+
+
+# Shared breakers for the whole process
+breakers = CircuitBreakers()
@@ -35,6 +35,14 @@ FOURSQUARE_SERVICE_API_KEY = os.getenv('FOURSQUARE_SERVICE_API_KEY')
 GOOGLE_PLACES_API_KEY = os.getenv('GOOGLE_PLACES_API_KEY')
 # Google Places API Key (reliable, paid option - $200 free credit for new accounts)
 
+# ============================================================================
+# Upstream API base URLs (point these at local stubs to benchmark offline,
+# see tests/benchmarks)
+# ============================================================================
+GEOAPIFY_BASE_URL = os.getenv('GEOAPIFY_BASE_URL', 'https://api.geoapify.com').rstrip('/')
+GOOGLE_PLACES_BASE_URL = os.getenv('GOOGLE_PLACES_BASE_URL', 'https://places.googleapis.com').rstrip('/')
+ANTHROPIC_BASE_URL = os.getenv('ANTHROPIC_BASE_URL', 'https://api.anthropic.com').rstrip('/')
+
 # ============================================================================
 # Search Configuration
 # ============================================================================
@@ -44,3 +52,87 @@ DEFAULT_RESULT_LIMIT = 100
 
 # Use LLM filtering by default (more accurate)
 USE_LLM_FILTERING = True
+
+# ============================================================================
+# Local Storage
+# ============================================================================
+DATA_DIR = os.getenv('HPC_DATA_DIR', str(Path(__file__).parent.parent / 'data'))
+PLACE_STORE_PATH = os.path.join(DATA_DIR, 'places.sqlite')  # Geoapify -> Google place ids
+
+# ============================================================================
+# Google Places Enrichment
+# ============================================================================
+GOOGLE_BULK_MAX_CONCURRENCY = 5  # Lookups in flight at once for bulk enrichment
+GOOGLE_ENRICH_BUDGET_USD = float(os.getenv('GOOGLE_ENRICH_BUDGET_USD', '1.00'))  # Max spend per bulk call
+
+# ============================================================================
+# Cost Budgets (see /api/metrics/costs)
+# ============================================================================
+# Once a cap is reached we stop calling Claude: keyword filtering for
+# prospects, template pitches, and 429s for refinements.
+DAILY_COST_BUDGET_USD = float(os.getenv('DAILY_COST_BUDGET_USD', '10.00'))
+REQUEST_COST_BUDGET_USD = float(os.getenv('REQUEST_COST_BUDGET_USD', '0.25'))
+
+# ============================================================================
+# Pitch Refinement
+# ============================================================================
+# Render all persona variants in the background once a pitch exists
+PERSONA_PRERENDER_ENABLED = os.getenv('PERSONA_PRERENDER_ENABLED', 'true').lower() == 'true'
+PERSONA_PRERENDER_CONCURRENCY = 4  # Max background refinement calls in flight
+
+# How long /api/pitch waits for Claude before returning the locally built
+# pitch (with an upgrade token for the Claude version)
+PITCH_LLM_DEADLINE_SECONDS = float(os.getenv('PITCH_LLM_DEADLINE_SECONDS', '20'))
+PITCH_UPGRADE_CONCURRENCY = 4  # Max background pitch generations in flight
+
+# Nightly batch pitches (batch_pitches.py) are served by /api/pitch while fresh
+PITCH_CACHE_MAX_AGE_HOURS = float(os.getenv('PITCH_CACHE_MAX_AGE_HOURS', '36'))
+BATCH_POLL_INTERVAL_SECONDS = 60
+
+# ============================================================================
+# Model Routing
+# ============================================================================
+# Models per operation are set in model_router.OPERATION_ROUTES. When
+# adaptive, an operation whose model misses its p95 latency SLO is moved
+# one tier down to a faster model until latency recovers.
+MODEL_ROUTING_ADAPTIVE = os.getenv('MODEL_ROUTING_ADAPTIVE', 'true').lower() == 'true'
+
+# Request hedging: if a Claude call hasn't answered by its operation's p90,
+# send a duplicate and take the first response. Off by default; at most
+# LLM_HEDGE_BUDGET_RATIO of eligible calls are hedged.
+LLM_HEDGING_ENABLED = os.getenv('LLM_HEDGING_ENABLED', 'false').lower() == 'true'
+LLM_HEDGE_BUDGET_RATIO = float(os.getenv('LLM_HEDGE_BUDGET_RATIO', '0.10'))
+LLM_HEDGE_OPERATIONS = ['pitch', 'refine', 'micro']  # Operations or prefixes
+
+# Circuit breakers, one per upstream and operation: open when at least
+# CIRCUIT_FAILURE_RATE of the calls in the window failed (timeouts, 429,
+# 5xx) or 80% were slower than the limit (Claude: the operation's SLO).
+# While open, calls fail at once and callers use keyword filtering / the
+# local pitch; after CIRCUIT_OPEN_SECONDS one probe call tests recovery.
+CIRCUIT_BREAKERS_ENABLED = os.getenv('CIRCUIT_BREAKERS_ENABLED', 'true').lower() == 'true'
+CIRCUIT_FAILURE_RATE = float(os.getenv('CIRCUIT_FAILURE_RATE', '0.5'))
+CIRCUIT_OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', '30'))
+CIRCUIT_WINDOW_SECONDS = 60
+CIRCUIT_MIN_CALLS = 4  # Calls in the window before a breaker may open
+
+# ============================================================================
+# Admin / Profiling
+# ============================================================================
+# Token for the admin-only profiling tools (X-Admin-Token header). Unset
+# disables them: the profile switch is ignored and /api/admin/* is 404.
+ADMIN_TOKEN = os.getenv('HPC_ADMIN_TOKEN')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+PROFILE_MAX_SECONDS = 60  # Sampling stops after this long
+MEMORY_TRACE_FRAMES = int(os.getenv('MEMORY_TRACE_FRAMES', '1'))  # tracemalloc traceback depth
+
+# ============================================================================
+# Logging
+# ============================================================================
+# Structured logs go through a queue to a background writer thread.
+# LOG_FORMAT is 'json' (one object per line) or 'text' for development.
+# Per-batch detail is DEBUG; LOG_DEBUG_SAMPLE_RATE keeps it for a share
+# of requests when LOG_LEVEL=DEBUG.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+LOG_QUEUE_SIZE = 10000  # Records buffered before new ones are dropped
@@ -0,0 +1,261 @@
+"""
+Cost & Token Ledger for Happy Pastures Creamery
+
+Records what every outbound Geoapify, Google Places and Anthropic call
+actually cost, aggregated per endpoint and per day, and enforces daily and
+per-request budget caps. When a cap is hit, callers switch to their cheap
+paths (keyword filtering, template pitches) instead of calling the LLM.
+"""
+import contextvars
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional
+
+from telemetry import record_upstream
+
+
+# Anthropic pricing (USD per million tokens, as of 2025)
+ANTHROPIC_PRICING = {
+    'claude-sonnet-4-5-20250929': {'input': 3.00, 'output': 15.00, 'cache_read': 0.30, 'cache_write': 3.75},
+    'claude-haiku-4-5-20251001': {'input': 1.00, 'output': 5.00, 'cache_read': 0.10, 'cache_write': 1.25},
+    'claude-3-haiku-20240307': {'input': 0.25, 'output': 1.25, 'cache_read': 0.03, 'cache_write': 0.30},
+}
+
+# Message Batches are billed at half the interactive price
+BATCH_DISCOUNT = 0.5
+
+
+class BudgetExceededError(Exception):
+    """Raised instead of making a paid call once a budget cap is reached"""
+
+
+class _RequestSpend:
+    """Mutable per-request spend counter (shared with worker threads)"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.cost_usd = 0.0
+
+
+_current_request: contextvars.ContextVar[Optional[_RequestSpend]] = contextvars.ContextVar(
+    'cost_ledger_request', default=None
+)
+
+
+def anthropic_cost(model: str, usage: Dict[str, Any], batch: bool = False) -> float:
+    """
+    Compute the cost of one Anthropic call from its `usage` block
+
+    Args:
+        model: Model id
+        usage: Response usage dict (input_tokens, output_tokens, cache_*_input_tokens)
+        batch: Whether it ran through the Message Batches API
+
+    Returns:
+        Cost in USD (0 for unknown models)
+    """
+    pricing = ANTHROPIC_PRICING.get(model)
+    if not pricing:
+        return 0.0
+
+    return (BATCH_DISCOUNT if batch else 1.0) * (
+        usage.get('input_tokens', 0) * pricing['input']
+        + usage.get('output_tokens', 0) * pricing['output']
+        + usage.get('cache_read_input_tokens', 0) * pricing['cache_read']
+        + usage.get('cache_creation_input_tokens', 0) * pricing['cache_write']
+    ) / 1_000_000
+
+
+def start_request(endpoint: str) -> contextvars.Token:
+    """Attribute calls made from here on to `endpoint` (call from middleware)"""
+    return _current_request.set(_RequestSpend(endpoint))
+
+
+def end_request(token: contextvars.Token) -> None:
+    """Stop attributing calls to the current request"""
+    _current_request.reset(token)
+
+
+def current_endpoint() -> str:
+    """Endpoint of the request being served ('background' outside a request)"""
+    request = _current_request.get()
+    return request.endpoint if request else 'background'
+
+
+class CostLedger:
+    """Thread-safe aggregate of outbound call costs, tokens and latency"""
+
+    def __init__(
+        self,
+        daily_budget_usd: Optional[float] = None,
+        request_budget_usd: Optional[float] = None,
+        recent_size: int = 200
+    ):
+        """
+        Initialize the ledger
+
+        Args:
+            daily_budget_usd: Max spend per calendar day (None = unlimited)
+            request_budget_usd: Max spend per API request (None = unlimited)
+            recent_size: Number of individual calls kept for inspection
+        """
+        self.daily_budget_usd = daily_budget_usd
+        self.request_budget_usd = request_budget_usd
+        self._lock = threading.Lock()
+        self._by_day = defaultdict(lambda: defaultdict(self._new_bucket))
+        self._by_endpoint = defaultdict(self._new_bucket)
+        self._by_prompt = defaultdict(self._new_bucket)
+        self._recent = deque(maxlen=recent_size)
+
+    @staticmethod
+    def _new_bucket() -> Dict[str, Any]:
+        return {
+            'calls': 0,
+            'cost_usd': 0.0,
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'cached_tokens': 0,
+            'latency_ms_total': 0.0
+        }
+
+    def configure(
+        self,
+        daily_budget_usd: Optional[float] = None,
+        request_budget_usd: Optional[float] = None
+    ) -> None:
+        """Set budget caps (used by the API at startup)"""
+        self.daily_budget_usd = daily_budget_usd
+        self.request_budget_usd = request_budget_usd
+
+    def record(
+        self,
+        provider: str,
+        sku: str,
+        cost_usd: float = 0.0,
+        latency_ms: float = 0.0,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cached_tokens: int = 0,
+        **extra: Any
+    ) -> None:
+        """
+        Record one outbound call
+
+        Args:
+            provider: 'geoapify', 'google_places' or 'anthropic'
+            sku: Billing unit, e.g. 'text_search:contact' or a model id
+            cost_usd: Computed cost of the call
+            latency_ms: Wall-clock latency
+            input_tokens / output_tokens / cached_tokens: LLM token usage
+            extra: Additional fields kept with the call (e.g. operation,
+                prompt_version - calls with a prompt version are also
+                aggregated per operation@version)
+        """
+        request = _current_request.get()
+        endpoint = request.endpoint if request else 'background'
+        day = time.strftime('%Y-%m-%d')
+
+        with self._lock:
+            buckets = [self._by_day[day][provider], self._by_day[day]['_total'], self._by_endpoint[endpoint]]
+            if extra.get('prompt_version'):
+                buckets.append(self._by_prompt[f"{extra.get('operation')}@{extra['prompt_version']}"])
+
+            for bucket in buckets:
+                bucket['calls'] += 1
+                bucket['cost_usd'] += cost_usd
+                bucket['input_tokens'] += input_tokens
+                bucket['output_tokens'] += output_tokens
+                bucket['cached_tokens'] += cached_tokens
+                bucket['latency_ms_total'] += latency_ms
+
+            if request:
+                request.cost_usd += cost_usd
+
+            self._recent.append({
+                'at': time.time(),
+                'endpoint': endpoint,
+                'provider': provider,
+                'sku': sku,
+                'cost_usd': round(cost_usd, 6),
+                'latency_ms': round(latency_ms, 1),
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+                'cached_tokens': cached_tokens,
+                **extra
+            })
+
+        record_upstream(provider, extra.get('status', 'unknown'), latency_ms, cost_usd)
+
+    def spent_today(self) -> float:
+        """Total spend for the current calendar day"""
+        day = time.strftime('%Y-%m-%d')
+        with self._lock:
+            if day not in self._by_day:
+                return 0.0
+            return self._by_day[day]['_total']['cost_usd']
+
+    def spent_this_request(self) -> float:
+        """Spend attributed to the request being served"""
+        request = _current_request.get()
+        return request.cost_usd if request else 0.0
+
+    def within_budget(self) -> bool:
+        """True if neither the daily nor the per-request cap has been reached"""
+        if self.daily_budget_usd is not None and self.spent_today() >= self.daily_budget_usd:
+            return False
+        if (self.request_budget_usd is not None and _current_request.get() is not None
+                and self.spent_this_request() >= self.request_budget_usd):
+            return False
+        return True
+
+    def check_budget(self) -> None:
+        """Raise BudgetExceededError if a cap has been reached"""
+        if not self.within_budget():
+            raise BudgetExceededError(
+                f"Cost budget reached (today: ${self.spent_today():.2f} of "
+                f"${self.daily_budget_usd or 0:.2f}, this request: ${self.spent_this_request():.3f})"
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregates per day (and provider), per endpoint and per prompt version, plus budgets"""
+
+        def finish(bucket: Dict[str, Any]) -> Dict[str, Any]:
+            calls = bucket['calls']
+            return {
+                'calls': calls,
+                'cost_usd': round(bucket['cost_usd'], 4),
+                'input_tokens': bucket['input_tokens'],
+                'output_tokens': bucket['output_tokens'],
+                'cached_tokens': bucket['cached_tokens'],
+                'avg_latency_ms': round(bucket['latency_ms_total'] / calls, 1) if calls else 0.0
+            }
+
+        with self._lock:
+            by_day = {
+                day: {
+                    'total': finish(providers['_total']),
+                    'by_provider': {p: finish(b) for p, b in providers.items() if p != '_total'}
+                }
+                for day, providers in sorted(self._by_day.items())
+            }
+            by_endpoint = {endpoint: finish(b) for endpoint, b in sorted(self._by_endpoint.items())}
+            by_prompt = {key: finish(b) for key, b in sorted(self._by_prompt.items())}
+            recent = list(self._recent)[-20:]
+
+        return {
+            'by_day': by_day,
+            'by_endpoint': by_endpoint,
+            'by_prompt': by_prompt,
+            'recent_calls': recent,
+            'budgets': {
+                'daily_budget_usd': self.daily_budget_usd,
+                'request_budget_usd': self.request_budget_usd,
+                'spent_today_usd': round(self.spent_today(), 4),
+                'within_budget': self.within_budget()
+            }
+        }
+
+
+# Shared ledger for the whole process
+ledger = CostLedger()
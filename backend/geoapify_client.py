@@ -3,12 +3,24 @@ Geoapify API Client for Restaurant Prospecting
 """
 import requests
 import json
+import logging
+import time
 from typing import Optional, List, Dict, Any
 
+from circuit_breaker import breakers, CircuitOpenError
+from config import GEOAPIFY_BASE_URL
+from cost_ledger import ledger, BudgetExceededError
+from llm_client import call_anthropic
+from prompts import get_prompt
+from telemetry import span
+
+logger = logging.getLogger(__name__)
+
+
 class GeoapifyClient:
     """Client for interacting with Geoapify Places API"""
 
-    BASE_URL = "https://api.geoapify.com/v2/places"
+    BASE_URL = f"{GEOAPIFY_BASE_URL}/v2/places"
 
     # Exclusion lists for post-processing
     EXCLUDED_CATEGORIES = {
@@ -241,56 +253,17 @@ class GeoapifyClient:
             'price_level': props.get('price_level', 'unknown'),
         }
 
-        if target_type == 'fine_dining':
-            prompt = f"""Analyze this restaurant and determine if it's suitable for selling high-end artisan cheese (Pasture Bloom Triple Crème - a delicate, expensive triple crème cheese for fine dining).
-
-Restaurant: {json.dumps(context, indent=2)}
-
-Exclude if:
-- Fast food or chain restaurant (IHOP, McDonald's, Chipotle, etc.)
-- Casual dining (grills, diners, taverns, inns)
-- Pizza places, Asian restaurants, Mexican fast-casual
-- Coffee shops, cafes, bagel shops, delis
-- Any place with casual indicators in name (kitchen, eats, eatery, grill)
-
-Include if:
-- Fine dining (French, Italian, European, steakhouse, upscale seafood)
-- Name suggests upscale (Trattoria, Bistro, Le/La/Chez, etc.)
-- High price level
-
-Answer with just "SUITABLE" or "EXCLUDE" and brief reason."""
-        else:
-            prompt = f"""Analyze this restaurant and determine if it's suitable for selling artisan cheese (any upscale restaurant).
-
-Restaurant: {json.dumps(context, indent=2)}
-
-Exclude if:
-- Fast food or chain restaurant
-- Pizza, Asian, Mexican fast-casual
-- Coffee shops, delis, bagel shops
-
-Include if:
-- Any upscale restaurant, any cuisine
-- Creative menu, quality focus
-
-Answer with just "SUITABLE" or "EXCLUDE" and brief reason."""
+        template = get_prompt('classify:fine_dining' if target_type == 'fine_dining' else 'classify:upscale')
+        prompt = template.render(restaurant_json=json.dumps(context, indent=2))
 
         try:
-            response = requests.post(
-                'https://api.anthropic.com/v1/messages',
-                headers={
-                    'x-api-key': self.anthropic_api_key,
-                    'anthropic-version': '2023-06-01',
-                    'content-type': 'application/json'
-                },
-                json={
-                    'model': 'claude-3-haiku-20240307',  # Fast, cheap model
-                    'max_tokens': 100,
-                    'messages': [
-                        {'role': 'user', 'content': prompt}
-                    ]
-                },
-                timeout=5
+            response = call_anthropic(
+                self.anthropic_api_key,
+                prompt,
+                max_tokens=100,
+                timeout=5,
+                operation='classify',
+                prompt_version=template.version
             )
 
             if response.status_code == 200:
@@ -303,7 +276,7 @@ Answer with just "SUITABLE" or "EXCLUDE" and brief reason."""
 
         except Exception as e:
             # Fall back to keyword filtering on error
-            print(f"LLM classification error: {e}")
+            logger.warning("LLM classification error, keeping restaurant: %s", e)
             return True
 
     def classify_batch_with_llm(self, restaurants: List[Dict], target_type: str) -> List[bool]:
@@ -316,6 +289,10 @@ Answer with just "SUITABLE" or "EXCLUDE" and brief reason."""
 
         Returns:
             List of booleans (True = keep, False = exclude)
+
+        Raises:
+            BudgetExceededError: If the daily or per-request budget runs out
+            CircuitOpenError: If Claude's classify_batch circuit is open
         """
         if not self.anthropic_api_key or not restaurants:
             return [True] * len(restaurants)
@@ -328,55 +305,17 @@ Answer with just "SUITABLE" or "EXCLUDE" and brief reason."""
         restaurants_text = "\n".join(restaurant_list)
 
         # Single unified prompt for high-quality restaurants
-        prompt = f"""Hillary sells premium artisan cheeses ($30-50/lb) and needs high-quality restaurant prospects.
-
-CRITICAL: Cheese/dairy does NOT pair well with Asian cuisines. We must filter out ALL Asian restaurants.
-
-Restaurants to evaluate:
-{restaurants_text}
-
-KEEP if restaurant is:
-✓ Fine dining: French (Bistro, Brasserie), Italian (Trattoria, Osteria), European
-✓ Upscale steakhouses, upscale seafood (like Oceanique)
-✓ Quality casual: Tapas bars (like Tapas Barcelona), upscale cafes (Bluestone Cafe)
-✓ Chef-driven, creative menus, would use artisan ingredients
-✓ Mediterranean, Middle Eastern (if cheese-friendly)
-✓ Likely $20+ entrees, quality-focused
-
-EXCLUDE if:
-✗ No name or "Unknown" - cannot prospect without a proper restaurant name
-✗ Fast food or chains (IHOP, Applebee's, Chipotle, Olive Garden, etc.)
-✗ Obvious casual: diners, "grill", "kitchen", "eats", taverns, sports bars
-✗ Pizza places (unless upscale wood-fired)
-✗ **ANY Asian cuisine**: Chinese, Japanese, Thai, Korean, Vietnamese, Indian, Malaysian, Indonesian, Filipino
-✗ Asian restaurants (even if upscale): Sushi, ramen, pho, curry, dim sum, hibachi, izakaya, yakitori
-✗ Asian-sounding names: Siam, Paragon, Shinsen, Todoroki, Kansaku, Soban, any Japanese/Thai/Chinese/Korean/Indian names
-✗ Mexican fast-casual (burrito, taco shops)
-✗ Coffee shops (unless clearly upscale cafe with food menu)
-✗ Delis, bagel shops, sandwich shops
-
-**IMPORTANT**: Be very strict with Asian cuisine. Even if it looks upscale, if the name sounds Asian or the cuisine is Asian, EXCLUDE it. Cheese does not pair well with Asian food.
-
-When in doubt: Would this restaurant appreciate and USE a $40/lb artisan cheese in their dishes? If yes, KEEP. If no or unsure, EXCLUDE.
-
-For each number: "1. KEEP" or "1. EXCLUDE". One per line."""
+        template = get_prompt('classify_batch')
+        prompt = template.render(restaurants_text=restaurants_text)
 
         try:
-            response = requests.post(
-                'https://api.anthropic.com/v1/messages',
-                headers={
-                    'x-api-key': self.anthropic_api_key,
-                    'anthropic-version': '2023-06-01',
-                    'content-type': 'application/json'
-                },
-                json={
-                    'model': 'claude-3-haiku-20240307',
-                    'max_tokens': 500,
-                    'messages': [
-                        {'role': 'user', 'content': prompt}
-                    ]
-                },
-                timeout=10
+            response = call_anthropic(
+                self.anthropic_api_key,
+                prompt,
+                max_tokens=500,
+                timeout=10,
+                operation='classify_batch',
+                prompt_version=template.version
             )
 
             if response.status_code == 200:
@@ -398,11 +337,15 @@ For each number: "1. KEEP" or "1. EXCLUDE". One per line."""
 
                 return decisions[:len(restaurants)]
             else:
-                print(f"⚠️  LLM API error: {response.status_code}, falling back to keyword filtering")
+                logger.warning("LLM API error %s, falling back to keyword filtering", response.status_code,
+                               extra={'status': response.status_code, 'batch_size': len(restaurants)})
                 return [True] * len(restaurants)
 
+        except (BudgetExceededError, CircuitOpenError):
+            raise
         except Exception as e:
-            print(f"⚠️  LLM error: {e}, falling back to keyword filtering")
+            logger.warning("LLM error, falling back to keyword filtering: %s", e,
+                           extra={'batch_size': len(restaurants)})
             return [True] * len(restaurants)
 
     def filter_results_with_llm(self, results: Dict[str, Any], target_type: str = 'all') -> Dict[str, Any]:
@@ -420,11 +363,11 @@ For each number: "1. KEEP" or "1. EXCLUDE". One per line."""
             return results
 
         if not self.anthropic_api_key:
-            print("⚠️  No Anthropic API key provided, using keyword filtering")
+            logger.info("No Anthropic API key provided, using keyword filtering")
             return self.filter_results(results, target_type)
 
         features = results.get('features', [])
-        print(f"🤖 Using LLM to classify {len(features)} restaurants in batches...")
+        logger.debug("LLM classifying %d restaurants in batches", len(features))
 
         # Process in batches of 20 for better performance
         BATCH_SIZE = 20
@@ -444,15 +387,28 @@ For each number: "1. KEEP" or "1. EXCLUDE". One per line."""
                 })
 
             # Classify batch
-            print(f"   Processing batch {i//BATCH_SIZE + 1}/{(len(features)-1)//BATCH_SIZE + 1}...")
-            decisions = self.classify_batch_with_llm(batch_data, target_type)
+            batch_label = f"batch {i//BATCH_SIZE + 1}/{(len(features)-1)//BATCH_SIZE + 1}"
+            logger.debug("Classifying %s", batch_label, extra={'batch_size': len(batch)})
+            try:
+                with span('llm_batch', description=batch_label):
+                    decisions = self.classify_batch_with_llm(batch_data, target_type)
+            except (BudgetExceededError, CircuitOpenError) as e:
+                # Out of budget, or Claude is down or slow: keyword-filter the rest now instead of
+                # keeping it unfiltered or waiting on per-batch timeouts
+                logger.info("Keyword filtering the remaining %d restaurants: %s", len(features) - i, e)
+                # Same strict filter api.py applies when a request starts out over budget
+                keyword_type = 'fine_dining' if target_type == 'upscale' else target_type
+                remaining = self.filter_results({'features': features[i:]}, keyword_type)
+                filtered_features.extend(remaining['features'])
+                break
 
             # Keep restaurants that passed
             for feature, keep in zip(batch, decisions):
                 if keep:
                     filtered_features.append(feature)
 
-        print(f"✅ LLM kept {len(filtered_features)}/{len(features)} restaurants after filtering\n")
+        logger.info("LLM kept %d/%d restaurants after filtering", len(filtered_features), len(features),
+                    extra={'kept': len(filtered_features), 'total': len(features)})
 
         # Update results with filtered features
         filtered_results = results.copy()
@@ -534,11 +490,17 @@ For each number: "1. KEEP" or "1. EXCLUDE". One per line."""
             params['conditions'] = ','.join(conditions)
 
         try:
-            response = requests.get(self.BASE_URL, params=params)
+            start = time.perf_counter()
+            with breakers.guard('geoapify', 'places') as call:
+                response = requests.get(self.BASE_URL, params=params, timeout=10)
+                call.status = response.status_code
+            # Free tier - recorded for call counts and latency
+            ledger.record('geoapify', 'places', latency_ms=(time.perf_counter() - start) * 1000,
+                          status=response.status_code)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error making API request: {e}")
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
+            logger.error("Geoapify request failed: %s", e)
             return {}
 
     def print_results(self, results: Dict[str, Any]) -> None:
@@ -1,40 +1,117 @@
 """
 Google Places API Client for Menu Data
-Reliable, comprehensive, but paid ($0.017-0.032 per request)
+Reliable, comprehensive, but paid ($0.017-0.040 per request, depending on field tier)
 Free $200 credit for new accounts
 
 Documentation: https://developers.google.com/maps/documentation/places/web-service/overview
 """
 import requests
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import logging
+import threading
 import time
 
+from circuit_breaker import breakers, CircuitOpenError
+from config import GOOGLE_PLACES_BASE_URL
+from ttl_cache import TTLCache
+from review_features import review_features
+from cost_ledger import ledger
+from place_store import PlaceStore, geoapify_source_key
+from place_matching import match_places, plan_coverage
+
+logger = logging.getLogger(__name__)
+
+
+# Field mask tiers, cheapest first. Google bills a call at the SKU of the
+# most expensive field requested, so each tier only adds what callers need:
+# - basic:   identify and place the restaurant (list views)
+# - contact: phone, website, rating, price, hours (list-level enrichment)
+# - reviews: review text (only needed when generating a pitch)
+FIELD_TIERS = ['basic', 'contact', 'reviews']
+TIER_FIELDS = {
+    'basic': ['id', 'displayName', 'formattedAddress', 'location', 'types'],
+    'contact': ['nationalPhoneNumber', 'websiteUri', 'rating', 'userRatingCount',
+                'priceLevel', 'regularOpeningHours'],
+    'reviews': ['reviews']
+}
+
+# Pricing (as of 2024), per call, by the most expensive tier in the field mask
+SEARCH_COST = {'basic': 0.032, 'contact': 0.035, 'reviews': 0.040}  # Text Search
+DETAILS_COST = {'basic': 0.017, 'contact': 0.020, 'reviews': 0.025}  # Place Details
+NEARBY_COST = {'basic': 0.032, 'contact': 0.035, 'reviews': 0.040}  # Nearby Search (up to 20 places)
+
+# Billed Places spend of the lookup running in this context, so bulk
+# enrichment can settle each reservation against what it actually cost
+_lookup_spend: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    'places_lookup_spend', default=None
+)
+
+
+def build_field_mask(tier: str, prefix: str = '', only_tier: bool = False) -> str:
+    """
+    Build an X-Goog-FieldMask value for a tier
+
+    Args:
+        tier: 'basic', 'contact' or 'reviews'
+        prefix: 'places.' for search endpoints, '' for Place Details
+        only_tier: Only this tier's fields (plus id) instead of all tiers up to it
+
+    Returns:
+        Comma-separated field mask
+    """
+    if tier not in TIER_FIELDS:
+        raise ValueError(f"Unknown field tier: {tier}. Must be one of {', '.join(FIELD_TIERS)}")
+
+    if only_tier:
+        fields = ['id'] + TIER_FIELDS[tier]
+    else:
+        fields = []
+        for t in FIELD_TIERS[:FIELD_TIERS.index(tier) + 1]:
+            fields.extend(TIER_FIELDS[t])
+
+    return ','.join(f"{prefix}{field}" for field in dict.fromkeys(fields))
+
 
 class GooglePlacesClient:
     """Client for Google Places API (New)"""
 
-    BASE_URL = "https://places.googleapis.com/v1"
+    BASE_URL = f"{GOOGLE_PLACES_BASE_URL}/v1"
 
-    def __init__(self, api_key: str):
+    # Shared across instances (the API builds a client per request).
+    # Place records (basic/contact tiers) and reviews are cached separately
+    # so list views never pay for reviews and pitches reuse the list lookup.
+    CACHE_TTL_SECONDS = 24 * 3600
+    _place_cache = TTLCache(maxsize=2000, ttl=CACHE_TTL_SECONDS)
+    _reviews_cache = TTLCache(maxsize=2000, ttl=CACHE_TTL_SECONDS)
+
+    def __init__(self, api_key: str, place_store: Optional[PlaceStore] = None):
         """
         Initialize Google Places client
 
         Args:
             api_key: Your Google Places API key
+            place_store: Optional persistent Geoapify -> Google place id mapping
         """
         self.api_key = api_key
+        self.place_store = place_store
         self.headers = {
             'Content-Type': 'application/json',
-            'X-Goog-Api-Key': api_key,
-            'X-Goog-FieldMask': 'places.displayName,places.formattedAddress,places.location,places.rating,places.userRatingCount,places.priceLevel,places.types,places.nationalPhoneNumber,places.websiteUri,places.regularOpeningHours,places.reviews'
+            'X-Goog-Api-Key': api_key
         }
 
+    def _headers_for(self, field_mask: str) -> Dict[str, str]:
+        """Request headers with a specific field mask"""
+        return {**self.headers, 'X-Goog-FieldMask': field_mask}
+
     def search_by_name_and_location(
         self,
         name: str,
         latitude: float,
         longitude: float,
-        radius: int = 100
+        radius: int = 100,
+        tier: str = 'contact'
     ) -> Optional[Dict[str, Any]]:
         """
         Find a specific restaurant by name and location using Text Search
@@ -44,6 +121,7 @@ class GooglePlacesClient:
             latitude: Latitude
             longitude: Longitude
             radius: Search radius in meters (default 100m)
+            tier: Field tier to request ('basic', 'contact' or 'reviews')
 
         Returns:
             Place data or None if not found
@@ -66,12 +144,16 @@ class GooglePlacesClient:
                 "maxResultCount": 1
             }
 
-            response = requests.post(
-                url,
-                headers=self.headers,
-                json=payload,
-                timeout=10
-            )
+            start = time.perf_counter()
+            with breakers.guard('google_places', 'text_search') as call:
+                response = requests.post(
+                    url,
+                    headers=self._headers_for(build_field_mask(tier, prefix='places.')),
+                    json=payload,
+                    timeout=10
+                )
+                call.status = response.status_code
+            self._record_call('text_search', tier, SEARCH_COST[tier], start, response.status_code)
 
             if response.status_code == 200:
                 data = response.json()
@@ -79,76 +161,336 @@ class GooglePlacesClient:
                 if places:
                     return places[0]
             elif response.status_code == 429:
-                print("⚠️  Google Places API rate limit exceeded")
+                logger.warning("Google Places API rate limit exceeded")
             elif response.status_code == 403:
-                print("⚠️  Google Places API error: Check billing is enabled")
+                logger.error("Google Places API error 403: check billing is enabled")
             else:
-                print(f"⚠️  Google Places API error: {response.status_code}")
-                print(f"    Response: {response.text[:200]}")
+                logger.warning("Google Places API error %s: %s", response.status_code, response.text[:200],
+                               extra={'status': response.status_code})
 
             return None
 
+        except CircuitOpenError:
+            return None
         except Exception as e:
-            print(f"Error searching Google Places: {e}")
+            logger.warning("Error searching Google Places: %s", e)
             return None
 
-    def get_place_details(self, place_id: str) -> Optional[Dict[str, Any]]:
+    def search_nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        tier: str = 'contact',
+        max_results: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Find restaurants in a circle using Nearby Search (one call, up to 20 places)
+
+        Args:
+            latitude: Circle center latitude
+            longitude: Circle center longitude
+            radius: Circle radius in meters (max 50000)
+            tier: Field tier to request ('basic' or 'contact')
+            max_results: Max places returned (Google caps this at 20)
+
+        Returns:
+            Raw place records, closest first (empty on error)
+        """
+        try:
+            url = f"{self.BASE_URL}/places:searchNearby"
+
+            payload = {
+                "includedTypes": ["restaurant"],
+                "maxResultCount": min(max_results, 20),
+                "rankPreference": "DISTANCE",
+                "locationRestriction": {
+                    "circle": {
+                        "center": {
+                            "latitude": latitude,
+                            "longitude": longitude
+                        },
+                        "radius": min(radius, 50000.0)
+                    }
+                }
+            }
+
+            start = time.perf_counter()
+            with breakers.guard('google_places', 'nearby_search') as call:
+                response = requests.post(
+                    url,
+                    headers=self._headers_for(build_field_mask(tier, prefix='places.')),
+                    json=payload,
+                    timeout=10
+                )
+                call.status = response.status_code
+            self._record_call('nearby_search', tier, NEARBY_COST[tier], start, response.status_code)
+
+            if response.status_code == 200:
+                return response.json().get('places', [])
+
+            logger.warning("Google Places Nearby Search error %s", response.status_code,
+                           extra={'status': response.status_code})
+            return []
+
+        except CircuitOpenError:
+            return []
+        except Exception as e:
+            logger.warning("Error in Google Places Nearby Search: %s", e)
+            return []
+
+    def get_place_details(
+        self,
+        place_id: str,
+        tier: str = 'contact',
+        only_tier: bool = False
+    ) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a place
 
         Args:
             place_id: Google Places ID
+            tier: Field tier to request ('basic', 'contact' or 'reviews')
+            only_tier: Request just that tier's fields (e.g. reviews alone)
 
         Returns:
             Place details or None
         """
+        _, details = self._request_place_details(place_id, tier, only_tier)
+        return details
+
+    def _request_place_details(
+        self,
+        place_id: str,
+        tier: str,
+        only_tier: bool = False
+    ) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """Place Details call returning (status code, data) so callers can tell 'gone' from 'failed'"""
         try:
             url = f"{self.BASE_URL}/places/{place_id}"
 
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=10
-            )
+            start = time.perf_counter()
+            with breakers.guard('google_places', 'place_details') as call:
+                response = requests.get(
+                    url,
+                    headers=self._headers_for(build_field_mask(tier, only_tier=only_tier)),
+                    timeout=10
+                )
+                call.status = response.status_code
+            self._record_call('place_details', tier, DETAILS_COST[tier], start, response.status_code)
 
             if response.status_code == 200:
-                return response.json()
+                return response.status_code, response.json()
             else:
-                print(f"⚠️  Google Places API error: {response.status_code}")
-                return None
+                logger.warning("Google Places details error %s", response.status_code,
+                               extra={'status': response.status_code})
+                return response.status_code, None
 
+        except CircuitOpenError:
+            return None, None
         except Exception as e:
-            print(f"Error getting place details: {e}")
-            return None
+            logger.warning("Error getting place details: %s", e)
+            return None, None
+
+    def _record_call(self, sku: str, tier: str, cost: float, start: float, status_code: int) -> None:
+        """Record a Places call in the cost ledger (only successful calls are billed)"""
+        billed = cost if status_code == 200 else 0.0
+        ledger.record(
+            'google_places',
+            f"{sku}:{tier}",
+            cost_usd=billed,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            status=status_code
+        )
+
+        spend = _lookup_spend.get()
+        if spend is not None:
+            spend[0] += billed
+
+    def get_reviews(self, place_id: str) -> List[Dict[str, Any]]:
+        """
+        Get raw reviews for a place (reviews tier only, cached per place)
+
+        Args:
+            place_id: Google Places ID
+
+        Returns:
+            List of raw review objects (empty if none or on error)
+        """
+        cached = self._reviews_cache.get(place_id)
+        if cached is not None:
+            return cached
+
+        details = self.get_place_details(place_id, tier='reviews', only_tier=True)
+        if details is None:
+            return []
+
+        reviews = details.get('reviews', [])
+        self._reviews_cache.set(place_id, reviews)
+        return reviews
 
     def enrich_restaurant_data(
         self,
         restaurant_name: str,
         latitude: float,
-        longitude: float
+        longitude: float,
+        tier: str = 'reviews',
+        geoapify_place_id: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Get comprehensive restaurant data including reviews with menu mentions
 
+        The place record and its reviews are cached separately. A 'contact'
+        lookup (list-level) never pays for reviews; a later 'reviews' lookup
+        for the same restaurant reuses the cached record and only fetches the
+        reviews. A cold 'reviews' lookup gets everything in one call.
+
+        With a place store, the Google place id found by the first search is
+        remembered, and later cold lookups use Place Details (cheaper and
+        deterministic) instead of a fuzzy Text Search. If the remembered
+        place is gone, we forget it and search again.
+
         Args:
             restaurant_name: Name of the restaurant
             latitude: Latitude
             longitude: Longitude
+            tier: Highest field tier needed ('basic', 'contact' or 'reviews')
+            geoapify_place_id: Geoapify place_id, for a stable identity
 
         Returns:
             Enriched data with Google Places info
         """
-        # Search for the place
-        place = self.search_by_name_and_location(
-            restaurant_name,
-            latitude,
-            longitude,
-            radius=200  # 200m radius for accuracy
-        )
+        if tier not in TIER_FIELDS:
+            raise ValueError(f"Unknown field tier: {tier}. Must be one of {', '.join(FIELD_TIERS)}")
+
+        source_key = geoapify_source_key(restaurant_name, latitude, longitude, geoapify_place_id)
+        place_tier = 'basic' if tier == 'basic' else 'contact'
+
+        place = self._cached_place(source_key, place_tier)
+
+        reviews = None
+        fetched = place is None
+        if place is None:
+            place = self._resolve_by_known_id(source_key, tier)
+
+            if place is None:
+                # Search for the place
+                place = self.search_by_name_and_location(
+                    restaurant_name,
+                    latitude,
+                    longitude,
+                    radius=200,  # 200m radius for accuracy
+                    tier=tier
+                )
+
+                if not place:
+                    return None
+
+                if self.place_store and place.get('id'):
+                    self.place_store.set_google_place_id(source_key, place['id'])
+
+            if tier == 'reviews':
+                reviews = place.pop('reviews', [])
+                if place.get('id'):
+                    self._reviews_cache.set(place['id'], reviews)
+                place_tier = 'contact'
+            self._place_cache.set((place_tier, source_key), place)
+
+        if tier == 'reviews' and reviews is None:
+            # Record cached at a lower tier: upgrade it with just the reviews
+            return self.load_reviews(self._build_enriched(place, [], latitude, longitude, place_tier))
+
+        enriched = self._build_enriched(place, reviews or [], latitude, longitude, tier)
 
-        if not place:
+        # Keep the record (and review text, for local search) in the place store
+        if self.place_store and (fetched or tier == 'reviews'):
+            self.place_store.save_place(enriched, replace_reviews=(tier == 'reviews'))
+
+        return enriched
+
+    def _cached_place(self, source_key: str, place_tier: str) -> Optional[Dict[str, Any]]:
+        """Cached place record at this tier or richer (records stop at 'contact')"""
+        for cached_tier in FIELD_TIERS[FIELD_TIERS.index(place_tier):2]:
+            place = self._place_cache.get((cached_tier, source_key))
+            if place is not None:
+                return place
+        return None
+
+    def _lookup_cost(self, source_key: str, tier: str) -> float:
+        """
+        Price of the call enrich_restaurant_data will make for a restaurant
+
+        Returns:
+            0 for a cache hit, the Place Details price for a reviews-only
+            upgrade or a remembered place id, otherwise the Text Search price
+        """
+        place = self._cached_place(source_key, 'basic' if tier == 'basic' else 'contact')
+        if place is not None:
+            if tier == 'reviews' and place.get('id') and self._reviews_cache.get(place['id']) is None:
+                return DETAILS_COST['reviews']
+            return 0.0
+
+        if self.place_store and self.place_store.get_google_place_id(source_key):
+            return DETAILS_COST[tier]
+        return SEARCH_COST[tier]
+
+    def _resolve_by_known_id(self, source_key: str, tier: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a place via its remembered Google place id
+
+        Returns:
+            Place record, or None if there's no mapping or the lookup failed
+        """
+        if not self.place_store:
             return None
 
+        google_place_id = self.place_store.get_google_place_id(source_key)
+        if not google_place_id:
+            return None
+
+        status, place = self._request_place_details(google_place_id, tier)
+
+        # Place was removed or its id retired - drop the mapping and re-search
+        if status in (400, 404):
+            self.place_store.forget(source_key)
+
+        return place
+
+    def load_reviews(self, restaurant_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Lazily add reviews to data enriched at a lower tier
+
+        Only the reviews are requested (reviews-only field mask, cached per
+        place), so a list-level record is upgraded for the /api/pitch view
+        without paying for its contact fields again.
+
+        Args:
+            restaurant_data: Output of enrich_restaurant_data
+
+        Returns:
+            The same dict with 'reviews' filled in and tier set to 'reviews'
+        """
+        if restaurant_data.get('tier') == 'reviews' or not restaurant_data.get('place_id'):
+            return restaurant_data
+
+        reviews = self.get_reviews(restaurant_data['place_id'])
+        restaurant_data['reviews'] = self._format_reviews(reviews)
+        restaurant_data['tier'] = 'reviews'
+
+        if self.place_store:
+            self.place_store.save_place(restaurant_data)
+
+        return restaurant_data
+
+    def _build_enriched(
+        self,
+        place: Dict[str, Any],
+        reviews: List[Dict[str, Any]],
+        latitude: float,
+        longitude: float,
+        tier: str
+    ) -> Dict[str, Any]:
+        """Convert a raw Places record into our enriched restaurant dict"""
         # Extract data
         name = place.get('displayName', {}).get('text', 'Unknown')
         address = place.get('formattedAddress', 'No address')
@@ -158,7 +500,7 @@ class GooglePlacesClient:
         types = place.get('types', [])
         phone = place.get('nationalPhoneNumber')
         website = place.get('websiteUri')
-        reviews = place.get('reviews', [])
+        location = place.get('location', {})
 
         # Convert price level
         price_map = {
@@ -181,20 +523,256 @@ class GooglePlacesClient:
             'types': types[:5],  # Limit to 5 types
             'phone': phone,
             'website': website,
+            'place_id': place.get('id'),
+            'latitude': location.get('latitude', latitude),
+            'longitude': location.get('longitude', longitude),
+            'tier': tier,
             'google_maps_url': f"https://www.google.com/maps/search/?api=1&query={latitude},{longitude}&query_place_id={place.get('id', '')}",
-            'reviews': [
-                {
-                    'text': review.get('text', {}).get('text', ''),
-                    'rating': review.get('rating', 0),
-                    'time': review.get('relativePublishTimeDescription', ''),
-                    'author': review.get('authorAttribution', {}).get('displayName', 'Anonymous')
-                }
-                for review in reviews[:5]  # Get up to 5 reviews
-            ]
+            'reviews': self._format_reviews(reviews)
         }
 
         return enriched
 
+    def _format_reviews(self, reviews: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Flatten raw Places reviews into text/rating/time/author dicts"""
+        return [
+            {
+                'text': review.get('text', {}).get('text', ''),
+                'rating': review.get('rating', 0),
+                'time': review.get('relativePublishTimeDescription', ''),
+                'author': review.get('authorAttribution', {}).get('displayName', 'Anonymous')
+            }
+            for review in reviews[:5]  # Get up to 5 reviews
+        ]
+
+    def enrich_restaurants_bulk(
+        self,
+        restaurants: List[Tuple],
+        max_concurrency: int = 5,
+        budget_usd: Optional[float] = None,
+        tier: str = 'contact'
+    ) -> Dict[str, Any]:
+        """
+        Enrich many restaurants concurrently, stopping at a dollar budget
+
+        Each lookup reserves the price of the call it will make before it
+        runs: nothing for a cache hit, Place Details for a remembered place
+        id, otherwise Text Search. Once it's done the reservation is settled
+        against what was actually billed (failed calls are free, a stale
+        place id adds a search). Once the next lookup would exceed the
+        budget, the remaining restaurants are returned with status
+        'skipped_budget'; cache hits are always served.
+
+        Args:
+            restaurants: List of (name, latitude, longitude) or
+                (name, latitude, longitude, geoapify_place_id) tuples
+            max_concurrency: Max lookups in flight at once
+            budget_usd: Max estimated spend for this batch (None = unlimited)
+            tier: Field tier per lookup (default 'contact' - no reviews)
+
+        Returns:
+            Dict with per-item 'results' (in input order) and a 'summary'
+        """
+        spent = 0.0
+        lock = threading.Lock()
+
+        def enrich_one(item: Tuple) -> Dict[str, Any]:
+            nonlocal spent
+            name, latitude, longitude = item[:3]
+            geoapify_place_id = item[3] if len(item) > 3 else None
+            result = self._bulk_result(item, 'skipped_budget', None)
+
+            source_key = geoapify_source_key(name, latitude, longitude, geoapify_place_id)
+
+            # Reserve the cost up front so concurrent workers can't overshoot
+            cost = self._lookup_cost(source_key, tier)
+            with lock:
+                if cost and budget_usd is not None and spent + cost > budget_usd + 1e-9:
+                    return result
+                spent += cost
+
+            # Runs in its own context copy, so this only sees this lookup's calls
+            billed = [0.0]
+            _lookup_spend.set(billed)
+            try:
+                data = self.enrich_restaurant_data(
+                    name, latitude, longitude, tier=tier, geoapify_place_id=geoapify_place_id
+                )
+                result['status'] = 'ok' if data else 'not_found'
+                result['data'] = data
+            except Exception as e:
+                result['status'] = 'error'
+                result['error'] = str(e)
+            finally:
+                with lock:
+                    spent += billed[0] - cost
+
+            return result
+
+        # Each worker runs in a copy of the caller's context so its calls are
+        # attributed to the same request in the cost ledger
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, enrich_one, item)
+                for item in restaurants
+            ]
+            results = [f.result() for f in futures]
+
+        statuses = [r['status'] for r in results]
+        return {
+            'results': results,
+            'summary': {
+                'requested': len(restaurants),
+                'enriched': statuses.count('ok'),
+                'not_found': statuses.count('not_found'),
+                'errors': statuses.count('error'),
+                'skipped_budget': statuses.count('skipped_budget'),
+                'estimated_cost_usd': round(spent, 3),
+                'budget_usd': budget_usd
+            }
+        }
+
+    def enrich_area(
+        self,
+        restaurants: List[Tuple],
+        tier: str = 'contact',
+        max_concurrency: int = 5,
+        budget_usd: Optional[float] = None,
+        places_per_prospect: float = 2.0
+    ) -> Dict[str, Any]:
+        """
+        Enrich a list of restaurants with a few Nearby Search calls
+
+        Instead of one Text Search per restaurant, covers the prospect area
+        with a handful of Nearby Search circles, then matches the returned
+        Google places to our restaurants in bulk (spatial grid join + name
+        similarity). Restaurants already cached are served from the cache,
+        and any left unmatched fall back to per-name search. If covering
+        the area would cost at least as much as searching each restaurant
+        by name (sparse prospects), it searches by name straight away.
+
+        Args:
+            restaurants: List of (name, latitude, longitude[, geoapify_place_id]) tuples
+            tier: Field tier ('basic' or 'contact' - reviews are per-place only)
+            max_concurrency: Max calls in flight at once
+            budget_usd: Max estimated spend (None = unlimited)
+            places_per_prospect: Restaurants Google is expected to list per
+                prospect, for sizing circles under the 20-result cap
+
+        Returns:
+            Same shape as enrich_restaurants_bulk, with a per-item 'match'
+            ('cache', 'area' or 'search') and area stats in the summary
+        """
+        if tier not in ('basic', 'contact'):
+            raise ValueError("Area enrichment supports the 'basic' and 'contact' tiers only")
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(restaurants)
+        pending = []
+
+        # Step 1: Anything we already have is free
+        for index, item in enumerate(restaurants):
+            name, latitude, longitude = item[:3]
+            geoapify_place_id = item[3] if len(item) > 3 else None
+            source_key = geoapify_source_key(name, latitude, longitude, geoapify_place_id)
+            if self._place_cache.get((tier, source_key)) or self._place_cache.get(('contact', source_key)):
+                data = self.enrich_restaurant_data(name, latitude, longitude, tier=tier,
+                                                   geoapify_place_id=geoapify_place_id)
+                results[index] = self._bulk_result(item, 'ok', data, match='cache')
+            else:
+                pending.append(index)
+
+        # Step 2: Cover the rest of the area with a few Nearby Search circles
+        pending_items = [tuple(restaurants[i][:3]) for i in pending]
+        circles = plan_coverage(pending_items, places_per_prospect=places_per_prospect)
+
+        cost_per_call = NEARBY_COST[tier]
+        if len(circles) * cost_per_call >= len(pending) * SEARCH_COST[tier]:
+            # Too spread out to share circles: per-name search is cheaper
+            circles = []
+        affordable = len(circles)
+        if budget_usd is not None:
+            affordable = min(affordable, int((budget_usd + 1e-9) // cost_per_call))
+        circles = circles[:affordable]
+        spent = cost_per_call * len(circles)
+
+        def search_circle(circle: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return self.search_nearby(circle['latitude'], circle['longitude'], circle['radius_m'], tier=tier)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, search_circle, circle)
+                for circle in circles
+            ]
+            google_places = {}
+            for future in futures:
+                for place in future.result():
+                    if place.get('id'):
+                        google_places[place['id']] = place
+
+        # Step 3: Bulk entity resolution
+        matches = match_places(pending_items, list(google_places.values()))
+        for local_index, place in matches.items():
+            index = pending[local_index]
+            item = restaurants[index]
+            name, latitude, longitude = item[:3]
+            geoapify_place_id = item[3] if len(item) > 3 else None
+            source_key = geoapify_source_key(name, latitude, longitude, geoapify_place_id)
+
+            self._place_cache.set((tier, source_key), place)
+            if self.place_store:
+                self.place_store.set_google_place_id(source_key, place['id'])
+
+            enriched = self._build_enriched(place, [], latitude, longitude, tier)
+            if self.place_store:
+                self.place_store.save_place(enriched, replace_reviews=False)
+            results[index] = self._bulk_result(item, 'ok', enriched, match='area')
+
+        # Step 4: Per-name search for whatever the area calls didn't match
+        unmatched = [i for i in pending if results[i] is None]
+        if unmatched:
+            remaining_budget = None if budget_usd is None else max(0.0, budget_usd - spent)
+            fallback = self.enrich_restaurants_bulk(
+                [restaurants[i] for i in unmatched],
+                max_concurrency=max_concurrency,
+                budget_usd=remaining_budget,
+                tier=tier
+            )
+            spent += fallback['summary']['estimated_cost_usd']
+            for index, result in zip(unmatched, fallback['results']):
+                result['match'] = 'search' if result['status'] != 'skipped_budget' else None
+                results[index] = result
+
+        statuses = [r['status'] for r in results]
+        matches_by = [r.get('match') for r in results]
+        return {
+            'results': results,
+            'summary': {
+                'requested': len(restaurants),
+                'enriched': statuses.count('ok'),
+                'not_found': statuses.count('not_found'),
+                'errors': statuses.count('error'),
+                'skipped_budget': statuses.count('skipped_budget'),
+                'from_cache': matches_by.count('cache'),
+                'matched_in_area': matches_by.count('area'),
+                'fallback_searches': len(unmatched),
+                'nearby_calls': len(circles),
+                'estimated_cost_usd': round(spent, 3),
+                'budget_usd': budget_usd
+            }
+        }
+
+    @staticmethod
+    def _bulk_result(item: Tuple, status: str, data: Optional[Dict[str, Any]], **extra: Any) -> Dict[str, Any]:
+        """Per-item result entry for bulk/area enrichment"""
+        return {
+            'name': item[0],
+            'latitude': item[1],
+            'longitude': item[2],
+            'status': status,
+            'data': data,
+            **extra
+        }
+
     def extract_menu_hints_from_reviews(self, reviews: List[Dict[str, Any]]) -> List[str]:
         """
         Extract likely menu items mentioned in reviews
@@ -205,45 +783,23 @@ class GooglePlacesClient:
         Returns:
             List of potential menu items/dishes mentioned
         """
-        food_keywords = [
-            'steak', 'pasta', 'salad', 'burger', 'fish', 'chicken',
-            'lamb', 'pork', 'duck', 'risotto', 'soup', 'dessert',
-            'wine', 'cocktail', 'cheese', 'bread', 'seafood',
-            'lobster', 'crab', 'oyster', 'tuna', 'salmon', 'scallops',
-            'appetizer', 'entree', 'dish', 'special'
-        ]
-
-        menu_hints = []
-        for review in reviews:
-            text = review.get('text', '').lower()
-            # Split into sentences
-            for sentence in text.replace('!', '.').replace('?', '.').split('.'):
-                sentence = sentence.strip()
-                # If sentence mentions food AND is reasonably short
-                if any(food in sentence for food in food_keywords) and 10 < len(sentence) < 150:
-                    menu_hints.append(sentence.capitalize())
-
-        # Return unique mentions, limit to 10
-        return list(dict.fromkeys(menu_hints))[:10]
+        return list(review_features.extract({'reviews': reviews})['menu_hints'])
 
 
 # Cost estimation helper
-def estimate_cost(num_restaurants: int) -> Dict[str, Any]:
+def estimate_cost(num_restaurants: int, tier: str = 'reviews') -> Dict[str, Any]:
     """
     Estimate Google Places API costs
 
     Args:
         num_restaurants: Number of restaurants to enrich
+        tier: Field tier per lookup ('reviews' for pitches, 'contact' for lists)
 
     Returns:
         Cost breakdown
     """
-    # Pricing (as of 2024)
-    SEARCH_COST = 0.032  # Text Search
-    DETAILS_COST = 0.017  # Place Details (if needed)
-
-    # We use Text Search with field mask (gets most data in one call)
-    cost_per_restaurant = SEARCH_COST
+    # We use one Text Search per restaurant, billed at the tier's SKU
+    cost_per_restaurant = SEARCH_COST[tier]
 
     total_cost = num_restaurants * cost_per_restaurant
 
@@ -0,0 +1,305 @@
+"""
+Anthropic Messages API helper
+
+Single place where we call Claude, so every call is metered in the cost
+ledger (model, tokens, latency, cost), budget caps are enforced and the
+model is picked by the router for the operation. Each operation has a
+circuit breaker: while Claude keeps failing or missing the operation's
+SLO, calls are rejected at once and callers use their fallback.
+
+Optional request hedging cuts tail latency: if a call hasn't answered by
+the operation's observed p90, a duplicate goes out and the first response
+wins. Hedges are capped to a fraction of calls so they can't double spend.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+from typing import Dict, Any, Optional, Iterable
+
+import requests
+
+from circuit_breaker import breakers
+from config import ANTHROPIC_BASE_URL
+from cost_ledger import ledger, anthropic_cost
+from model_router import router
+
+
+ANTHROPIC_API_URL = f"{ANTHROPIC_BASE_URL}/v1/messages"
+
+
+class HedgePolicy:
+    """When to send a duplicate request, and how many we can afford"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        budget_ratio: float = 0.10,
+        percentile: float = 90,
+        operations: Optional[Iterable[str]] = ('pitch', 'refine', 'micro')
+    ):
+        """
+        Args:
+            enabled: Hedge at all (off by default)
+            budget_ratio: Max hedged calls as a fraction of eligible calls
+            percentile: Hedge once a call is slower than this latency percentile
+            operations: Operations (or prefixes like 'refine') that may be
+                hedged; None allows all
+        """
+        self._lock = threading.Lock()
+        # Primaries get their own pool, so they never queue behind abandoned hedges
+        self._primaries = ThreadPoolExecutor(max_workers=32, thread_name_prefix='llm-primary')
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='llm-hedge')
+        self._eligible = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self.configure(enabled, budget_ratio, percentile, operations)
+
+    def configure(
+        self,
+        enabled: bool = False,
+        budget_ratio: float = 0.10,
+        percentile: float = 90,
+        operations: Optional[Iterable[str]] = ('pitch', 'refine', 'micro')
+    ) -> None:
+        """Set hedging options (used by the API at startup)"""
+        self.enabled = enabled
+        self.budget_ratio = budget_ratio
+        self.percentile = percentile
+        self.operations = set(operations) if operations is not None else None
+
+    def delay_for(self, operation: str, model: str) -> Optional[float]:
+        """
+        Seconds to wait before hedging this call, or None to not hedge
+
+        Needs enough latency samples for the operation on this model.
+        """
+        if not self.enabled:
+            return None
+        if self.operations is not None and operation not in self.operations \
+                and operation.split(':', 1)[0] not in self.operations:
+            return None
+
+        latency_ms = router.percentile(operation, model, self.percentile)
+        if latency_ms is None:
+            return None
+
+        with self._lock:
+            self._eligible += 1
+        return latency_ms / 1000
+
+    def try_acquire(self) -> bool:
+        """Reserve one hedge if the hedge budget (and cost budget) allows it"""
+        if not ledger.within_budget():
+            return False
+        with self._lock:
+            if self._hedged + 1 > self.budget_ratio * self._eligible:
+                return False
+            self._hedged += 1
+            return True
+
+    def record_win(self) -> None:
+        with self._lock:
+            self._hedge_wins += 1
+
+    def submit_primary(self, fn, *args):
+        """Run the first attempt of a hedgeable call, in a copy of the caller's context"""
+        return self._primaries.submit(contextvars.copy_context().run, fn, *args)
+
+    def submit(self, fn, *args):
+        """Run fn on the hedging pool, in a copy of the caller's context"""
+        return self._executor.submit(contextvars.copy_context().run, fn, *args)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'budget_ratio': self.budget_ratio,
+                'percentile': self.percentile,
+                'eligible_calls': self._eligible,
+                'hedged_calls': self._hedged,
+                'hedge_wins': self._hedge_wins
+            }
+
+
+# Shared hedging policy for the whole process
+hedging = HedgePolicy()
+
+
+def call_anthropic(
+    api_key: str,
+    prompt: str,
+    max_tokens: int,
+    timeout: float,
+    operation: str,
+    temperature: Optional[float] = None,
+    model: Optional[str] = None,
+    prompt_version: Optional[str] = None
+) -> requests.Response:
+    """
+    Send a single-turn message to Claude and record its cost
+
+    Args:
+        api_key: Anthropic API key
+        prompt: User message content
+        max_tokens: Max output tokens
+        timeout: Request timeout in seconds
+        operation: What the call is for (e.g. 'pitch', 'classify_batch');
+            also decides the model (see model_router.OPERATION_ROUTES)
+        temperature: Optional sampling temperature
+        model: Force a model id instead of routing
+        prompt_version: Registry version of the prompt (see prompts.py),
+            kept with the call's latency and token metrics
+
+    Returns:
+        The raw HTTP response (callers keep their own status handling)
+
+    Raises:
+        BudgetExceededError: If the daily or per-request budget is used up
+        CircuitOpenError: If the operation's circuit breaker is open
+        requests.RequestException: On network errors / timeouts
+    """
+    ledger.check_budget()
+
+    if model is None:
+        model = router.choose(operation)
+
+    payload: Dict[str, Any] = {
+        'model': model,
+        'max_tokens': max_tokens,
+        'messages': [
+            {'role': 'user', 'content': prompt}
+        ]
+    }
+    if temperature is not None:
+        payload['temperature'] = temperature
+
+    hedge_after = hedging.delay_for(operation, model)
+    if hedge_after is None or hedge_after >= timeout:
+        return _send(api_key, payload, timeout, operation, prompt_version)
+
+    return _send_hedged(api_key, payload, timeout, operation, prompt_version, hedge_after)
+
+
+def _send_hedged(
+    api_key: str,
+    payload: Dict[str, Any],
+    timeout: float,
+    operation: str,
+    prompt_version: Optional[str],
+    hedge_after: float
+) -> requests.Response:
+    """
+    Send the request, plus a duplicate if it's still pending after `hedge_after`
+
+    The first successful response wins. requests can't abort a call in
+    flight, so the loser is abandoned: it finishes in the background and
+    its cost is still recorded in the ledger.
+
+    `hedge_after` counts from when the primary is actually sent, and the
+    whole call (queueing included) is bounded by `timeout`.
+
+    Raises:
+        requests.Timeout: If no attempt finished within `timeout`
+    """
+    deadline = time.monotonic() + timeout
+    sent = threading.Event()
+
+    def send_primary() -> requests.Response:
+        sent.set()
+        return _send(api_key, payload, timeout, operation, prompt_version, 'primary')
+
+    primary = hedging.submit_primary(send_primary)
+    if not sent.wait(timeout) and primary.cancel():
+        raise requests.Timeout(f"{operation} was not sent within {timeout}s")
+
+    done, _ = wait([primary], timeout=max(0.0, min(hedge_after, deadline - time.monotonic())))
+    remaining = deadline - time.monotonic()
+    if done or remaining <= 0 or not hedging.try_acquire():
+        return _result_by(primary, deadline, operation)
+
+    # Same overall deadline for the duplicate
+    hedge = hedging.submit(_send, api_key, payload, remaining, operation, prompt_version, 'hedge')
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                             return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None and future.result().status_code == 200:
+                if future is hedge:
+                    hedging.record_win()
+                return future.result()
+
+    # Neither succeeded: behave like the primary call did
+    return _result_by(primary, deadline, operation)
+
+
+def _result_by(future, deadline: float, operation: str) -> requests.Response:
+    """The future's result, or requests.Timeout once the deadline has passed"""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeout:
+        raise requests.Timeout(f"{operation} did not finish in time") from None
+
+
+def _send(
+    api_key: str,
+    payload: Dict[str, Any],
+    timeout: float,
+    operation: str,
+    prompt_version: Optional[str] = None,
+    hedge: Optional[str] = None
+) -> requests.Response:
+    """POST one request and record it in the router and the ledger"""
+    model = payload['model']
+    extra = {'prompt_version': prompt_version}
+    if hedge:
+        extra['hedge'] = hedge
+
+    start = time.perf_counter()
+    try:
+        # Slower than the operation's p95 SLO counts against the circuit
+        with breakers.guard('anthropic', operation, slow_call_ms=router.route_for(operation)[1]) as call:
+            response = requests.post(
+                ANTHROPIC_API_URL,
+                headers={
+                    'x-api-key': api_key,
+                    'anthropic-version': '2023-06-01',
+                    'content-type': 'application/json'
+                },
+                json=payload,
+                timeout=timeout
+            )
+            call.status = response.status_code
+    except requests.RequestException:
+        latency_ms = (time.perf_counter() - start) * 1000
+        router.observe(operation, model, latency_ms, prompt_version)
+        ledger.record('anthropic', model, latency_ms=latency_ms, operation=operation, status='error', **extra)
+        raise
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    router.observe(operation, model, latency_ms, prompt_version)
+
+    usage = {}
+    if response.status_code == 200:
+        try:
+            usage = response.json().get('usage', {}) or {}
+        except ValueError:
+            usage = {}
+
+    ledger.record(
+        'anthropic',
+        model,
+        cost_usd=anthropic_cost(model, usage),
+        latency_ms=latency_ms,
+        input_tokens=usage.get('input_tokens', 0),
+        output_tokens=usage.get('output_tokens', 0),
+        cached_tokens=usage.get('cache_read_input_tokens', 0),
+        operation=operation,
+        status=response.status_code,
+        **extra
+    )
+
+    return response
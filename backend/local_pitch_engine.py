@@ -0,0 +1,183 @@
+"""
+Local Pitch Engine for Happy Pastures Creamery
+
+Builds a complete, restaurant-specific pitch in a few milliseconds without
+calling Claude: dishes mentioned in the reviews are paired with the cheese
+(using its catalog pairings), and the hook, selling points and call to
+action are picked from the restaurant's types, price level and rating.
+
+Used for the instant first paint of /api/pitch, and whenever the LLM is
+too slow, fails, or the cost budget has been used up.
+"""
+import re
+from typing import Dict, Any, List
+
+from cheese_products import get_cheese_by_id
+from review_features import review_features
+
+
+# Why a dish category works with each cheese ({dish} is the lowercase menu label)
+PAIRING_REASONS = {
+    'pasture_bloom': {
+        'rich_protein': "The triple crème melts into a silky, buttery finish that rounds out the {dish} without masking it",
+        'seafood': "Its delicate, custard-like richness complements sweet {dish} the way beurre blanc does",
+        'sauce': "Stirred in at the end it gives {dish} a luxurious, velvety body",
+        'pastry': "Bakes into a creamy, savory filling - ideal for {dish}",
+        'board': "Served at room temp alongside figs, honey and toasted nuts it anchors the {dish}",
+        'course': "A small, plated portion with its bloomy rind makes an elegant {dish}",
+        'salad': "A few spoonfuls add creamy contrast to {dish} with pears, apples or truffle",
+        'melt': "Adds a rich, French-style creaminess to {dish}",
+        'sandwich': "Spread on warm bread it turns {dish} into an upscale, brie-style bite",
+        'smoked_protein': "Its cool, buttery richness balances the salt and smoke of {dish}",
+        'side': "A dollop on {dish} makes an easy premium upsell",
+    },
+    'smoky_alder': {
+        'sandwich': "Melts beautifully and layers alder smoke and deep umami onto {dish}",
+        'melt': "Melts smooth and brings a bold, smoky backbone to {dish}",
+        'smoked_protein': "Smoke on smoke: echoes the {dish} while the washed rind adds savory funk",
+        'rich_protein': "A smoky, umami-rich crust or sauce that stands up to {dish}",
+        'board': "A bold, washed-rind centerpiece for {dish} next to mustard and pickles",
+        'side': "Melted over {dish} it becomes a signature, shareable snack",
+        'sauce': "Folded into {dish} it adds smoky depth and umami",
+        'seafood': "A little goes a long way - a smoky accent for grilled {dish}",
+        'pastry': "Gives {dish} a savory, smoky filling with real character",
+        'salad': "Shaved over {dish} with caramelized onions and arugula",
+        'course': "A bold, smoky counterpoint course on the {dish}",
+    },
+}
+
+# Restaurant type keywords -> how we describe the place in the hook
+TYPE_LABELS = [
+    ('fine_dining', 'a fine-dining kitchen'),
+    ('french', 'a French kitchen'),
+    ('italian', 'an Italian kitchen'),
+    ('bistro', 'a bistro'),
+    ('gastropub', 'a gastropub'),
+    ('pub', 'a pub'),
+    ('tavern', 'a tavern'),
+    ('bar', 'a bar kitchen'),
+    ('pizza', 'a pizza kitchen'),
+    ('hamburger', 'a burger kitchen'),
+    ('burger', 'a burger kitchen'),
+    ('american', 'an American kitchen'),
+    ('seafood', 'a seafood kitchen'),
+    ('steak', 'a steakhouse'),
+]
+
+
+def _describe_restaurant(types: List[str]) -> str:
+    types_lower = [t.lower() for t in types]
+    for keyword, label in TYPE_LABELS:
+        if any(keyword in t for t in types_lower):
+            return label
+    return 'your kitchen'
+
+
+def _pairing_reason(cheese_id: str, cheese: Dict[str, Any], category: str, dish: str) -> str:
+    reasons = PAIRING_REASONS.get(cheese_id, {})
+    if category in reasons:
+        return reasons[category].format(dish=dish.lower())
+
+    # Cheese without hand-written reasons: lean on its catalog pairings
+    flavors = ', '.join(cheese['pairings'].get('flavors', [])[:2]).lower()
+    return f"{cheese['name']} brings {cheese['subtitle'].lower()} character to {dish.lower()}" + (
+        f", especially with {flavors}" if flavors else ''
+    )
+
+
+def _pick_selling_points(cheese: Dict[str, Any], context_text: str, count: int = 3) -> List[str]:
+    """Selling points sharing the most words with the restaurant, catalog order on ties"""
+    context_words = set(re.findall(r"[a-z]+", context_text.lower()))
+
+    def overlap(point: str) -> int:
+        return len({w for w in re.findall(r"[a-z]+", point.lower()) if len(w) > 3} & context_words)
+
+    indexed = list(enumerate(cheese['selling_points']))
+    ranked = sorted(indexed, key=lambda item: (-overlap(item[1]), item[0]))
+    return [point for _, point in ranked[:count]]
+
+
+def build_local_pitch(restaurant_data: Dict[str, Any], cheese_match: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a full sales pitch without the LLM
+
+    Args:
+        restaurant_data: Restaurant info from Google Places (reviews optional)
+        cheese_match: Output of SalesPitchGenerator.determine_cheese_match
+
+    Returns:
+        Pitch dict shaped like generate_sales_pitch output, with
+        source='local'
+    """
+    cheese_id = cheese_match['primary_cheese']
+    cheese = get_cheese_by_id(cheese_id)
+
+    name = restaurant_data.get('name') or 'your restaurant'
+    types = restaurant_data.get('types', [])
+    reviews = restaurant_data.get('reviews', [])
+    rating = restaurant_data.get('rating')
+
+    dishes = review_features.extract(restaurant_data)['dishes'][:4]
+
+    # Pairings: dishes guests actually mention, topped up from ideal uses
+    menu_pairings = [
+        {'dish': label, 'why_it_works': _pairing_reason(cheese_id, cheese, category, label)}
+        for label, category, _ in dishes
+    ]
+    for use in cheese['ideal_uses']:
+        if len(menu_pairings) >= 3:
+            break
+        if any(use.lower() in p['dish'].lower() or p['dish'].lower() in use.lower() for p in menu_pairings):
+            continue
+        menu_pairings.append({
+            'dish': use,
+            'why_it_works': f"A natural fit for {name}'s menu - {cheese['name']} was made for {use.lower()}"
+        })
+
+    # Opening hook built around the most-mentioned dish
+    place = _describe_restaurant(types)
+    if dishes:
+        top_dish = dishes[0][0].lower()
+        hook = (
+            f"Hi! I'm Hillary from Happy Pastures Creamery. Your guests keep talking about the {top_dish} - "
+            f"{cheese['name']} would make it the dish they come back for."
+        )
+    else:
+        hook = (
+            f"Hi! I'm Hillary from Happy Pastures Creamery. {cheese['name']} is a local, small-batch "
+            f"{cheese['subtitle'].lower()} cheese made for {place} like yours."
+        )
+    if isinstance(rating, (int, float)) and rating >= 4.5:
+        hook += f" A {rating}-star following deserves a signature cheese."
+
+    context_text = ' '.join(types) + ' ' + ' '.join(r.get('text', '') for r in reviews)
+    production = cheese.get('production', {})
+    feature = dishes[0][0].lower() if dishes else menu_pairings[0]['dish'].lower()
+
+    return {
+        "opening_hook": hook,
+        "menu_pairings": menu_pairings[:4],
+        "selling_points": _pick_selling_points(cheese, context_text),
+        "competitive_advantage": (
+            f"Commodity cheese tastes the same everywhere. {cheese['name']} is "
+            f"{production.get('batch_size', 'small-batch').lower()} and made locally, so your {feature} "
+            f"becomes something guests can't get at any other {place.split(' ', 1)[-1]}."
+        ),
+        "call_to_action": (
+            f"Can I drop off a free sample this week? Orders start at "
+            f"{production.get('minimum_order_lbs', 3)} lb with about {production.get('lead_time_days', 7)} days lead time."
+        ),
+        "cheese": {
+            "id": cheese_id,
+            "name": cheese['name'],
+            "subtitle": cheese['subtitle'],
+            "price_lb": cheese['typical_price_lb']
+        },
+        "restaurant": {
+            "name": restaurant_data.get('name'),
+            "address": restaurant_data.get('address'),
+            "phone": restaurant_data.get('phone')
+        },
+        "confidence": cheese_match.get('confidence', 'low'),
+        "source": "local"
+    }
@@ -0,0 +1,187 @@
+"""
+Model Router for Happy Pastures Creamery
+
+Picks the Claude model for each operation from its quality tier and
+latency SLO, instead of hard-coding a model at every call site. Quick,
+low-stakes rewrites (walking persona, "shorten") go to a fast model; full
+pitches go to the strongest one.
+
+Observed latency is kept per model and per operation, so routing can be
+checked against p50/p95 (see /api/metrics/models). With adaptive routing
+on, an operation whose model keeps missing its SLO is moved one tier
+down to a faster model; every few calls still probe the preferred model
+so the operation moves back once its latency recovers.
+"""
+import math
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Quality tiers, fastest / cheapest first
+MODEL_TIERS = {
+    'economy': 'claude-3-haiku-20240307',
+    'fast': 'claude-haiku-4-5-20251001',
+    'strong': 'claude-sonnet-4-5-20250929',
+}
+TIER_ORDER = ['economy', 'fast', 'strong']
+
+# Operation -> (quality tier, p95 latency SLO in ms)
+OPERATION_ROUTES = {
+    'classify': ('economy', 3000),
+    'classify_batch': ('economy', 8000),
+    'pitch': ('strong', 20000),
+    'refine:walking': ('fast', 4000),
+    'refine:gatekeeper': ('fast', 4000),
+    'refine:chef': ('strong', 15000),
+    'refine:manager': ('strong', 15000),
+    'micro:shorten': ('fast', 4000),
+    'micro:casual': ('fast', 5000),
+    'micro:formal': ('fast', 5000),
+    'micro:strong_opener': ('strong', 10000),
+    'micro:expand': ('strong', 15000),
+}
+DEFAULT_ROUTE = ('strong', 20000)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class ModelRouter:
+    """Routes operations to models and tracks observed latency"""
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, Tuple[str, float]]] = None,
+        adaptive: bool = True,
+        window: int = 200,
+        min_samples: int = 20,
+        probe_every: int = 10
+    ):
+        """
+        Initialize the router
+
+        Args:
+            routes: Operation -> (tier, p95 SLO ms); defaults to OPERATION_ROUTES
+            adaptive: Move an operation one tier down while its model misses the SLO
+            window: Latency samples kept per model / operation
+            min_samples: Samples needed before the SLO is enforced
+            probe_every: While demoted, send every Nth call to the preferred
+                model to keep its latency window fresh
+        """
+        self.routes = dict(routes or OPERATION_ROUTES)
+        self.adaptive = adaptive
+        self.min_samples = min_samples
+        self.probe_every = probe_every
+        self._window = window
+        self._lock = threading.Lock()
+        self._by_model = defaultdict(lambda: deque(maxlen=self._window))
+        self._by_operation = defaultdict(lambda: deque(maxlen=self._window))
+        self._by_prompt = defaultdict(lambda: deque(maxlen=self._window))
+        self._routed = defaultdict(lambda: defaultdict(int))
+
+    def configure(self, adaptive: bool = True) -> None:
+        """Turn adaptive (SLO-driven) routing on or off (used by the API at startup)"""
+        self.adaptive = adaptive
+
+    def route_for(self, operation: str) -> Tuple[str, float]:
+        """(tier, SLO ms) for an operation, falling back to its prefix ('refine', 'micro')"""
+        if operation in self.routes:
+            return self.routes[operation]
+        prefix = operation.split(':', 1)[0]
+        return self.routes.get(prefix, DEFAULT_ROUTE)
+
+    def choose(self, operation: str) -> str:
+        """
+        Pick the model for an operation
+
+        Returns:
+            Model id
+        """
+        tier, slo_ms = self.route_for(operation)
+        model = MODEL_TIERS[tier]
+
+        if self.adaptive:
+            p95 = self._p95(operation, model)
+            tier_index = TIER_ORDER.index(tier)
+            if p95 is not None and p95 > slo_ms and tier_index > 0:
+                # One tier down, unless that model is known to be no better
+                faster = MODEL_TIERS[TIER_ORDER[tier_index - 1]]
+                faster_p95 = self._p95(operation, faster)
+                with self._lock:
+                    probe = sum(self._routed[operation].values()) % self.probe_every == 0
+                if (faster_p95 is None or faster_p95 < p95) and not probe:
+                    model = faster
+
+        with self._lock:
+            self._routed[operation][model] += 1
+        return model
+
+    def observe(self, operation: str, model: str, latency_ms: float, prompt_version: Optional[str] = None) -> None:
+        """Record the latency of one call (per prompt version too, if known)"""
+        with self._lock:
+            self._by_model[model].append(latency_ms)
+            self._by_operation[(operation, model)].append(latency_ms)
+            if prompt_version:
+                self._by_prompt[(operation, prompt_version)].append(latency_ms)
+
+    def percentile(self, operation: str, model: str, pct: float) -> Optional[float]:
+        """Observed latency percentile (ms) of an operation on a model, None until min_samples"""
+        with self._lock:
+            samples = list(self._by_operation.get((operation, model), ()))
+        if len(samples) < self.min_samples:
+            return None
+        return _percentile(samples, pct)
+
+    def _p95(self, operation: str, model: str) -> Optional[float]:
+        return self.percentile(operation, model, 95)
+
+    def summary(self) -> Dict[str, Any]:
+        """Observed p50/p95 per model and per operation, with routing decisions"""
+
+        def stats(samples: List[float]) -> Dict[str, Any]:
+            return {
+                'calls': len(samples),
+                'p50_ms': round(_percentile(samples, 50), 1),
+                'p95_ms': round(_percentile(samples, 95), 1)
+            }
+
+        with self._lock:
+            by_model = {model: list(samples) for model, samples in self._by_model.items() if samples}
+            by_operation = {key: list(samples) for key, samples in self._by_operation.items() if samples}
+            routed = {op: dict(models) for op, models in self._routed.items()}
+            by_prompt = {key: list(samples) for key, samples in self._by_prompt.items() if samples}
+
+        operations: Dict[str, Any] = {}
+        for operation in sorted(set(routed) | {op for op, _ in by_operation}):
+            tier, slo_ms = self.route_for(operation)
+            operations[operation] = {
+                'tier': tier,
+                'slo_p95_ms': slo_ms,
+                'routed': routed.get(operation, {}),
+                'by_model': {
+                    model: stats(samples)
+                    for (op, model), samples in sorted(by_operation.items())
+                    if op == operation
+                },
+                'by_prompt_version': {
+                    version: stats(samples)
+                    for (op, version), samples in sorted(by_prompt.items())
+                    if op == operation
+                }
+            }
+
+        return {
+            'adaptive': self.adaptive,
+            'tiers': dict(MODEL_TIERS),
+            'models': {model: stats(samples) for model, samples in sorted(by_model.items())},
+            'operations': operations
+        }
+
+
+# Shared router for the whole process
+router = ModelRouter()
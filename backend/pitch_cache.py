@@ -0,0 +1,262 @@
+"""
+Pitch caches for Happy Pastures Creamery
+
+Persona variants are pre-rendered in the background as soon as a base
+pitch exists, so switching between walking / chef / manager / gatekeeper
+is usually instant instead of a fresh Sonnet call.
+
+Micro-refinements (shorten, casual, ...) are cached per input text and
+remembered as a chain of versions, so repeating a tweak or stepping
+back and forth between versions never calls the model again.
+
+LLM pitches generated behind an instant local pitch are tracked by an
+upgrade token the frontend polls.
+"""
+import contextvars
+import hashlib
+import secrets
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from ttl_cache import TTLCache
+from cost_ledger import ledger, start_request, end_request
+from prompts import version_of
+from telemetry import detach_trace
+
+
+def _in_background(fn: Callable[..., Any], *args: Any) -> Any:
+    # The request may have responded already: its spans stay out of its trace
+    detach_trace()
+    return fn(*args)
+
+
+def text_hash(text: str) -> str:
+    """Stable hash of a pitch text (whitespace at the ends ignored)"""
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+
+class PersonaVariantCache:
+    """Background renderer + cache of persona refinements, keyed by pitch text"""
+
+    def __init__(self, max_concurrency: int = 4, ttl_seconds: float = 2 * 3600, maxsize: int = 2000):
+        """
+        Args:
+            max_concurrency: Max background refinement calls in flight
+                (process-wide, keeps us under the Anthropic rate limit)
+            ttl_seconds: How long rendered variants are kept
+            maxsize: Max cached variants
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='persona-prerender')
+        self._variants = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+    def prerender(
+        self,
+        pitch_generator: Any,
+        pitch_text: str,
+        restaurant_name: str,
+        cheese_name: str,
+        personas: List[str]
+    ) -> int:
+        """
+        Start rendering every persona variant of a pitch in the background
+
+        Skipped entirely when the cost budget is already used up. Variants
+        already cached or in flight are not re-rendered.
+
+        Args:
+            pitch_generator: SalesPitchGenerator to render with
+            pitch_text: Full pitch text (as the frontend will send it back)
+            restaurant_name: Restaurant name
+            cheese_name: Cheese being pitched
+            personas: Personas to render
+
+        Returns:
+            Number of renders started
+        """
+        if not ledger.within_budget():
+            return 0
+
+        pitch_hash = text_hash(pitch_text)
+        started = 0
+        for persona in personas:
+            key = (pitch_hash, persona, version_of(f"refine:{persona}"))
+            if self._variants.get(key) is not None:
+                continue
+
+            future = self._executor.submit(
+                self._render, pitch_generator, pitch_text, restaurant_name, cheese_name, persona
+            )
+            self._variants.set(key, future)
+            future.add_done_callback(lambda f, key=key: self._drop_if_failed(key, f))
+            started += 1
+
+        return started
+
+    def lookup(self, pitch_text: str, persona: str) -> Optional[Future]:
+        """
+        Find a rendered (or in-flight) variant
+
+        Returns:
+            Future resolving to the refine_pitch_for_persona result, or None
+        """
+        return self._variants.get((text_hash(pitch_text), persona, version_of(f"refine:{persona}")))
+
+    @staticmethod
+    def _render(
+        pitch_generator: Any,
+        pitch_text: str,
+        restaurant_name: str,
+        cheese_name: str,
+        persona: str
+    ) -> Dict[str, Any]:
+        # Own ledger context so background spend is visible (and capped) separately
+        detach_trace()
+        token = start_request('prerender:persona')
+        try:
+            return pitch_generator.refine_pitch_for_persona(
+                original_pitch=pitch_text,
+                restaurant_name=restaurant_name,
+                cheese_name=cheese_name,
+                persona=persona
+            )
+        finally:
+            end_request(token)
+
+    def _drop_if_failed(self, key: tuple, future: Future) -> None:
+        """Failed renders are forgotten so the next request renders live"""
+        if future.cancelled() or future.exception() is not None:
+            self._variants.pop(key)
+
+
+class MicroRefinementCache:
+    """Cached micro-refinements plus the version chain they form"""
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, maxsize: int = 5000):
+        """
+        Args:
+            ttl_seconds: How long refinements and versions are kept
+            maxsize: Max cached refinements (and max remembered versions)
+        """
+        self._lock = threading.Lock()
+        # (input hash, micro_type, prompt version) -> output hash
+        self._refinements = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        # text hash -> {'text', 'parent_hash', 'micro_type', 'redo_hash'}
+        self._versions = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+    def get(self, current_pitch: str, micro_type: str, prompt_version: Any) -> Optional[Dict[str, Any]]:
+        """
+        Find a previous refinement of this exact text
+
+        Returns:
+            Version dict (see `version`) for the refined text, or None
+        """
+        refined_hash = self._refinements.get((text_hash(current_pitch), micro_type, prompt_version))
+        if refined_hash is None:
+            return None
+
+        # Re-applying a tweak makes it the redo target again
+        with self._lock:
+            parent = self._versions.get(text_hash(current_pitch))
+            if parent is not None:
+                parent['redo_hash'] = refined_hash
+        return self.version(refined_hash)
+
+    def record(
+        self,
+        current_pitch: str,
+        micro_type: str,
+        prompt_version: Any,
+        refined_text: str
+    ) -> Dict[str, Any]:
+        """
+        Remember a fresh refinement and link it into the version chain
+
+        Returns:
+            Version dict for the refined text
+        """
+        parent_hash = text_hash(current_pitch)
+        refined_hash = text_hash(refined_text)
+
+        with self._lock:
+            parent = self._versions.get(parent_hash)
+            if parent is None:
+                # First time we see this text: it's the root of a chain
+                parent = {'text': current_pitch, 'parent_hash': None, 'micro_type': None, 'redo_hash': None}
+                self._versions.set(parent_hash, parent)
+            parent['redo_hash'] = refined_hash
+
+            if self._versions.get(refined_hash) is None:
+                self._versions.set(refined_hash, {
+                    'text': refined_text,
+                    'parent_hash': parent_hash,
+                    'micro_type': micro_type,
+                    'redo_hash': None
+                })
+            self._refinements.set((parent_hash, micro_type, prompt_version), refined_hash)
+
+        return self.version(refined_hash)
+
+    def version(self, pitch_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a remembered version
+
+        Returns:
+            {'pitch_hash', 'refined_text', 'micro_type', 'parent_hash',
+            'redo_hash', 'chain'} where `chain` lists the hashes from the
+            original pitch down to this version, or None if unknown
+        """
+        with self._lock:
+            node = self._versions.get(pitch_hash)
+            if node is None:
+                return None
+
+            chain = [pitch_hash]
+            parent_hash = node['parent_hash']
+            while parent_hash and parent_hash not in chain:
+                chain.insert(0, parent_hash)
+                parent = self._versions.get(parent_hash)
+                parent_hash = parent['parent_hash'] if parent else None
+
+            return {
+                'pitch_hash': pitch_hash,
+                'refined_text': node['text'],
+                'micro_type': node['micro_type'],
+                'parent_hash': node['parent_hash'],
+                'redo_hash': node['redo_hash'],
+                'chain': chain
+            }
+
+
+class PitchUpgrades:
+    """LLM pitches still being generated after a local pitch was returned"""
+
+    def __init__(self, max_concurrency: int = 4, ttl_seconds: float = 600, maxsize: int = 1000):
+        """
+        Args:
+            max_concurrency: Max LLM pitch generations in flight
+            ttl_seconds: How long a finished pitch can be collected
+            maxsize: Max tracked upgrades
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='pitch-upgrade')
+        self._pending = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+    def submit(self, fn: Callable[..., Dict[str, Any]], *args: Any) -> Tuple[str, Future]:
+        """
+        Start generating a pitch in the background
+
+        Runs in a copy of the caller's context, so its spend is still
+        attributed to (and capped by) the request that started it; its
+        spans are kept out of that request's Server-Timing.
+
+        Returns:
+            (upgrade token, future resolving to the pitch)
+        """
+        token = secrets.token_urlsafe(12)
+        future = self._executor.submit(contextvars.copy_context().run, _in_background, fn, *args)
+        self._pending.set(token, future)
+        return token, future
+
+    def get(self, token: str) -> Optional[Future]:
+        """Future for an upgrade token, or None if unknown / expired"""
+        return self._pending.get(token)
@@ -0,0 +1,197 @@
+"""
+Entity resolution between Geoapify and Google Places records
+
+Matches restaurants from two providers in bulk: a spatial grid join finds
+nearby candidates, then name similarity (plus a small distance term) picks
+the best one-to-one pairs.
+"""
+import math
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Any, List, Tuple
+
+from place_store import haversine_m
+
+
+# Tokens that don't help tell two restaurants apart
+NAME_NOISE_TOKENS = {'the', 'restaurant', 'and', 'cafe', 'bar', 'kitchen', 'grill'}
+
+METERS_PER_DEGREE_LAT = 111_320
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip punctuation and drop filler tokens"""
+    name = name.lower().replace('&', ' and ').replace("'", '')
+    tokens = re.findall(r"[a-z0-9]+", name)
+    kept = [t for t in tokens if t not in NAME_NOISE_TOKENS]
+    return ' '.join(kept or tokens)
+
+
+def name_similarity(a: str, b: str) -> float:
+    """
+    Similarity of two restaurant names in [0, 1]
+
+    Best of character-level ratio and token overlap, with containment
+    ("Oceanique" vs "Oceanique Restaurant & Bar") counting as a strong match.
+    """
+    na, nb = normalize_name(a), normalize_name(b)
+    if not na or not nb:
+        return 0.0
+    if na == nb:
+        return 1.0
+
+    ratio = SequenceMatcher(None, na, nb).ratio()
+
+    ta, tb = set(na.split()), set(nb.split())
+    jaccard = len(ta & tb) / len(ta | tb)
+
+    contained = 0.9 if (na in nb or nb in na) else 0.0
+
+    return max(ratio, jaccard, contained)
+
+
+class SpatialGrid:
+    """Buckets points into square cells so neighbours are found without an O(n*m) scan"""
+
+    def __init__(self, cell_m: float, ref_latitude: float):
+        """
+        Args:
+            cell_m: Cell size in meters (>= the max match distance)
+            ref_latitude: Latitude used to size longitude cells
+        """
+        self.dlat = cell_m / METERS_PER_DEGREE_LAT
+        self.dlon = cell_m / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(ref_latitude)), 0.01))
+        self._cells: Dict[Tuple[int, int], List[Any]] = defaultdict(list)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return int(math.floor(latitude / self.dlat)), int(math.floor(longitude / self.dlon))
+
+    def add(self, latitude: float, longitude: float, item: Any) -> None:
+        self._cells[self._cell(latitude, longitude)].append(item)
+
+    def neighbours(self, latitude: float, longitude: float) -> List[Any]:
+        """Items in the point's cell and the 8 surrounding cells"""
+        row, col = self._cell(latitude, longitude)
+        found = []
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                found.extend(self._cells.get((row + dr, col + dc), []))
+        return found
+
+
+def match_places(
+    restaurants: List[Tuple[str, float, float]],
+    google_places: List[Dict[str, Any]],
+    max_distance_m: float = 150,
+    min_score: float = 0.6
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Match Geoapify restaurants to Google places one-to-one
+
+    Args:
+        restaurants: (name, latitude, longitude) per Geoapify restaurant
+        google_places: Raw Google place records (need displayName and location)
+        max_distance_m: Max distance between a matched pair
+        min_score: Min combined score to accept a match
+
+    Returns:
+        Mapping of restaurant index -> matched Google place
+    """
+    if not restaurants or not google_places:
+        return {}
+
+    grid = SpatialGrid(max_distance_m, restaurants[0][1])
+    for place in google_places:
+        location = place.get('location', {})
+        if 'latitude' in location and 'longitude' in location:
+            grid.add(location['latitude'], location['longitude'], place)
+
+    # Score every nearby pair, then assign greedily from the best score down
+    candidates = []
+    for index, (name, latitude, longitude) in enumerate(restaurants):
+        for place in grid.neighbours(latitude, longitude):
+            location = place['location']
+            distance = haversine_m(latitude, longitude, location['latitude'], location['longitude'])
+            if distance > max_distance_m:
+                continue
+
+            similarity = name_similarity(name, place.get('displayName', {}).get('text', ''))
+            score = 0.85 * similarity + 0.15 * (1 - distance / max_distance_m)
+            if similarity >= 0.5 and score >= min_score:
+                candidates.append((score, index, place.get('id')))
+
+    places_by_id = {place.get('id'): place for place in google_places}
+    matches: Dict[int, Dict[str, Any]] = {}
+    used_place_ids = set()
+    for score, index, place_id in sorted(candidates, key=lambda c: c[0], reverse=True):
+        if index in matches or place_id in used_place_ids:
+            continue
+        matches[index] = places_by_id[place_id]
+        used_place_ids.add(place_id)
+
+    return matches
+
+
+def _circle(restaurants: List[Tuple[str, float, float]], indexes: List[int], margin_m: float) -> Dict[str, Any]:
+    """Circle centred on some restaurants with a radius reaching the farthest"""
+    center_lat = sum(restaurants[i][1] for i in indexes) / len(indexes)
+    center_lon = sum(restaurants[i][2] for i in indexes) / len(indexes)
+    reach = max(haversine_m(center_lat, center_lon, restaurants[i][1], restaurants[i][2]) for i in indexes)
+    return {
+        'latitude': center_lat,
+        'longitude': center_lon,
+        'radius_m': max(150.0, reach + margin_m),
+        'indexes': indexes
+    }
+
+
+def plan_coverage(
+    restaurants: List[Tuple[str, float, float]],
+    max_results: int = 20,
+    places_per_prospect: float = 2.0,
+    margin_m: float = 100,
+    max_radius_m: float = 2000
+) -> List[Dict[str, Any]]:
+    """
+    Plan as few search circles as possible that cover every restaurant
+
+    A Nearby Search returns at most `max_results` places (the nearest
+    first), so a circle must not be expected to hold more than that:
+    prospects are only part of the restaurants Google knows there, about
+    1 in `places_per_prospect`. Starting from one circle around all of
+    them, groups are split in two at the median of their longer side
+    until each group's circle is expected to fit. Circles also stay within
+    `max_radius_m`: across a wider circle the prospects say little about
+    how many restaurants lie between them.
+
+    Returns:
+        List of {'latitude', 'longitude', 'radius_m', 'indexes'}
+    """
+    if not restaurants:
+        return []
+
+    max_prospects = max(1, int(max_results / places_per_prospect))
+    m_per_deg_lon = METERS_PER_DEGREE_LAT * max(math.cos(math.radians(restaurants[0][1])), 0.01)
+
+    circles = []
+    groups = [list(range(len(restaurants)))]
+    while groups:
+        indexes = groups.pop()
+        circle = _circle(restaurants, indexes, margin_m)
+        lat_span = (max(restaurants[i][1] for i in indexes) - min(restaurants[i][1] for i in indexes)) \
+            * METERS_PER_DEGREE_LAT
+        lon_span = (max(restaurants[i][2] for i in indexes) - min(restaurants[i][2] for i in indexes)) \
+            * m_per_deg_lon
+        fits = len(indexes) <= max_prospects and circle['radius_m'] <= max_radius_m
+        # Restaurants at the same spot can't be split any further
+        if fits or (lat_span == 0 and lon_span == 0):
+            circles.append(circle)
+            continue
+
+        axis = 1 if lat_span >= lon_span else 2
+        ordered = sorted(indexes, key=lambda i: restaurants[i][axis])
+        half = len(ordered) // 2
+        groups += [ordered[:half], ordered[half:]]
+
+    return circles
@@ -0,0 +1,381 @@
+"""
+Persistent place storage for Happy Pastures Creamery
+
+SQLite file (stdlib only, no server) that:
+- remembers which Google place a Geoapify restaurant resolved to, so later
+  lookups can go straight to Place Details instead of a fuzzy Text Search
+- keeps the Google place records and their reviews in a full-text index,
+  so "which prospects nearby mention burgers?" runs locally in milliseconds
+- keeps pitches generated ahead of time (nightly batch), so the next day's
+  /api/pitch calls don't need Claude
+"""
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+# Words that show up in natural-language queries but aren't search terms
+QUERY_STOPWORDS = {'or', 'and', 'the', 'a', 'an', 'with', 'mention', 'mentions'}
+
+
+def geoapify_source_key(
+    name: str,
+    latitude: float,
+    longitude: float,
+    geoapify_place_id: Optional[str] = None
+) -> str:
+    """
+    Build a stable identity for a Geoapify restaurant
+
+    Uses the Geoapify place_id when we have it, otherwise the normalized
+    name plus coordinates rounded to ~10m.
+
+    Args:
+        name: Restaurant name
+        latitude: Latitude
+        longitude: Longitude
+        geoapify_place_id: Geoapify `place_id` property, if known
+
+    Returns:
+        Key string, e.g. "geoapify:51a..." or "name:oceanique@42.0451,-87.6877"
+    """
+    if geoapify_place_id:
+        return f"geoapify:{geoapify_place_id}"
+
+    normalized = ' '.join(name.lower().split())
+    return f"name:{normalized}@{latitude:.4f},{longitude:.4f}"
+
+
+class PlaceStore:
+    """SQLite-backed mapping from Geoapify identity to Google place id"""
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the store
+
+        Args:
+            db_path: Path to the SQLite file (':memory:' for a throwaway store)
+        """
+        if db_path != ':memory:':
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS place_ids (
+                    source_key TEXT PRIMARY KEY,
+                    google_place_id TEXT NOT NULL,
+                    resolved_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS places (
+                    google_place_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    address TEXT,
+                    latitude REAL,
+                    longitude REAL,
+                    types TEXT,
+                    price TEXT,
+                    rating REAL,
+                    phone TEXT,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS places_lat_lon ON places (latitude, longitude)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pitches (
+                    google_place_id TEXT NOT NULL,
+                    cheese_id TEXT NOT NULL,
+                    pitch TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    prompt_version TEXT,
+                    PRIMARY KEY (google_place_id, cheese_id)
+                )
+            """)
+            # Stores created before pitches were tagged with their prompt version
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pitches)")}
+            if 'prompt_version' not in columns:
+                self._conn.execute("ALTER TABLE pitches ADD COLUMN prompt_version TEXT")
+
+            # Porter stemming so "burgers" matches "burger"; plain table + LIKE
+            # if this SQLite build has no FTS5
+            try:
+                self._conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS review_index USING fts5(
+                        text,
+                        google_place_id UNINDEXED,
+                        author UNINDEXED,
+                        rating UNINDEXED,
+                        tokenize = 'porter unicode61'
+                    )
+                """)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS review_index (
+                        text TEXT,
+                        google_place_id TEXT,
+                        author TEXT,
+                        rating INTEGER
+                    )
+                """)
+                self.has_fts = False
+
+    def get_google_place_id(self, source_key: str) -> Optional[str]:
+        """Return the remembered Google place id, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT google_place_id FROM place_ids WHERE source_key = ?",
+                (source_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_google_place_id(self, source_key: str, google_place_id: str) -> None:
+        """Remember (or update) which Google place a restaurant resolved to"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO place_ids (source_key, google_place_id, resolved_at) VALUES (?, ?, ?)",
+                (source_key, google_place_id, time.time())
+            )
+
+    def forget(self, source_key: str) -> None:
+        """Drop a mapping (e.g. the Google place no longer exists)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM place_ids WHERE source_key = ?", (source_key,))
+
+    def save_place(self, restaurant_data: Dict[str, Any], replace_reviews: bool = True) -> None:
+        """
+        Store an enriched restaurant and (optionally) re-index its reviews
+
+        Args:
+            restaurant_data: Output of GooglePlacesClient.enrich_restaurant_data
+            replace_reviews: Replace indexed reviews with restaurant_data['reviews']
+        """
+        google_place_id = restaurant_data.get('place_id')
+        if not google_place_id:
+            return
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO places
+                   (google_place_id, name, address, latitude, longitude, types, price, rating, phone, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    google_place_id,
+                    restaurant_data.get('name', 'Unknown'),
+                    restaurant_data.get('address'),
+                    restaurant_data.get('latitude'),
+                    restaurant_data.get('longitude'),
+                    json.dumps(restaurant_data.get('types', [])),
+                    restaurant_data.get('price'),
+                    restaurant_data.get('rating'),
+                    restaurant_data.get('phone'),
+                    time.time()
+                )
+            )
+
+            if replace_reviews:
+                self._conn.execute("DELETE FROM review_index WHERE google_place_id = ?", (google_place_id,))
+                self._conn.executemany(
+                    "INSERT INTO review_index (text, google_place_id, author, rating) VALUES (?, ?, ?, ?)",
+                    [
+                        (r.get('text', ''), google_place_id, r.get('author'), r.get('rating', 0))
+                        for r in restaurant_data.get('reviews', [])
+                        if r.get('text')
+                    ]
+                )
+
+    def get_place(self, google_place_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a stored place with its indexed reviews
+
+        Returns:
+            Dict shaped like enrich_restaurant_data output, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT google_place_id, name, address, latitude, longitude, types, price, rating, phone
+                   FROM places WHERE google_place_id = ?""",
+                (google_place_id,)
+            ).fetchone()
+            if not row:
+                return None
+            reviews = self._conn.execute(
+                "SELECT text, rating, author FROM review_index WHERE google_place_id = ?",
+                (google_place_id,)
+            ).fetchall()
+
+        place = self._row_to_place(row)
+        place['reviews'] = [{'text': text, 'rating': rating, 'author': author} for text, rating, author in reviews]
+        return place
+
+    def save_pitch(self, google_place_id: str, pitch: Dict[str, Any], prompt_version: Optional[str] = None) -> None:
+        """Store a pitch generated ahead of time (replaces any older one for the same cheese)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pitches (google_place_id, cheese_id, pitch, created_at, prompt_version) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (google_place_id, pitch['cheese']['id'], json.dumps(pitch), time.time(), prompt_version)
+            )
+
+    def get_pitch(
+        self,
+        google_place_id: Optional[str],
+        cheese_id: str,
+        max_age_seconds: Optional[float] = None,
+        prompt_version: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a stored pitch for a place and cheese
+
+        Args:
+            google_place_id: Google place id
+            cheese_id: Cheese the pitch is for
+            max_age_seconds: Ignore pitches older than this
+            prompt_version: Ignore pitches generated from another version
+                of the pitch prompt
+
+        Returns:
+            Pitch dict, or None
+        """
+        if not google_place_id:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pitch, created_at, prompt_version FROM pitches WHERE google_place_id = ? AND cheese_id = ?",
+                (google_place_id, cheese_id)
+            ).fetchone()
+
+        if not row:
+            return None
+        if max_age_seconds is not None and time.time() - row[1] > max_age_seconds:
+            return None
+        if prompt_version is not None and row[2] != prompt_version:
+            return None
+        return json.loads(row[0])
+
+    def search_reviews(
+        self,
+        query: str,
+        latitude: float,
+        longitude: float,
+        radius_m: float = 2000,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Find stored places near a point whose reviews mention any of the terms
+
+        Args:
+            query: Terms, e.g. "burgers or charcuterie" or "burger, charcuterie"
+            latitude: Search center latitude
+            longitude: Search center longitude
+            radius_m: Search radius in meters
+            limit: Max places returned
+
+        Returns:
+            Places (closest first) with distance_km, matched review snippets
+            and match count
+        """
+        terms = parse_search_terms(query)
+        if not terms:
+            return []
+
+        # Bounding box first (uses the lat/lon index), exact distance after
+        dlat = radius_m / 111_320
+        dlon = radius_m / (111_320 * max(math.cos(math.radians(latitude)), 0.01))
+        bbox = (latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon)
+
+        if self.has_fts:
+            match = ' OR '.join('"' + term.replace('"', '') + '"' for term in terms)
+            sql = """
+                SELECT p.google_place_id, p.name, p.address, p.latitude, p.longitude, p.types,
+                       p.price, p.rating, p.phone,
+                       snippet(review_index, 0, '[', ']', '...', 12)
+                FROM review_index
+                JOIN places p ON p.google_place_id = review_index.google_place_id
+                WHERE review_index MATCH ?
+                  AND p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ?
+            """
+            params = (match,) + bbox
+        else:
+            like = ' OR '.join('r.text LIKE ?' for _ in terms)
+            sql = f"""
+                SELECT p.google_place_id, p.name, p.address, p.latitude, p.longitude, p.types,
+                       p.price, p.rating, p.phone, substr(r.text, 1, 120)
+                FROM review_index r
+                JOIN places p ON p.google_place_id = r.google_place_id
+                WHERE ({like})
+                  AND p.latitude BETWEEN ? AND ? AND p.longitude BETWEEN ? AND ?
+            """
+            params = tuple(f"%{term}%" for term in terms) + bbox
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        places: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            distance_m = haversine_m(latitude, longitude, row[3], row[4])
+            if distance_m > radius_m:
+                continue
+
+            place = places.get(row[0])
+            if place is None:
+                place = self._row_to_place(row[:9])
+                place['distance_km'] = round(distance_m / 1000, 2)
+                place['snippets'] = []
+                places[row[0]] = place
+            place['snippets'].append(row[9])
+
+        results = sorted(places.values(), key=lambda p: p['distance_km'])[:limit]
+        for place in results:
+            place['match_count'] = len(place['snippets'])
+            place['snippets'] = place['snippets'][:3]
+        return results
+
+    @staticmethod
+    def _row_to_place(row: tuple) -> Dict[str, Any]:
+        return {
+            'place_id': row[0],
+            'name': row[1],
+            'address': row[2],
+            'latitude': row[3],
+            'longitude': row[4],
+            'types': json.loads(row[5] or '[]'),
+            'price': row[6],
+            'rating': row[7],
+            'phone': row[8]
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def parse_search_terms(query: str) -> List[str]:
+    """Split "burgers or charcuterie" / "burgers, charcuterie" into search terms"""
+    words = re.findall(r"[a-z0-9][a-z0-9'-]*", query.lower())
+    return [w for w in dict.fromkeys(words) if w not in QUERY_STOPWORDS]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters"""
+    r = 6_371_000
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * r * math.asin(math.sqrt(a))
@@ -0,0 +1,336 @@
+"""
+On-Demand Profiling for Happy Pastures Creamery
+
+Admin-only tools for finding out where a slow production request spends
+its time, and what is holding memory after large territory searches.
+
+- CPU: a sampling profiler (stdlib only, no tracing overhead on other
+  requests) that walks every thread's stack every few milliseconds while
+  one request is served. The result is exported as collapsed stacks
+  (flamegraph.pl, speedscope, inferno) or as a speedscope JSON file.
+- Memory: tracemalloc snapshots kept in memory by id, with the top
+  allocation sites of a snapshot and the diff between two snapshots.
+
+Samples come from all threads, so a request running alongside others
+also picks up their stacks; each stack is rooted at its thread's name.
+"""
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+
+PROFILE_FORMATS = ('collapsed', 'speedscope')
+
+# Leaf frames of a thread that is waiting for work, not doing any
+_IDLE_LEAVES = {('selectors.py', 'select'), ('thread.py', '_worker')}
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Frames from these files are tracemalloc's own bookkeeping
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a CPU profile is requested while another one is running"""
+
+
+def short_path(filename: str) -> str:
+    """Path relative to the backend, or from the package root for libraries"""
+    if filename.startswith(_BACKEND_DIR):
+        return os.path.relpath(filename, _BACKEND_DIR)
+    for marker in ('site-packages' + os.sep, 'dist-packages' + os.sep):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + len(marker):]
+    return os.path.basename(filename)
+
+
+class _Sampler(threading.Thread):
+    """Background thread that counts the stacks of every other thread"""
+
+    def __init__(self, interval: float, max_seconds: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.frames: Dict[Any, Tuple[str, str, int]] = {}
+        self.samples = 0
+        self.idle_samples = 0
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+
+    def _frame(self, code) -> Tuple[str, str, int]:
+        # Memoized per code object: (function, file, first line)
+        frame = self.frames.get(code)
+        if frame is None:
+            frame = (code.co_qualname, short_path(code.co_filename), code.co_firstlineno)
+            self.frames[code] = frame
+        return frame
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        deadline = self.started + self.max_seconds
+        while not self._stop_event.wait(self.interval) and time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame(frame.f_code))
+                    frame = frame.f_back
+                self.samples += 1
+                leaf = stack[0]
+                if (os.path.basename(leaf[1]), leaf[0]) in _IDLE_LEAVES:
+                    self.idle_samples += 1
+                    continue
+                self.stacks[(names.get(ident, f'thread-{ident}'), tuple(reversed(stack)))] += 1
+        self.duration = time.perf_counter() - self.started
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class CPUProfile:
+    """Stack samples of one profiled request"""
+
+    def __init__(self, sampler: _Sampler, label: str):
+        self.label = label
+        self.interval_ms = sampler.interval * 1000
+        self.duration_ms = sampler.duration * 1000
+        self.samples = sampler.samples
+        self.idle_samples = sampler.idle_samples
+        self.stacks: Dict[Tuple[str, Tuple[Tuple[str, str, int], ...]], int] = dict(sampler.stacks)
+
+    @staticmethod
+    def _frame_label(frame: Tuple[str, str, int]) -> str:
+        function, filename, line = frame
+        return f"{function} ({filename}:{line})".replace(';', ',')
+
+    def collapsed(self) -> str:
+        """
+        Collapsed ("folded") stacks, one `thread;outer;...;inner count`
+        line per distinct stack, heaviest first
+        """
+        lines = []
+        for (thread, stack), count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+            frames = [thread.replace(';', ',')] + [self._frame_label(f) for f in stack]
+            lines.append(f"{';'.join(frames)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope file format: one sampled profile per thread, weights in ms"""
+        frame_index: Dict[Tuple[str, str, int], int] = {}
+        frames: List[Dict[str, Any]] = []
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for (thread, stack), count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+                indices.append(frame_index[frame])
+            profile = profiles.setdefault(thread, {
+                'type': 'sampled', 'name': thread, 'unit': 'milliseconds',
+                'startValue': 0, 'endValue': 0, 'samples': [], 'weights': [],
+            })
+            weight = round(count * self.interval_ms, 3)
+            profile['samples'].append(indices)
+            profile['weights'].append(weight)
+            profile['endValue'] = round(profile['endValue'] + weight, 3)
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': self.label,
+            'exporter': 'happy-pastures-profiling',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            # Busiest thread first (opened by default)
+            'profiles': sorted(profiles.values(), key=lambda p: -p['endValue']),
+        }
+
+    def render(self, fmt: str) -> Tuple[str, str]:
+        """(body, media type) in one of PROFILE_FORMATS"""
+        if fmt == 'speedscope':
+            return json.dumps(self.speedscope()), 'application/json'
+        return self.collapsed(), 'text/plain; charset=utf-8'
+
+
+class RequestProfiler:
+    """Samples stacks while a single request runs (one at a time)"""
+
+    def __init__(self, interval_ms: float = 5.0, max_seconds: float = 60.0):
+        """
+        Args:
+            interval_ms: Time between samples
+            max_seconds: Sampling stops after this long, even if the
+                request is still running
+        """
+        self.interval_ms = interval_ms
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._active: Optional[_Sampler] = None
+
+    def configure(self, interval_ms: Optional[float] = None, max_seconds: Optional[float] = None) -> None:
+        if interval_ms is not None:
+            self.interval_ms = interval_ms
+        if max_seconds is not None:
+            self.max_seconds = max_seconds
+
+    def start(self) -> _Sampler:
+        """
+        Start sampling
+
+        Raises:
+            ProfilerBusyError: If another request is being profiled
+        """
+        with self._lock:
+            if self._active is not None:
+                raise ProfilerBusyError('Another request is being profiled')
+            sampler = self._active = _Sampler(self.interval_ms / 1000, self.max_seconds)
+        sampler.start()
+        return sampler
+
+    def stop(self, sampler: _Sampler, label: str = '') -> CPUProfile:
+        """Stop sampling and return the profile"""
+        sampler.stop()
+        with self._lock:
+            if self._active is sampler:
+                self._active = None
+        return CPUProfile(sampler, label)
+
+
+class MemorySnapshots:
+    """tracemalloc snapshots by id, started on first use"""
+
+    def __init__(self, frames: int = 1, max_snapshots: int = 10):
+        """
+        Args:
+            frames: Traceback depth recorded per allocation (more frames
+                cost more memory and time; 1 groups by allocating line)
+            max_snapshots: Oldest snapshots are dropped beyond this
+        """
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+        self._snapshots: 'OrderedDict[int, Tuple[float, tracemalloc.Snapshot]]' = OrderedDict()
+        self._ids = itertools.count(1)
+
+    @staticmethod
+    def _stat(stat, diff: bool = False) -> Dict[str, Any]:
+        frames = [f"{short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback]
+        entry = {
+            'location': frames[0] if len(frames) == 1 else frames,
+            'size_kb': round(stat.size / 1024, 1),
+            'count': stat.count,
+        }
+        if diff:
+            entry['size_diff_kb'] = round(stat.size_diff / 1024, 1)
+            entry['count_diff'] = stat.count_diff
+        return entry
+
+    def status(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            snapshots = [{'id': sid, 'taken_at': taken_at} for sid, (taken_at, _) in self._snapshots.items()]
+        return {
+            'tracing': tracemalloc.is_tracing(),
+            'frames': tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else self.frames,
+            'traced_mb': round(current / 1024 ** 2, 2),
+            'traced_peak_mb': round(peak / 1024 ** 2, 2),
+            'snapshots': snapshots,
+        }
+
+    def take(self, limit: int = 20, group_by: str = 'lineno') -> Dict[str, Any]:
+        """
+        Snapshot the traced allocations (starting tracemalloc if needed)
+
+        Allocations made before tracing started are not seen, so take a
+        first snapshot before the workload of interest, then diff.
+
+        Args:
+            limit: Top allocation sites to return
+            group_by: 'lineno', 'filename' or 'traceback'
+
+        Returns:
+            Snapshot id, traced memory totals and the top allocation sites
+        """
+        started = False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            started = True
+        snapshot = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+        taken_at = time.time()
+        with self._lock:
+            snapshot_id = next(self._ids)
+            self._snapshots[snapshot_id] = (taken_at, snapshot)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+        stats = snapshot.statistics(group_by)
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'id': snapshot_id,
+            'taken_at': taken_at,
+            'tracing_started': started,
+            'total_kb': round(sum(stat.size for stat in stats) / 1024, 1),
+            'traced_mb': round(current / 1024 ** 2, 2),
+            'traced_peak_mb': round(peak / 1024 ** 2, 2),
+            'top': [self._stat(stat) for stat in stats[:limit]],
+        }
+
+    def diff(self, base_id: int, current_id: Optional[int] = None, limit: int = 20,
+             group_by: str = 'lineno') -> Dict[str, Any]:
+        """
+        What changed between two snapshots, biggest growth first
+
+        Args:
+            base_id: Earlier snapshot
+            current_id: Later snapshot (default: take one now)
+            limit: Allocation sites to return
+            group_by: 'lineno', 'filename' or 'traceback'
+
+        Returns:
+            Net size change and the allocation sites that changed most
+
+        Raises:
+            KeyError: If a snapshot id is unknown or was dropped
+        """
+        with self._lock:
+            base = self._snapshots[base_id][1]
+        if current_id is None:
+            current_id = self.take(limit=0)['id']
+        with self._lock:
+            current = self._snapshots[current_id][1]
+
+        stats = current.compare_to(base, group_by)
+        return {
+            'base': base_id,
+            'current': current_id,
+            'size_diff_kb': round(sum(stat.size_diff for stat in stats) / 1024, 1),
+            'top': [self._stat(stat, diff=True) for stat in stats[:limit]],
+        }
+
+    def reset(self) -> None:
+        """Stop tracing and drop all snapshots"""
+        with self._lock:
+            self._snapshots.clear()
+        tracemalloc.stop()
+
+
+# Shared instances (configured from config.py at app startup)
+profiler = RequestProfiler()
+memory_snapshots = MemorySnapshots()
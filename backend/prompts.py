@@ -0,0 +1,296 @@
+"""
+Prompt Registry for Happy Pastures Creamery
+
+Every Claude prompt template lives here, once. Templates are compiled at
+import (placeholders checked) and get a short content hash as their
+version. Cache keys and metrics carry that version, so editing a template
+invalidates exactly the cached results that depended on it, and versions
+can be compared on latency and token usage (/api/metrics/models,
+/api/metrics/costs).
+"""
+import hashlib
+from string import Formatter
+from typing import Dict, Any, Optional
+
+
+# Prepended to persona refinements so the LLM never uses [Name] placeholders
+SALESPERSON_IDENTITY = "IMPORTANT: The salesperson's name is Hillary. The company is Happy Pastures Creamery. Never use [Name] or [Company] placeholders — always use these exact names.\n\n"
+
+
+class PromptTemplate:
+    """A named prompt template with a content-hash version"""
+
+    def __init__(self, name: str, template: str):
+        """
+        Compile a template
+
+        Args:
+            name: Registry name, e.g. 'pitch' or 'micro:shorten'
+            template: str.format template ({{ }} for literal braces)
+
+        Raises:
+            ValueError: If the template has positional or malformed fields
+        """
+        self.name = name
+        self.template = template
+        self.fields = set()
+        for _, field, _, _ in Formatter().parse(template):
+            if field is None:
+                continue
+            if not field.isidentifier():
+                raise ValueError(f"Prompt '{name}' has an invalid field: {{{field}}}")
+            self.fields.add(field)
+        self.version = hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+
+    def render(self, **values: Any) -> str:
+        """
+        Fill in the template
+
+        Raises:
+            KeyError: If a field is missing
+        """
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' is missing: {', '.join(sorted(missing))}")
+        return self.template.format(**values)
+
+
+_TEMPLATES = {
+    'pitch': """You are a sales assistant helping Hillary from Happy Pastures Creamery sell artisan cheese to restaurants.
+
+RESTAURANT PROFILE:
+{restaurant_context}
+
+CHEESE PRODUCT TO PITCH:
+{cheese_context}
+
+Generate a compelling, concise sales pitch that Hillary can use when she walks into this restaurant. The pitch should:
+
+1. **Opening Hook** (1-2 sentences): Why this cheese is perfect for THIS specific restaurant
+2. **3-4 Specific Menu Pairings**: Real dishes from their reviews/menu that would work beautifully with this cheese
+3. **Key Selling Points** (2-3 bullets): What makes HPC cheese special (local, sustainable, small-batch, etc.)
+4. **Competitive Advantage**: Why artisan > generic cheese for their menu
+5. **Call to Action**: Simple next step (sample order, tasting, etc.)
+
+Keep it conversational and focused on THEIR menu and THEIR customers. Hillary will read this on her phone before walking in, so keep it scannable and practical.
+
+Format as JSON:
+{{
+  "opening_hook": "...",
+  "menu_pairings": [
+    {{"dish": "...", "why_it_works": "..."}},
+    ...
+  ],
+  "selling_points": ["...", "...", "..."],
+  "competitive_advantage": "...",
+  "call_to_action": "..."
+}}""",
+
+    'refine:walking': SALESPERSON_IDENTITY + """You are helping a cheese salesperson create a quick walking-and-talking version of their pitch.
+
+Take this sales pitch and condense it into a 20-second version that is:
+- Natural and conversational (like talking to a friend)
+- Easy to memorize (simple structure, memorable phrases)
+- Covers only the most essential points
+- Flows smoothly when spoken aloud
+- Perfect for practicing while walking to the restaurant
+
+Think of this as the "elevator pitch" version - what would you say if you only had 20 seconds?
+
+Original pitch:
+{original_pitch}
+
+Create a 20-second walking-and-talking version. Format it as natural speech (not bullet points).
+Make it flow like one continuous thought that's easy to remember and deliver casually.
+
+Focus on: The hook, the key benefit, and a simple ask. That's it.""",
+
+    'refine:chef': SALESPERSON_IDENTITY + """You are helping a cheese salesperson refine their pitch to speak directly to a CHEF or kitchen staff.
+
+Take this sales pitch and rewrite it to be:
+- Technical and culinary-focused (talk about aging, melt point, flavor chemistry)
+- Peer-to-peer tone (chef talking to chef)
+- Emphasize creative applications and cooking techniques
+- Keep it conversational and under 60 seconds when spoken
+- Include specific culinary terms where appropriate
+
+Original pitch:
+{original_pitch}
+
+Rewrite this pitch for a chef. Format it as natural talking points (not a formal letter).
+Start with a friendly opening, then cover the technical cheese details, pairing ideas,
+and end with a soft ask to let their team "play with" a sample.
+
+Avoid: Business talk, pricing, margins, formal language""",
+
+    'refine:manager': SALESPERSON_IDENTITY + """You are helping a cheese salesperson refine their pitch to speak to a RESTAURANT OWNER or MANAGER.
+
+Take this sales pitch and rewrite it to be:
+- Business-focused with clear ROI
+- Professional tone but not stuffy
+- Emphasize margins, menu differentiation, local sourcing story
+- Include concrete numbers where possible
+- Keep it under 90 seconds when spoken
+
+Original pitch:
+{original_pitch}
+
+Rewrite this pitch for a manager/owner. Format it as natural talking points.
+Start with business credibility, then explain the value proposition (margin opportunity,
+local story, competitive advantage), and end with a clear next step (sample + pricing discussion).
+
+Focus on: How this makes them money and differentiates their menu.""",
+
+    'refine:gatekeeper': SALESPERSON_IDENTITY + """You are helping a cheese salesperson get past a HOST or FRONT DESK PERSON to reach the decision maker.
+
+Take this sales pitch and create a VERY SHORT version (30 seconds max) that:
+- Shows respect for the gatekeeper's time
+- Builds quick credibility (mention working with other local restaurants)
+- Makes a specific, easy ask (when can I drop off a sample?)
+- Provides an alternative (leave it with you to pass along)
+- Stays warm and friendly
+
+Original pitch:
+{original_pitch}
+
+Rewrite as an ultra-concise pitch for getting past the front desk. Format as natural dialogue.
+Structure: Brief intro → Quick credibility → Specific observation → Simple ask → Respectful acknowledgment
+
+Avoid: Long explanations, sales pressure, anything that takes more than 30 seconds to say""",
+
+    'micro:shorten': """Take this sales pitch and condense it to 20-30 seconds when spoken aloud.
+
+Keep only the most impactful points. Remove any fluff. Be concise but compelling.
+
+Current pitch:
+{current_pitch}
+
+Condensed version (20-30 seconds):""",
+
+    'micro:expand': """Take this sales pitch and expand it with more detail and specific examples.
+
+Add 1-2 concrete stories, statistics, or sensory details that make it more vivid and memorable.
+
+Current pitch:
+{current_pitch}
+
+Expanded version:""",
+
+    'micro:casual': """Rewrite this sales pitch in a more conversational, casual tone.
+
+Make it sound like you're talking to a friend. Use contractions, simpler words, more natural phrasing.
+
+Current pitch:
+{current_pitch}
+
+Casual version:""",
+
+    'micro:formal': """Rewrite this sales pitch in a more professional, polished tone.
+
+Elevate the language without being stuffy. Sound authoritative and confident.
+
+Current pitch:
+{current_pitch}
+
+Formal version:""",
+
+    'micro:strong_opener': """Rewrite this pitch with a powerful, attention-grabbing opening line.
+
+Hook them immediately with an unexpected fact, bold statement, or compelling question.
+Keep the rest of the pitch mostly the same, but nail that first sentence.
+
+Current pitch:
+{current_pitch}
+
+Version with strong opener:""",
+
+    'classify:fine_dining': """Analyze this restaurant and determine if it's suitable for selling high-end artisan cheese (Pasture Bloom Triple Crème - a delicate, expensive triple crème cheese for fine dining).
+
+Restaurant: {restaurant_json}
+
+Exclude if:
+- Fast food or chain restaurant (IHOP, McDonald's, Chipotle, etc.)
+- Casual dining (grills, diners, taverns, inns)
+- Pizza places, Asian restaurants, Mexican fast-casual
+- Coffee shops, cafes, bagel shops, delis
+- Any place with casual indicators in name (kitchen, eats, eatery, grill)
+
+Include if:
+- Fine dining (French, Italian, European, steakhouse, upscale seafood)
+- Name suggests upscale (Trattoria, Bistro, Le/La/Chez, etc.)
+- High price level
+
+Answer with just "SUITABLE" or "EXCLUDE" and brief reason.""",
+
+    'classify:upscale': """Analyze this restaurant and determine if it's suitable for selling artisan cheese (any upscale restaurant).
+
+Restaurant: {restaurant_json}
+
+Exclude if:
+- Fast food or chain restaurant
+- Pizza, Asian, Mexican fast-casual
+- Coffee shops, delis, bagel shops
+
+Include if:
+- Any upscale restaurant, any cuisine
+- Creative menu, quality focus
+
+Answer with just "SUITABLE" or "EXCLUDE" and brief reason.""",
+
+    'classify_batch': """Hillary sells premium artisan cheeses ($30-50/lb) and needs high-quality restaurant prospects.
+
+CRITICAL: Cheese/dairy does NOT pair well with Asian cuisines. We must filter out ALL Asian restaurants.
+
+Restaurants to evaluate:
+{restaurants_text}
+
+KEEP if restaurant is:
+✓ Fine dining: French (Bistro, Brasserie), Italian (Trattoria, Osteria), European
+✓ Upscale steakhouses, upscale seafood (like Oceanique)
+✓ Quality casual: Tapas bars (like Tapas Barcelona), upscale cafes (Bluestone Cafe)
+✓ Chef-driven, creative menus, would use artisan ingredients
+✓ Mediterranean, Middle Eastern (if cheese-friendly)
+✓ Likely $20+ entrees, quality-focused
+
+EXCLUDE if:
+✗ No name or "Unknown" - cannot prospect without a proper restaurant name
+✗ Fast food or chains (IHOP, Applebee's, Chipotle, Olive Garden, etc.)
+✗ Obvious casual: diners, "grill", "kitchen", "eats", taverns, sports bars
+✗ Pizza places (unless upscale wood-fired)
+✗ **ANY Asian cuisine**: Chinese, Japanese, Thai, Korean, Vietnamese, Indian, Malaysian, Indonesian, Filipino
+✗ Asian restaurants (even if upscale): Sushi, ramen, pho, curry, dim sum, hibachi, izakaya, yakitori
+✗ Asian-sounding names: Siam, Paragon, Shinsen, Todoroki, Kansaku, Soban, any Japanese/Thai/Chinese/Korean/Indian names
+✗ Mexican fast-casual (burrito, taco shops)
+✗ Coffee shops (unless clearly upscale cafe with food menu)
+✗ Delis, bagel shops, sandwich shops
+
+**IMPORTANT**: Be very strict with Asian cuisine. Even if it looks upscale, if the name sounds Asian or the cuisine is Asian, EXCLUDE it. Cheese does not pair well with Asian food.
+
+When in doubt: Would this restaurant appreciate and USE a $40/lb artisan cheese in their dishes? If yes, KEEP. If no or unsure, EXCLUDE.
+
+For each number: "1. KEEP" or "1. EXCLUDE". One per line."""
+}
+
+# Compiled once at import
+PROMPTS: Dict[str, PromptTemplate] = {name: PromptTemplate(name, text) for name, text in _TEMPLATES.items()}
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    """
+    Look up a compiled prompt
+
+    Raises:
+        KeyError: For unknown prompt names
+    """
+    return PROMPTS[name]
+
+
+def version_of(name: str) -> Optional[str]:
+    """Content-hash version of a prompt, or None for unknown names"""
+    prompt = PROMPTS.get(name)
+    return prompt.version if prompt else None
+
+
+def prompt_versions() -> Dict[str, str]:
+    """Name -> content-hash version for every registered prompt"""
+    return {name: prompt.version for name, prompt in sorted(PROMPTS.items())}
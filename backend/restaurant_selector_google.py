@@ -9,7 +9,10 @@ sys.path.insert(0, os.path.dirname(__file__))
 from geoapify_client import GeoapifyClient
 from google_places_client import GooglePlacesClient, estimate_cost
 from sales_pitch_generator import SalesPitchGenerator
-from config import GEOAPIFY_API_KEY, ANTHROPIC_API_KEY, GOOGLE_PLACES_API_KEY
+from config import (
+    GEOAPIFY_API_KEY, ANTHROPIC_API_KEY, GOOGLE_PLACES_API_KEY,
+    GOOGLE_BULK_MAX_CONCURRENCY, GOOGLE_ENRICH_BUDGET_USD
+)
 
 
 def select_restaurant_interactive(restaurants: list) -> dict:
@@ -20,7 +23,7 @@ def select_restaurant_interactive(restaurants: list) -> dict:
         restaurants: List of restaurant feature dicts from Geoapify
 
     Returns:
-        Selected restaurant feature dict
+        Selected restaurant feature dict, or None to enrich all of them
     """
     print("\n" + "="*80)
     print("🧀 SELECT A RESTAURANT TO LEARN MORE ABOUT")
@@ -40,12 +43,15 @@ def select_restaurant_interactive(restaurants: list) -> dict:
 
     while True:
         try:
-            choice = input(f"\nEnter restaurant number (1-{len(restaurants)}) or 'q' to quit: ").strip()
+            choice = input(f"\nEnter restaurant number (1-{len(restaurants)}), 'a' to enrich all, or 'q' to quit: ").strip()
 
             if choice.lower() == 'q':
                 print("Exiting...")
                 sys.exit(0)
 
+            if choice.lower() == 'a':
+                return None
+
             idx = int(choice) - 1
             if 0 <= idx < len(restaurants):
                 return restaurants[idx]
@@ -175,6 +181,40 @@ def display_menu_data(restaurant_data: dict, google_client: GooglePlacesClient,
     print("="*80)
 
 
+def enrich_all(restaurants: list, google_client: GooglePlacesClient):
+    """
+    Enrich every restaurant in the list concurrently, within the budget
+
+    Args:
+        restaurants: List of restaurant feature dicts from Geoapify
+        google_client: Google Places client
+    """
+    items = []
+    for feature in restaurants:
+        props = feature.get('properties', {})
+        coords = feature.get('geometry', {}).get('coordinates', [None, None])
+        items.append((props.get('name'), coords[1], coords[0]))
+
+    print(f"\n🔍 Enriching {len(items)} restaurants on Google Places "
+          f"({GOOGLE_BULK_MAX_CONCURRENCY} at a time, budget ${GOOGLE_ENRICH_BUDGET_USD:.2f})...")
+
+    bulk = google_client.enrich_restaurants_bulk(
+        items,
+        max_concurrency=GOOGLE_BULK_MAX_CONCURRENCY,
+        budget_usd=GOOGLE_ENRICH_BUDGET_USD
+    )
+
+    status_icons = {'ok': '✅', 'not_found': '❓', 'error': '❌', 'skipped_budget': '💸'}
+    for result in bulk['results']:
+        data = result['data'] or {}
+        details = f"{data.get('rating', 'N/A')}/5, {data.get('price', 'N/A')}" if data else result['status']
+        print(f"  {status_icons.get(result['status'], '•')} {result['name']} ({details})")
+
+    summary = bulk['summary']
+    print(f"\n💰 Estimated spend: ${summary['estimated_cost_usd']:.3f} "
+          f"({summary['enriched']} enriched, {summary['skipped_budget']} skipped for budget)")
+
+
 def main():
     """Main CLI program"""
 
@@ -233,14 +273,19 @@ def main():
 
     # Show cost estimate
     costs = estimate_cost(len(features))
+    list_costs = estimate_cost(len(features), tier='contact')
     print(f"\n💰 Google Places API Cost Estimate:")
-    print(f"   • {costs['cost_per_restaurant']} per restaurant")
-    print(f"   • {costs['total_cost']} for all {len(features)} restaurants")
+    print(f"   • {costs['cost_per_restaurant']} per restaurant (with reviews)")
+    print(f"   • {list_costs['total_cost']} to enrich all {len(features)} restaurants (no reviews)")
     print(f"   • {costs['note']}")
 
     # Let user select a restaurant
     selected = select_restaurant_interactive(features)
 
+    if selected is None:
+        enrich_all(features, google_client)
+        return
+
     # Get restaurant details
     props = selected.get('properties', {})
     name = props.get('name')
@@ -250,7 +295,7 @@ def main():
     lon = coords[0]
 
     print(f"\n🔍 Looking up '{name}' on Google Places...")
-    print(f"💰 Cost for this lookup: ~$0.032")
+    print(f"💰 Cost for this lookup: ~{costs['cost_per_restaurant']}")
 
     # Get Google Places data
     google_data = google_client.enrich_restaurant_data(name, lat, lon)
@@ -0,0 +1,79 @@
+"""
+Review Context Compression for Happy Pastures Creamery
+
+Picks the review sentences worth sending to Claude. Every sentence is
+scored for food / menu relevance (dishes, ingredients that pair with our
+cheeses, menu words) and the best ones are packed into a fixed token
+budget, instead of pasting the first 200 characters of the first three
+reviews ("Came here for my anniversary...").
+"""
+from typing import Dict, Any, List, Tuple
+
+from review_features import review_features
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+def score_sentence(dish_hits: int, menu_hits: int, filler_hits: int) -> float:
+    """
+    Food / menu relevance of one sentence
+
+    Dish and pairing-ingredient mentions count most, menu words a little,
+    visit filler counts against it.
+    """
+    return 3.0 * dish_hits + 1.0 * menu_hits - 1.5 * filler_hits
+
+
+def build_review_context(
+    restaurant_data: Dict[str, Any],
+    token_budget: int = 250,
+    max_sentence_chars: int = 240
+) -> List[str]:
+    """
+    Select the most menu-relevant review sentences within a token budget
+
+    Sentences and their keyword counts come from the restaurant's review
+    features, so the reviews aren't scanned again here.
+
+    Args:
+        restaurant_data: Restaurant dict with 'reviews' (dicts with 'text')
+        token_budget: Max (estimated) tokens for the selected sentences
+        max_sentence_chars: Longer sentences are trimmed to this length
+
+    Returns:
+        Selected sentences, in the order they appear in the reviews
+    """
+    candidates: List[Tuple[float, int, str]] = []
+    seen = set()
+    position = 0
+    for sentence, *hits in review_features.extract(restaurant_data)['sentences']:
+        sentence = ' '.join(sentence.split())
+        if len(sentence) < 12:
+            continue
+        if len(sentence) > max_sentence_chars:
+            sentence = sentence[:max_sentence_chars].rsplit(' ', 1)[0] + '...'
+
+        key = sentence.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+
+        score = score_sentence(*hits)
+        if score > 0:
+            candidates.append((score, position, sentence))
+        position += 1
+
+    # Best first (earlier sentence wins ties), then pack into the budget
+    selected: List[Tuple[int, str]] = []
+    used = 0
+    for score, position, sentence in sorted(candidates, key=lambda c: (-c[0], c[1])):
+        cost = estimate_tokens(sentence)
+        if used + cost > token_budget:
+            continue
+        selected.append((position, sentence))
+        used += cost
+
+    return [sentence for _, sentence in sorted(selected)]
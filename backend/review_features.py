@@ -0,0 +1,443 @@
+"""
+Review Feature Extraction for Happy Pastures Creamery
+
+Every text heuristic about a restaurant - Asian cuisine detection, cheese
+match signals, menu-hint sentences, dish mentions, the review sentences
+picked for Claude's context - reads the same name, types and reviews.
+Instead of each lowercasing and re-scanning the reviews with its own
+keyword list, the extractor scans each text once with a single
+trie-shaped regex covering every keyword list, and derives all the
+signals from that one list of hits.
+
+Features are cached by restaurant content, so detect_asian_cuisine,
+determine_cheese_match, the local pitch engine and the pitch prompt's
+review context share one scan per restaurant. extract_batch scores whole
+prospect lists, optionally across a process pool.
+"""
+import bisect
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from cheese_products import CHEESE_PRODUCTS
+from ttl_cache import TTLCache
+
+
+# Asian cuisine indicators (dairy-incompatible)
+ASIAN_KEYWORDS = {
+    'strong': [
+        'sushi', 'ramen', 'pho', 'pad thai', 'dim sum', 'curry', 'tikka',
+        'tandoor', 'bibimbap', 'bulgogi', 'teriyaki', 'tempura', 'udon',
+        'soba', 'miso', 'kimchi', 'dumpling', 'bao', 'noodle', 'wok',
+        'szechuan', 'hunan', 'cantonese', 'thai', 'chinese', 'japanese',
+        'korean', 'vietnamese', 'indian', 'asian', 'siam', 'tofu'
+    ],
+    'moderate': [
+        'rice bowl', 'stir fry', 'spring roll', 'edamame', 'sake',
+        'wasabi', 'ginger', 'soy sauce', 'sesame'
+    ]
+}
+
+ASIAN_TYPES = ['asian', 'chinese', 'japanese', 'thai', 'korean', 'vietnamese', 'indian']
+
+# Words that make a review sentence a menu hint
+FOOD_KEYWORDS = [
+    'steak', 'pasta', 'salad', 'burger', 'fish', 'chicken',
+    'lamb', 'pork', 'duck', 'risotto', 'soup', 'dessert',
+    'wine', 'cocktail', 'cheese', 'bread', 'seafood',
+    'lobster', 'crab', 'oyster', 'tuna', 'salmon', 'scallops',
+    'appetizer', 'entree', 'dish', 'special'
+]
+
+# Dish phrases we look for in reviews -> (menu label, dish category)
+DISH_LEXICON = {
+    'mac and cheese': ('Mac and cheese', 'melt'),
+    'mac & cheese': ('Mac and cheese', 'melt'),
+    'grilled cheese': ('Grilled cheese', 'sandwich'),
+    'cheese plate': ('Cheese plate', 'board'),
+    'cheese board': ('Cheese plate', 'board'),
+    'charcuterie': ('Charcuterie board', 'board'),
+    'tasting menu': ('Tasting menu course', 'course'),
+    'short rib': ('Short rib', 'rich_protein'),
+    'pulled pork': ('Pulled pork', 'smoked_protein'),
+    'pork chop': ('Pork chop', 'rich_protein'),
+    'burger': ('Burgers', 'sandwich'),
+    'cheeseburger': ('Burgers', 'sandwich'),
+    'sandwich': ('Sandwiches', 'sandwich'),
+    'pizza': ('Pizza', 'melt'),
+    'flatbread': ('Flatbread', 'melt'),
+    'fries': ('Fries', 'side'),
+    'poutine': ('Poutine', 'melt'),
+    'wings': ('Wings', 'smoked_protein'),
+    'brisket': ('Brisket', 'smoked_protein'),
+    'bbq': ('BBQ plates', 'smoked_protein'),
+    'sausage': ('Sausage', 'smoked_protein'),
+    'bacon': ('Bacon dishes', 'smoked_protein'),
+    'steak': ('Steak', 'rich_protein'),
+    'lamb': ('Lamb', 'rich_protein'),
+    'duck': ('Duck', 'rich_protein'),
+    'scallop': ('Scallops', 'seafood'),
+    'lobster': ('Lobster', 'seafood'),
+    'oyster': ('Oysters', 'seafood'),
+    'salmon': ('Salmon', 'seafood'),
+    'bisque': ('Bisque', 'sauce'),
+    'risotto': ('Risotto', 'sauce'),
+    'pasta': ('Pasta', 'sauce'),
+    'gnocchi': ('Gnocchi', 'sauce'),
+    'tart': ('Savory tart', 'pastry'),
+    'souffle': ('Soufflé', 'pastry'),
+    'soufflé': ('Soufflé', 'pastry'),
+    'crepe': ('Crêpes', 'pastry'),
+    'quiche': ('Quiche', 'pastry'),
+    'omelette': ('Omelette', 'pastry'),
+    'salad': ('Salads', 'salad'),
+    'mushroom': ('Mushroom dishes', 'salad'),
+    'fig': ('Fig plates', 'board'),
+}
+
+# Words that say a review sentence is about food or the menu
+MENU_WORDS = {
+    'menu', 'dish', 'dishes', 'ordered', 'order', 'appetizer', 'appetizers', 'entree', 'entrees',
+    'dessert', 'desserts', 'special', 'specials', 'sauce', 'cheese', 'cheesy', 'plate', 'board',
+    'flavor', 'flavors', 'delicious', 'tasty', 'chef', 'kitchen', 'seasonal', 'tasting', 'wine',
+    'beer', 'cocktail', 'cocktails', 'smoked', 'roasted', 'grilled', 'fried', 'crispy', 'creamy',
+    'melted', 'house-made', 'homemade', 'brunch', 'lunch', 'dinner', 'starter', 'starters', 'side',
+}
+
+# Words that mark filler about the visit rather than the food
+FILLER_WORDS = {
+    'anniversary', 'birthday', 'parking', 'reservation', 'waited', 'wait', 'staff', 'service',
+    'server', 'waiter', 'waitress', 'friendly', 'ambiance', 'atmosphere', 'decor', 'bathroom',
+    'loud', 'noisy', 'music', 'date', 'location', 'recommend',
+}
+
+# Reviews that count for cuisine and cheese menu signals
+MENU_REVIEWS = 5
+
+MAX_MENU_HINTS = 10
+
+_SENTENCE_END = re.compile(r"[.!?]")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _trie_pattern(keywords: List[str]) -> Optional[re.Pattern]:
+    """
+    Regex finding, at every position, the longest keyword starting there
+
+    The alternation is nested as a trie (one branch per next character), so
+    scanning a text costs about the same however many keywords there are.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f"(?:{body})?" if '' in node else body
+
+    return re.compile(f"(?=({build(trie)}))") if keywords else None
+
+
+def _prefix_table(keywords: List[str]) -> Dict[str, List[str]]:
+    """
+    keyword -> keywords it starts with, longest first
+
+    A regex hit is the longest keyword at its position; every shorter
+    keyword matching there is a prefix of it.
+    """
+    return {
+        keyword: sorted((k for k in keywords if keyword.startswith(k)), key=len, reverse=True)
+        for keyword in keywords
+    }
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def _pairing_terms(catalog: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Pairing ingredients and ideal uses from the cheese catalog, lowercased"""
+    terms = []
+    for cheese in catalog.values():
+        for values in cheese.get('pairings', {}).values():
+            terms += [v.lower() for v in values]
+        terms += [use.lower() for use in cheese.get('ideal_uses', [])]
+    return terms
+
+
+class ReviewFeatureExtractor:
+    """Scans a restaurant's name, types and reviews once for every text signal"""
+
+    def __init__(self, catalog: Optional[Dict[str, Dict[str, Any]]] = None, cache_size: int = 2000):
+        """
+        Compile the keyword lists
+
+        Args:
+            catalog: Cheese products whose match_rules keywords to look for
+                (default: CHEESE_PRODUCTS)
+            cache_size: Restaurants whose features are kept
+        """
+        self._catalog = catalog
+        catalog = catalog if catalog is not None else CHEESE_PRODUCTS
+
+        cheese_types, cheese_menu = [], []
+        for cheese in catalog.values():
+            rules = cheese.get('match_rules', {})
+            cheese_types += [k.lower() for k in rules.get('type_keywords', [])]
+            cheese_menu += [k.lower() for k in rules.get('menu_keywords', [])]
+
+        # Dishes plus the ingredients our cheeses pair with, for review sentence scoring
+        self._pairing = set(DISH_LEXICON) | set(_pairing_terms(catalog))
+
+        text_keywords = list(dict.fromkeys(
+            ASIAN_KEYWORDS['strong'] + ASIAN_KEYWORDS['moderate'] + FOOD_KEYWORDS + cheese_menu + list(DISH_LEXICON)
+            + sorted(self._pairing) + sorted(MENU_WORDS) + sorted(FILLER_WORDS)
+        ))
+        type_keywords = list(dict.fromkeys(ASIAN_TYPES + cheese_types))
+        self._text_pattern = _trie_pattern(text_keywords)
+        self._type_pattern = _trie_pattern(type_keywords)
+
+        self._text_prefixes = _prefix_table(text_keywords)
+        self._type_prefixes = _prefix_table(type_keywords)
+        self._food = set(FOOD_KEYWORDS)
+        self._cache = TTLCache(maxsize=cache_size, ttl=None)
+
+    @staticmethod
+    def _cache_key(restaurant: Dict[str, Any]) -> tuple:
+        return (
+            restaurant.get('name'),
+            tuple(restaurant.get('types', [])),
+            tuple(restaurant.get('categories', [])),
+            restaurant.get('price'),
+            tuple(r.get('text', '') for r in restaurant.get('reviews', []))
+        )
+
+    def extract(self, restaurant: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        All text features of one restaurant (cached by content)
+
+        Returns:
+            Dict with type_hits, name_hits and menu_hits (keyword sets),
+            price, asian (detect_asian_cuisine result), menu_hints
+            (sentences), dishes ((label, category, count), most
+            mentioned first) and sentences ((review sentence, dish /
+            pairing, menu word and filler word counts), in review order).
+            Shared between callers - don't modify it.
+        """
+        key = self._cache_key(restaurant)
+        features = self._cache.get(key)
+        if features is None:
+            features = self._compute(restaurant)
+            self._cache.set(key, features)
+        return features
+
+    def extract_batch(self, restaurants: List[Dict[str, Any]], processes: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Features for many restaurants
+
+        Args:
+            restaurants: Restaurant dicts
+            processes: Compute uncached restaurants across this many worker
+                processes (worth it for hundreds of restaurants)
+
+        Returns:
+            One features dict per restaurant, in order
+        """
+        keys = [self._cache_key(r) for r in restaurants]
+        results = [self._cache.get(key) for key in keys]
+        missing = [i for i, features in enumerate(results) if features is None]
+
+        if processes and processes > 1 and len(missing) > 1:
+            chunksize = max(1, len(missing) // (processes * 4))
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                     initargs=(self._catalog,)) as pool:
+                computed = list(pool.map(_extract_in_worker, [restaurants[i] for i in missing], chunksize=chunksize))
+        else:
+            computed = [self._compute(restaurants[i]) for i in missing]
+
+        for i, features in zip(missing, computed):
+            self._cache.set(keys[i], features)
+            results[i] = features
+        return results
+
+    def _scan(self, text: str, types: bool = False) -> List[Tuple[int, List[str]]]:
+        """(position, keywords starting there) for every hit, in text order"""
+        pattern, prefixes = (self._type_pattern, self._type_prefixes) if types else \
+            (self._text_pattern, self._text_prefixes)
+        if not pattern or not text:
+            return []
+        return [(m.start(), prefixes[m.group(1)]) for m in pattern.finditer(text)]
+
+    def _compute(self, restaurant: Dict[str, Any]) -> Dict[str, Any]:
+        types = list(restaurant.get('types', [])) + list(restaurant.get('categories', []))
+        type_text = ' '.join(t.lower() for t in types)
+        type_hits = {k for _, keywords in self._scan(type_text, types=True) for k in keywords}
+
+        name_hits = {k for _, keywords in self._scan((restaurant.get('name') or '').lower()) for k in keywords}
+
+        menu_hits = set()
+        menu_hints: List[str] = []
+        dish_counts: Counter = Counter()
+        first_seen: Dict[str, int] = {}
+        sentences: List[Tuple[str, int, int, int]] = []
+
+        for index, review in enumerate(restaurant.get('reviews', [])):
+            raw = review.get('text', '')
+            text = raw.lower()
+            hits = self._scan(text)
+
+            if index < MENU_REVIEWS:
+                for _, keywords in hits:
+                    menu_hits.update(keywords)
+
+            for label, category in self._dishes(text, hits):
+                dish_counts[(label, category)] += 1
+                first_seen.setdefault(label, len(first_seen))
+
+            menu_hints += self._menu_hints(text, hits)
+            # Hit positions index the lowercased text; it only differs in length for rare characters
+            sentences += self._sentences(raw if len(raw) == len(text) else text, text, hits)
+
+        ranked = sorted(dish_counts.items(), key=lambda item: (-item[1], first_seen[item[0][0]]))
+
+        return {
+            'type_hits': frozenset(type_hits),
+            'name_hits': frozenset(name_hits),
+            'menu_hits': frozenset(menu_hits),
+            'price': restaurant.get('price'),
+            'asian': self._asian(type_hits, name_hits, menu_hits),
+            'menu_hints': list(dict.fromkeys(menu_hints))[:MAX_MENU_HINTS],
+            'dishes': [(label, category, count) for (label, category), count in ranked],
+            'sentences': sentences
+        }
+
+    @staticmethod
+    def _whole_words(
+        text: str,
+        hits: List[Tuple[int, List[str]]],
+        terms: Any,
+        plurals: bool = True
+    ) -> List[Tuple[int, str]]:
+        """
+        (position, term) for mentions of `terms` as whole words (plural 's' /
+        'es' allowed), longest phrase first and non-overlapping, left to right
+        """
+        suffixes = ('es', 's', '') if plurals else ('',)
+        found = []
+        scanned_to = 0
+        for start, keywords in hits:
+            if start < scanned_to or (start > 0 and _is_word_char(text[start - 1])):
+                continue
+            for keyword in keywords:
+                if keyword not in terms:
+                    continue
+                end = start + len(keyword)
+                match_end = next(
+                    (end + len(suffix) for suffix in suffixes
+                     if text.startswith(suffix, end)
+                     and (end + len(suffix) == len(text) or not _is_word_char(text[end + len(suffix)]))),
+                    None
+                )
+                if match_end is not None:
+                    found.append((start, keyword))
+                    scanned_to = match_end
+                    break
+        return found
+
+    def _dishes(self, text: str, hits: List[Tuple[int, List[str]]]) -> List[Tuple[str, str]]:
+        """Dish mentions, in text order"""
+        return [DISH_LEXICON[keyword] for _, keyword in self._whole_words(text, hits, DISH_LEXICON)]
+
+    def _sentences(self, raw: str, text: str, hits: List[Tuple[int, List[str]]]) -> List[Tuple[str, int, int, int]]:
+        """Each sentence of a review with its dish / pairing, menu word and filler word counts"""
+        counted = [
+            [start for start, _ in self._whole_words(text, hits, self._pairing)],
+            [start for start, _ in self._whole_words(text, hits, MENU_WORDS, plurals=False)],
+            [start for start, _ in self._whole_words(text, hits, FILLER_WORDS, plurals=False)],
+        ]
+
+        sentences = []
+        sentence_start = 0
+        for end, next_start in [(m.start(), m.end()) for m in _SENTENCE_BREAK.finditer(raw)] + [(len(raw), len(raw))]:
+            if end > sentence_start:
+                counts = [bisect.bisect_left(starts, end) - bisect.bisect_left(starts, sentence_start)
+                          for starts in counted]
+                sentences.append((raw[sentence_start:end], *counts))
+            sentence_start = next_start
+        return sentences
+
+    def _menu_hints(self, text: str, hits: List[Tuple[int, List[str]]]) -> List[str]:
+        """Short sentences mentioning food"""
+        food_starts = [start for start, keywords in hits if any(k in self._food for k in keywords)]
+        if not food_starts:
+            return []
+
+        hints = []
+        sentence_start = 0
+        for end in [m.start() for m in _SENTENCE_END.finditer(text)] + [len(text)]:
+            # Any food hit inside this sentence?
+            i = bisect.bisect_left(food_starts, sentence_start)
+            if i < len(food_starts) and food_starts[i] < end:
+                sentence = text[sentence_start:end].strip()
+                if 10 < len(sentence) < 150:
+                    hints.append(sentence.capitalize())
+            sentence_start = end + 1
+        return hints
+
+    @staticmethod
+    def _asian(type_hits: set, name_hits: set, menu_hits: set) -> Dict[str, Any]:
+        reasons = []
+        score = 0
+
+        # Restaurant types (strongest signal)
+        for asian_type in ASIAN_TYPES:
+            if asian_type in type_hits:
+                reasons.append(f"Restaurant type: {asian_type}")
+                score += 10
+
+        # Name, counted once
+        for keyword in ASIAN_KEYWORDS['strong']:
+            if keyword in name_hits:
+                reasons.append(f"Name contains: {keyword}")
+                score += 5
+                break
+
+        strong_menu_matches = [kw for kw in ASIAN_KEYWORDS['strong'] if kw in menu_hits]
+        if len(strong_menu_matches) >= 3:
+            reasons.append(f"Menu mentions: {', '.join(strong_menu_matches[:3])}")
+            score += len(strong_menu_matches)
+
+        moderate_menu_matches = [kw for kw in ASIAN_KEYWORDS['moderate'] if kw in menu_hits]
+        if len(moderate_menu_matches) >= 2:
+            score += 1
+
+        return {
+            'is_asian': score >= 5,
+            'confidence': 'high' if score >= 10 else 'medium' if score >= 5 else 'low',
+            'score': score,
+            'reasons': reasons
+        }
+
+
+# Per-process extractor for extract_batch worker processes
+_worker_extractor: Optional[ReviewFeatureExtractor] = None
+
+
+def _init_worker(catalog: Optional[Dict[str, Dict[str, Any]]]) -> None:
+    global _worker_extractor
+    _worker_extractor = ReviewFeatureExtractor(catalog)
+
+
+def _extract_in_worker(restaurant: Dict[str, Any]) -> Dict[str, Any]:
+    return _worker_extractor._compute(restaurant)
+
+
+# Shared extractor for the whole process
+review_features = ReviewFeatureExtractor()
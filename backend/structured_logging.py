@@ -0,0 +1,196 @@
+"""
+Structured Logging for Happy Pastures Creamery
+
+Log records carry the id of the request they were emitted for (also
+returned to the client as `X-Request-ID`) and the endpoint being served,
+plus any `extra={...}` fields, and are written as one JSON object per line.
+
+Loggers only put records on an in-memory queue; a background listener
+thread formats and writes them, so request handlers (and the event loop)
+never block on stdout. If the queue is full, records are dropped (and
+counted in /metrics) rather than waiting.
+
+Per-batch / per-call detail is logged at DEBUG. With LOG_LEVEL=DEBUG,
+LOG_DEBUG_SAMPLE_RATE keeps it for only a share of requests - all of a
+sampled request's records, none of the others'.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+import uuid
+import zlib
+from typing import Any, Optional
+
+from cost_ledger import current_endpoint
+from telemetry import metrics, METRIC_PREFIX
+
+
+# Attributes every LogRecord has; anything else came from `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+_CONTEXT_ATTRS = {'request_id', 'endpoint'}
+
+LOG_DROPPED = f'{METRIC_PREFIX}_log_records_dropped_total'
+metrics.describe(LOG_DROPPED, 'counter', 'Log records dropped because the logging queue was full')
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('log_request_id', default=None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def bind_request_id(request_id: str) -> contextvars.Token:
+    """Tag everything logged in the current context (and tasks/threads copied from it)"""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    _request_id.reset(token)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Adds request_id and endpoint to each record, and samples records below
+    INFO per request. Runs in the thread that logged, where the context is.
+    """
+
+    def __init__(self, debug_sample_rate: float = 1.0):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def _sampled(self, request_id: Optional[str]) -> bool:
+        if self.debug_sample_rate >= 1.0:
+            return True
+        if request_id is None:
+            return False
+        # Same decision for every record of a request
+        return zlib.crc32(request_id.encode()) / 0xFFFFFFFF < self.debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = _request_id.get()
+        if record.levelno < logging.INFO and not self._sampled(request_id):
+            return False
+        record.request_id = request_id
+        if not hasattr(record, 'endpoint'):
+            record.endpoint = current_endpoint()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context, extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for attr in ('request_id', 'endpoint'):
+            value = getattr(record, attr, None)
+            if value is not None:
+                entry[attr] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in _CONTEXT_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for development, extra fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = '-'
+        line = super().format(record)
+        fields = [f"{key}={value}" for key, value in vars(record).items()
+                  if key not in _RECORD_ATTRS and key not in _CONTEXT_ATTRS]
+        return f"{line} {' '.join(fields)}" if fields else line
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: a full queue drops the record and counts it"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (args may change later);
+        # leave formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc(LOG_DROPPED)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(
+    level: str = 'INFO',
+    fmt: str = 'json',
+    debug_sample_rate: float = 1.0,
+    queue_size: int = 10000,
+    stream: Any = None
+) -> None:
+    """
+    Route the root logger through a queue to a background writer
+
+    Safe to call again (e.g. from tests); the previous listener is stopped.
+
+    Args:
+        level: Root log level name
+        fmt: 'json' (one object per line) or 'text'
+        debug_sample_rate: Share of requests whose DEBUG records are kept
+        queue_size: Records buffered before new ones are dropped
+        stream: Where to write (default stdout)
+    """
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter() if fmt == 'json' else TextFormatter())
+
+    queue_handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    queue_handler.addFilter(RequestContextFilter(debug_sample_rate))
+    _listener = logging.handlers.QueueListener(queue_handler.queue, output)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _DroppingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,233 @@
+"""
+Request Telemetry for Happy Pastures Creamery
+
+Timing spans around each stage of a request (Geoapify search, each LLM
+batch, keyword filter, cheese match, serialization, Google enrichment,
+pitch generation), so a slow endpoint can be pinned on the stage that
+made it slow.
+
+Spans of the request being served are returned in its `Server-Timing`
+header (visible in the browser's network panel). Every span, plus every
+HTTP request and outbound API call, is also aggregated into latency
+histograms and counters, exported in Prometheus text format at /metrics.
+"""
+import contextvars
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = 'hpc'
+
+_HEADER_TOKEN = re.compile(r"[^A-Za-z0-9_.\-]")
+
+
+class _RequestTrace:
+    """Spans of one request (shared with worker threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans: List[Tuple[str, float, Optional[str]]] = []
+
+    def add(self, name: str, duration_ms: float, description: Optional[str]) -> None:
+        with self._lock:
+            self.spans.append((name, duration_ms, description))
+
+    def server_timing(self, total_ms: Optional[float] = None) -> str:
+        """`Server-Timing` header value, in the order the spans finished"""
+        with self._lock:
+            spans = list(self.spans)
+        if total_ms is not None:
+            spans.append(('total', total_ms, None))
+
+        entries = []
+        for name, duration_ms, description in spans:
+            entry = f"{_HEADER_TOKEN.sub('_', name)};dur={duration_ms:.1f}"
+            if description:
+                entry += ';desc="' + description.replace('"', "'") + '"'
+            entries.append(entry)
+        return ', '.join(entries)
+
+
+_current_trace: contextvars.ContextVar[Optional[_RequestTrace]] = contextvars.ContextVar(
+    'telemetry_trace', default=None
+)
+
+
+def start_trace() -> contextvars.Token:
+    """Collect the spans from here on for the current request (call from middleware)"""
+    return _current_trace.set(_RequestTrace())
+
+
+def end_trace(token: contextvars.Token) -> None:
+    """Stop collecting spans for the current request"""
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[_RequestTrace]:
+    """Trace of the request being served (None outside a request)"""
+    return _current_trace.get()
+
+
+def detach_trace() -> contextvars.Token:
+    """
+    Stop adding spans to the current request's trace (call first in
+    background work that runs in a copy of the request's context)
+    """
+    return _current_trace.set(None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Thread-safe latency histograms and counters, rendered for Prometheus"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Args:
+            buckets: Histogram bucket upper bounds in seconds (+Inf is implicit)
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        # name -> labels -> [bucket counts..., +Inf count], sum
+        self._histograms = defaultdict(dict)
+        self._counters = defaultdict(lambda: defaultdict(float))
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Register the type ('histogram' / 'counter') and HELP text of a metric"""
+        self._help[name] = (kind, help_text)
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """Add one observation to a histogram"""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._histograms[name].get(key)
+            if series is None:
+                series = self._histograms[name][key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            # Cumulative counts are computed when rendering
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series['buckets'][i] += 1
+                    break
+            else:
+                series['buckets'][-1] += 1
+            series['sum'] += seconds
+
+    def inc(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        """Increase a counter"""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            self._counters[name][key] += amount
+
+    def render(self) -> str:
+        """Every metric in Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            histograms = {
+                name: {key: {'buckets': list(s['buckets']), 'sum': s['sum']} for key, s in series.items()}
+                for name, series in self._histograms.items()
+            }
+            counters = {name: dict(series) for name, series in self._counters.items()}
+
+        lines = []
+        for name in sorted(set(histograms) | set(counters)):
+            kind, help_text = self._help.get(name, ('histogram' if name in histograms else 'counter', ''))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for key, series in sorted(histograms.get(name, {}).items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), series['buckets']):
+                    cumulative += count
+                    labels = _format_labels(key + (('le', _format_value(bound)),))
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+                lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+
+            for key, value in sorted(counters.get(name, {}).items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+
+# Shared registry for the whole process
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = f'{METRIC_PREFIX}_stage_duration_seconds'
+STAGE_ERRORS = f'{METRIC_PREFIX}_stage_errors_total'
+HTTP_SECONDS = f'{METRIC_PREFIX}_http_request_duration_seconds'
+HTTP_REQUESTS = f'{METRIC_PREFIX}_http_requests_total'
+UPSTREAM_SECONDS = f'{METRIC_PREFIX}_upstream_request_duration_seconds'
+UPSTREAM_REQUESTS = f'{METRIC_PREFIX}_upstream_requests_total'
+UPSTREAM_COST = f'{METRIC_PREFIX}_upstream_cost_usd_total'
+
+metrics.describe(STAGE_SECONDS, 'histogram', 'Duration of each request stage (span)')
+metrics.describe(STAGE_ERRORS, 'counter', 'Stages that raised an exception')
+metrics.describe(HTTP_SECONDS, 'histogram', 'Duration of HTTP requests, per route')
+metrics.describe(HTTP_REQUESTS, 'counter', 'HTTP requests served, per route and status')
+metrics.describe(UPSTREAM_SECONDS, 'histogram', 'Latency of outbound API calls, per provider')
+metrics.describe(UPSTREAM_REQUESTS, 'counter', 'Outbound API calls, per provider and status')
+metrics.describe(UPSTREAM_COST, 'counter', 'Spend on outbound API calls in USD, per provider')
+
+
+@contextmanager
+def span(name: str, description: Optional[str] = None) -> Iterator[None]:
+    """
+    Time a stage of the current request
+
+    The duration goes into the request's Server-Timing header (when inside
+    a request) and the stage histogram; exceptions are counted and re-raised.
+
+    Args:
+        name: Stage name, e.g. 'search' or 'llm_batch' (a header token)
+        description: Optional detail shown with the span, e.g. 'batch 2/8'
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        metrics.inc(STAGE_ERRORS, stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe(STAGE_SECONDS, elapsed, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, elapsed * 1000, description)
+
+
+def record_request(route: str, method: str, status: int, seconds: float) -> None:
+    """Count one HTTP request and its duration (call from middleware)"""
+    metrics.observe(HTTP_SECONDS, seconds, route=route, method=method)
+    metrics.inc(HTTP_REQUESTS, route=route, method=method, status=status)
+
+
+def record_upstream(provider: str, status: Any, latency_ms: float, cost_usd: float = 0.0) -> None:
+    """Count one outbound API call (called by the cost ledger for every call)"""
+    if latency_ms:  # Batch API results carry no latency
+        metrics.observe(UPSTREAM_SECONDS, latency_ms / 1000, provider=provider)
+    metrics.inc(UPSTREAM_REQUESTS, provider=provider, status=status)
+    if cost_usd:
+        metrics.inc(UPSTREAM_COST, cost_usd, provider=provider)
@@ -0,0 +1,117 @@
+"""
+Run the real API (uvicorn, separate process) against the upstream stubs
+
+Used by the benchmark and load-test scripts: the app gets its own
+interpreter (and workers), a fresh data directory and the stub base URLs,
+so nothing leaves the machine unless the stubs are recording.
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / 'backend'
+
+# Keys the app needs to start; the stubs don't check them
+PLACEHOLDER_KEYS = {
+    'GEOAPIFY_API_KEY': 'stub-geoapify',
+    'GOOGLE_PLACES_API_KEY': 'stub-google',
+    'ANTHROPIC_API_KEY': 'stub-anthropic',
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def parse_env(pairs: Optional[List[str]]) -> Dict[str, str]:
+    """KEY=VALUE strings (e.g. from --env) as a dict"""
+    env = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE, got '{pair}'")
+        env[key] = value
+    return env
+
+
+class AppServer:
+    """The FastAPI app under uvicorn, pointed at the stubs"""
+
+    def __init__(
+        self,
+        upstream_env: Dict[str, str],
+        workers: int = 1,
+        live_keys: bool = False,
+        extra_env: Optional[Dict[str, str]] = None,
+        quiet: bool = True
+    ):
+        """
+        Args:
+            upstream_env: Base URL variables from UpstreamStubs.start()
+            workers: uvicorn worker processes
+            live_keys: Pass the real API keys through (recording);
+                otherwise placeholders are used
+            extra_env: Further settings, e.g. {'PERSONA_PRERENDER_ENABLED': 'false'}
+            quiet: Discard the app's stdout (its progress prints)
+        """
+        self.port = free_port()
+        self.workers = workers
+        self._data_dir = tempfile.TemporaryDirectory(prefix='hpc-bench-')
+        self.env = {**os.environ, **upstream_env, 'HPC_DATA_DIR': self._data_dir.name}
+        if not live_keys:
+            self.env.update(PLACEHOLDER_KEYS)
+        self.env.update(extra_env or {})
+        self.quiet = quiet
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 30) -> str:
+        """Start uvicorn and wait for /health; returns the base URL"""
+        self._process = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'api:app', '--host', '127.0.0.1', '--port', str(self.port),
+             '--workers', str(self.workers), '--log-level', 'warning', '--no-access-log'],
+            cwd=BACKEND_DIR,
+            env=self.env,
+            stdout=subprocess.DEVNULL if self.quiet else None
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"API exited during startup (code {self._process.returncode})")
+            try:
+                if requests.get(f"{self.url}/health", timeout=1).status_code == 200:
+                    return self.url
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"API did not become healthy within {timeout:.0f}s")
+
+    def stop(self) -> None:
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._data_dir.cleanup()
+
+    def __enter__(self) -> 'AppServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,267 @@
+"""
+Load test: many reps in the field at once, against the upstream stubs
+
+Each simulated rep runs the app's real flow:
+- GPS refreshes hit /api/prospects every minute or so.
+- The rep taps a prospect (`instant=true`, then a long poll on
+  /api/pitch/upgrade like the frontend), or now and then a place they are
+  walking past.
+- After an Asian cuisine warning, the rep sometimes taps "pitch it anyway"
+  (`skip_asian_check`).
+- Persona and micro refinements follow some pitches.
+- Think times come from a lognormal distribution; --time-scale compresses
+  them.
+
+The rep count is stepped up in stages (--reps 5,10,20,40). Per stage and
+endpoint the report shows throughput, latency, error rate and queueing
+delay. Queueing delay is the client-side latency minus the server's own
+`total` from Server-Timing, i.e. time spent waiting for a worker or the
+event loop. The saturation point is the first stage where adding reps
+stops adding throughput, queueing delay passes --max-queue-ms, or errors
+pass --max-error-rate.
+
+    python tests/benchmarks/load_test.py --reps 5,10,20,40 --stage-seconds 60
+    python tests/benchmarks/load_test.py --workers 4 --env PITCH_UPGRADE_CONCURRENCY=8
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+import workload  # noqa: E402
+from app_server import AppServer, parse_env  # noqa: E402
+from stub_upstreams import DEFAULT_FIXTURES, LATENCY_PROFILES, UpstreamStubs, parse_latency  # noqa: E402
+
+
+# How a rep uses the app (seconds are real time, before --time-scale)
+REP_BEHAVIOR = {
+    'gps_interval_s': 60,      # Mean time between prospect refreshes
+    'think_median_s': 8,       # Median pause between taps
+    'think_sigma': 0.8,
+    'walk_in': 0.15,           # Taps on a place not in the prospect list
+    'skip_asian_retry': 0.4,   # "Pitch it anyway" after an Asian cuisine warning
+    'follow_upgrade': 0.9,     # Waits for the Claude version of an instant pitch
+    'refine': 0.35,            # Persona rewrite after a pitch
+    'micro_refine': 0.30,      # Each further micro tweak (repeats geometrically)
+}
+
+# Long polls wait on purpose - reported, but not used for saturation
+LONG_POLLS = {'pitch_upgrade'}
+
+
+class Recorder:
+    """Results of the current stage, shared by the rep threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.results: List[workload.Result] = []
+
+    def add(self, result: workload.Result) -> workload.Result:
+        with self._lock:
+            self.results.append(result)
+        return result
+
+
+def _think(rng: random.Random, behavior: Dict[str, float], time_scale: float, deadline: float) -> None:
+    pause = behavior['think_median_s'] * math.exp(behavior['think_sigma'] * rng.gauss(0, 1)) * time_scale
+    time.sleep(max(0.0, min(pause, deadline - time.monotonic())))
+
+
+def rep_session(
+    base_url: str,
+    fixture_restaurants: List[Dict[str, Any]],
+    behavior: Dict[str, float],
+    time_scale: float,
+    deadline: float,
+    seed: int,
+    recorder: Recorder
+) -> None:
+    """One rep using the app until the stage ends"""
+    rng = random.Random(seed)
+    prospects: List[Dict[str, Any]] = []
+    next_gps = 0.0
+    # Reps don't all open the app at the same instant
+    time.sleep(max(0.0, min(rng.uniform(0, behavior['think_median_s'] * time_scale), deadline - time.monotonic())))
+
+    while time.monotonic() < deadline:
+        if not prospects or time.monotonic() >= next_gps:
+            result = recorder.add(workload.send(base_url, workload.prospects(rng, fixture_restaurants)))
+            if result.ok and isinstance(result.body, dict):
+                prospects = [
+                    {'name': p['name'], 'lat': p['latitude'], 'lon': p['longitude'], 'place_id': p.get('place_id')}
+                    for p in result.body.get('prospects', []) if p.get('latitude') is not None
+                ] or prospects
+            next_gps = time.monotonic() + rng.expovariate(1 / behavior['gps_interval_s']) * time_scale
+            if not prospects:
+                prospects = fixture_restaurants
+            _think(rng, behavior, time_scale, deadline)
+            continue
+
+        # Tap a restaurant
+        pool = fixture_restaurants if rng.random() < behavior['walk_in'] else prospects
+        call = workload.pitch(rng, pool, instant=True)
+        result = recorder.add(workload.send(base_url, call))
+        body = result.body if isinstance(result.body, dict) else {}
+
+        if body.get('warning') == 'asian_cuisine_detected':
+            if rng.random() >= behavior['skip_asian_retry']:
+                _think(rng, behavior, time_scale, deadline)
+                continue
+            result = recorder.add(workload.send(base_url, workload.skip_asian_retry(call)))
+            body = result.body if isinstance(result.body, dict) else {}
+
+        if body.get('upgrade_token') and rng.random() < behavior['follow_upgrade']:
+            recorder.add(workload.send(base_url, workload.upgrade(body['upgrade_token'])))
+
+        if result.ok and rng.random() < behavior['refine']:
+            _think(rng, behavior, time_scale, deadline)
+            recorder.add(workload.send(base_url, workload.refine(rng, pool)))
+
+        while result.ok and rng.random() < behavior['micro_refine'] and time.monotonic() < deadline:
+            _think(rng, behavior, time_scale, deadline)
+            recorder.add(workload.send(base_url, workload.micro_refine(rng, pool)))
+
+        _think(rng, behavior, time_scale, deadline)
+
+
+def summarize(results: List[workload.Result], seconds: float) -> Dict[str, Any]:
+    """Per endpoint (and overall): throughput, latency, errors, queueing delay"""
+    by_name: Dict[str, List[workload.Result]] = {}
+    for result in results:
+        by_name.setdefault(result.name, []).append(result)
+
+    def stats(group: List[workload.Result]) -> Dict[str, Any]:
+        ok = [r for r in group if r.ok]
+        queue = [max(0.0, r.latency_ms - r.stages['total']) for r in ok if 'total' in r.stages]
+        return {
+            'requests': len(group),
+            'throughput_rps': round(len(group) / seconds, 2) if seconds else 0.0,
+            'error_rate': round(1 - len(ok) / len(group), 4) if group else 0.0,
+            **workload.latency_stats([r.latency_ms for r in ok]),
+            'queue_p50_ms': round(workload.percentile(queue, 50), 1),
+            'queue_p95_ms': round(workload.percentile(queue, 95), 1),
+        }
+
+    endpoints = {name: stats(group) for name, group in sorted(by_name.items())}
+    overall = stats([r for r in results if r.name not in LONG_POLLS])
+    return {'overall': overall, 'endpoints': endpoints}
+
+
+def find_saturation(stages: List[Dict[str, Any]], max_queue_ms: float, max_error_rate: float,
+                    min_gain: float = 0.5) -> Optional[Dict[str, Any]]:
+    """
+    First stage where throughput stops keeping up with reps (grows less
+    than `min_gain` times as fast), queueing builds up, or errors appear
+    """
+    previous = None
+    for stage in stages:
+        overall = stage['overall']
+        reasons = []
+        if overall['queue_p95_ms'] > max_queue_ms:
+            reasons.append(f"queueing p95 {overall['queue_p95_ms']}ms > {max_queue_ms:.0f}ms")
+        if overall['error_rate'] > max_error_rate:
+            reasons.append(f"error rate {overall['error_rate']:.1%} > {max_error_rate:.1%}")
+        if previous:
+            rep_growth = stage['reps'] / previous['reps'] - 1
+            throughput_growth = overall['throughput_rps'] / max(previous['overall']['throughput_rps'], 1e-9) - 1
+            if rep_growth > 0 and throughput_growth < min_gain * rep_growth:
+                reasons.append(f"throughput +{throughput_growth:.0%} for +{rep_growth:.0%} reps")
+        if reasons:
+            return {'reps': stage['reps'], 'throughput_rps': overall['throughput_rps'], 'reasons': reasons}
+        previous = stage
+    return None
+
+
+def print_stage(stage: Dict[str, Any]) -> None:
+    print(f"\n== {stage['reps']} reps, {stage['seconds']:.0f}s ==")
+    print(f"{'endpoint':<18}{'reqs':>6}{'req/s':>8}{'err %':>7}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'queue p50':>11}{'queue p95':>11}")
+    rows = list(stage['endpoints'].items()) + [('ALL (no polls)', stage['overall'])]
+    for name, s in rows:
+        print(f"{name:<18}{s['requests']:>6}{s['throughput_rps']:>8}{s['error_rate'] * 100:>7.1f}"
+              f"{s['p50_ms']:>9}{s['p95_ms']:>9}{s['queue_p50_ms']:>11}{s['queue_p95_ms']:>11}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Load test the API with simulated reps')
+    parser.add_argument('--reps', default='5,10,20,40', help='Comma-separated rep counts, one stage each')
+    parser.add_argument('--stage-seconds', type=float, default=60, help='Duration of each stage')
+    parser.add_argument('--time-scale', type=float, default=0.1,
+                        help='Multiply rep think times and GPS intervals (0.1 = ten times more active)')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn worker processes')
+    parser.add_argument('--latency-profile', default='realistic', choices=sorted(LATENCY_PROFILES),
+                        help='Injected upstream latency')
+    parser.add_argument('--latency', action='append', metavar='PROVIDER=MEDIAN_MS[:SIGMA]',
+                        help='Override one provider, e.g. anthropic=4000:0.8 (repeatable)')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='Multiply every injected median')
+    parser.add_argument('--max-queue-ms', type=float, default=250, help='Queueing p95 that counts as saturated')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='Error rate that counts as saturated')
+    parser.add_argument('--seed', type=int, default=47, help='Random seed')
+    parser.add_argument('--env', action='append', metavar='KEY=VALUE',
+                        help='App setting, e.g. PITCH_UPGRADE_CONCURRENCY=8 (repeatable)')
+    parser.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURES, help='Fixture file')
+    parser.add_argument('--app-output', action='store_true', help="Show the app's stdout")
+    parser.add_argument('--json', type=Path, help='Write results here')
+    args = parser.parse_args(argv)
+
+    rep_counts = [int(n) for n in args.reps.split(',') if n.strip()]
+    latency = parse_latency(args.latency_profile, args.latency, args.latency_scale, seed=args.seed)
+    report: Dict[str, Any] = {
+        'config': {
+            'workers': args.workers, 'time_scale': args.time_scale, 'stage_seconds': args.stage_seconds,
+            'latency': {p: repr(l) for p, l in latency.items()}, 'env': parse_env(args.env),
+            'behavior': REP_BEHAVIOR,
+        },
+        'stages': [],
+    }
+
+    with UpstreamStubs(args.fixtures, latency=latency) as stubs:
+        restaurants = stubs.fixtures.restaurants()
+        with AppServer(stubs.env(), workers=args.workers, extra_env=parse_env(args.env),
+                       quiet=not args.app_output) as app:
+            print(f"API at {app.url} ({args.workers} worker(s)), upstream latency: {report['config']['latency']}")
+            for stage_index, reps in enumerate(rep_counts):
+                recorder = Recorder()
+                started = time.monotonic()
+                deadline = started + args.stage_seconds
+                threads = [
+                    threading.Thread(
+                        target=rep_session,
+                        args=(app.url, restaurants, REP_BEHAVIOR, args.time_scale, deadline,
+                              args.seed * 1000 + stage_index * 100 + rep, recorder),
+                        daemon=True
+                    )
+                    for rep in range(reps)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                # Requests still in flight at the deadline finish late; count the real span
+                elapsed = time.monotonic() - started
+
+                stage = {'reps': reps, 'seconds': elapsed, **summarize(recorder.results, elapsed)}
+                report['stages'].append(stage)
+                print_stage(stage)
+
+    saturation = find_saturation(report['stages'], args.max_queue_ms, args.max_error_rate)
+    report['saturation'] = saturation
+    if saturation:
+        print(f"\nSaturated at {saturation['reps']} reps ({saturation['throughput_rps']} req/s): "
+              f"{'; '.join(saturation['reasons'])}")
+    else:
+        print(f"\nNo saturation up to {rep_counts[-1]} reps")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
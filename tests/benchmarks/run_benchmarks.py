@@ -0,0 +1,180 @@
+"""
+End-to-end benchmark of the API against local upstream stubs
+
+Starts the Geoapify / Google Places / Anthropic stubs (fixtures +
+injected latency) and the real app under uvicorn. It then drives each
+scenario (/api/prospects, /api/pitch, the refine endpoints) at a fixed
+concurrency and reports throughput and p50/p95/p99 latency, plus the
+median time per stage from the Server-Timing header.
+
+    python tests/benchmarks/run_benchmarks.py                       # no injected latency
+    python tests/benchmarks/run_benchmarks.py --latency-profile realistic --json out.json
+    python tests/benchmarks/run_benchmarks.py --baseline out.json   # exit 1 on regression
+
+Record fresh fixtures from the live APIs (real keys in the environment,
+costs money - keep --requests small):
+
+    python tests/benchmarks/run_benchmarks.py --record --requests 2
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from app_server import AppServer, parse_env  # noqa: E402
+from stub_upstreams import DEFAULT_FIXTURES, LATENCY_PROFILES, UpstreamStubs, parse_latency  # noqa: E402
+from workload import SCENARIOS, latency_stats, percentile, send  # noqa: E402
+
+
+DEFAULT_SCENARIOS = ['prospects', 'pitch', 'pitch_instant', 'refine', 'micro_refine']
+
+
+def run_scenario(
+    base_url: str,
+    name: str,
+    restaurants: List[Dict[str, Any]],
+    requests_count: int,
+    concurrency: int,
+    warmup: int,
+    seed: int
+) -> Dict[str, Any]:
+    """Drive one scenario and summarize it"""
+    rng = random.Random(seed)
+    build = SCENARIOS[name]
+    for _ in range(warmup):
+        send(base_url, build(rng, restaurants))
+
+    calls = [build(rng, restaurants) for _ in range(requests_count)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda call: send(base_url, call), calls))
+    elapsed = time.perf_counter() - started
+
+    latencies = [r.latency_ms for r in results if r.ok]
+    stage_samples: Dict[str, List[float]] = {}
+    for result in results:
+        for stage, ms in result.stages.items():
+            stage_samples.setdefault(stage, []).append(ms)
+
+    return {
+        'requests': len(results),
+        'errors': sum(1 for r in results if not r.ok),
+        'throughput_rps': round(len(results) / elapsed, 2) if elapsed else 0.0,
+        **latency_stats(latencies),
+        'stages_p50_ms': {stage: round(percentile(ms, 50), 1) for stage, ms in sorted(stage_samples.items())},
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions vs. a baseline run: p95 slower or throughput lower by more than `tolerance`"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        if before['p95_ms'] and current['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if before['throughput_rps'] and current['throughput_rps'] < before['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if current['errors'] > before['errors']:
+            regressions.append(f"{name}: errors {before['errors']} -> {current['errors']}")
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    print(f"\n{'scenario':<18}{'reqs':>6}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print('-' * 71)
+    for name, s in results['scenarios'].items():
+        print(f"{name:<18}{s['requests']:>6}{s['errors']:>8}{s['throughput_rps']:>9}"
+              f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+    print()
+    for name, s in results['scenarios'].items():
+        stages = ', '.join(f"{stage} {ms}" for stage, ms in s['stages_p50_ms'].items())
+        print(f"  {name}: {stages}")
+    print(f"\nUpstream calls: {results['upstream_calls']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the API against local upstream stubs')
+    parser.add_argument('--scenarios', default=','.join(DEFAULT_SCENARIOS),
+                        help=f"Comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument('--requests', type=int, default=50, help='Measured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight at once')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn worker processes')
+    parser.add_argument('--latency-profile', default='none', choices=sorted(LATENCY_PROFILES),
+                        help='Injected upstream latency')
+    parser.add_argument('--latency', action='append', metavar='PROVIDER=MEDIAN_MS[:SIGMA]',
+                        help='Override one provider, e.g. anthropic=4000:0.8 (repeatable)')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='Multiply every injected median')
+    parser.add_argument('--seed', type=int, default=46, help='Random seed (requests and latency)')
+    parser.add_argument('--env', action='append', metavar='KEY=VALUE',
+                        help='App setting, e.g. PERSONA_PRERENDER_ENABLED=false (repeatable)')
+    parser.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURES, help='Fixture file')
+    parser.add_argument('--record', action='store_true',
+                        help='Proxy to the live APIs (real keys from the environment) and save fixtures')
+    parser.add_argument('--app-output', action='store_true', help="Show the app's stdout")
+    parser.add_argument('--json', type=Path, help='Write results here')
+    parser.add_argument('--baseline', type=Path, help='Compare with an earlier --json file')
+    parser.add_argument('--tolerance', type=float, default=0.20, help='Allowed regression vs. baseline')
+    args = parser.parse_args(argv)
+
+    names = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+    if args.record and not all(os.getenv(k) for k in ('GEOAPIFY_API_KEY', 'GOOGLE_PLACES_API_KEY', 'ANTHROPIC_API_KEY')):
+        parser.error('--record needs GEOAPIFY_API_KEY, GOOGLE_PLACES_API_KEY and ANTHROPIC_API_KEY')
+
+    latency = parse_latency(args.latency_profile, args.latency, args.latency_scale, seed=args.seed)
+    stubs = UpstreamStubs(args.fixtures, latency=None if args.record else latency, record=args.record)
+    results: Dict[str, Any] = {
+        'config': {
+            'requests': args.requests, 'concurrency': args.concurrency, 'workers': args.workers,
+            'latency': {p: repr(l) for p, l in latency.items()} if not args.record else 'live',
+            'env': parse_env(args.env),
+        },
+        'scenarios': {},
+    }
+
+    with stubs:
+        app = AppServer(stubs.env(), workers=args.workers, live_keys=args.record, extra_env=parse_env(args.env),
+                        quiet=not args.app_output)
+        with app:
+            print(f"API at {app.url}, upstream latency: {results['config']['latency']}")
+            for i, name in enumerate(names):
+                restaurants = stubs.fixtures.restaurants()
+                if not restaurants and name != 'prospects':
+                    print(f"Skipping {name}: no restaurants in the fixtures (run prospects first when recording)")
+                    continue
+                print(f"Running {name}...")
+                results['scenarios'][name] = run_scenario(
+                    app.url, name, restaurants, args.requests, args.concurrency,
+                    warmup=0 if args.record else args.warmup, seed=args.seed + i
+                )
+        results['upstream_calls'] = stubs.request_counts()
+
+    print_report(results)
+    if args.record:
+        print(f"Fixtures saved to {args.fixtures}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions vs. {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,444 @@
+"""
+Local stand-ins for Geoapify, Google Places and Anthropic
+
+Each provider gets its own HTTP server answering from recorded fixtures
+(fixtures/upstreams.json), after an injected latency drawn from a
+lognormal distribution (median + spread), so benchmarks run offline and
+repeatably. Point the app at them with GEOAPIFY_BASE_URL,
+GOOGLE_PLACES_BASE_URL and ANTHROPIC_BASE_URL.
+
+With record=True the stubs proxy every call to the real service instead
+and merge the responses into the fixtures (saved on stop), so a fixture
+set can be refreshed from one run against the live APIs.
+"""
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Formatter
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'backend'))
+from prompts import PROMPTS  # noqa: E402
+
+
+DEFAULT_FIXTURES = Path(__file__).parent / 'fixtures' / 'upstreams.json'
+
+PROVIDERS = ('geoapify', 'google_places', 'anthropic')
+
+LIVE_BASE_URLS = {
+    'geoapify': 'https://api.geoapify.com',
+    'google_places': 'https://places.googleapis.com',
+    'anthropic': 'https://api.anthropic.com',
+}
+
+# Provider -> (median ms, lognormal sigma)
+LATENCY_PROFILES = {
+    'none': {provider: (0.0, 0.0) for provider in PROVIDERS},
+    # Rough production numbers: Claude dominates, with a long tail
+    'realistic': {
+        'geoapify': (250.0, 0.35),
+        'google_places': (180.0, 0.40),
+        'anthropic': (2200.0, 0.55),
+    },
+}
+
+_CLASSIFY_LINE = re.compile(r"^(\d+)\. (.*) - Categories:", re.MULTILINE)
+
+
+class Latency:
+    """Lognormal latency: half the calls are faster than `median_ms`"""
+
+    def __init__(self, median_ms: float = 0.0, sigma: float = 0.0, seed: Optional[int] = None):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_ms(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        with self._lock:
+            return self.median_ms * math.exp(self.sigma * self._random.gauss(0, 1))
+
+    def __repr__(self) -> str:
+        return f"median={self.median_ms:.0f}ms sigma={self.sigma}"
+
+
+def parse_latency(profile: str = 'none', overrides: Optional[List[str]] = None,
+                  scale: float = 1.0, seed: Optional[int] = None) -> Dict[str, Latency]:
+    """
+    Latency per provider from a profile plus `provider=median_ms[:sigma]` overrides
+
+    Args:
+        profile: Name in LATENCY_PROFILES
+        overrides: e.g. ['anthropic=4000:0.8', 'geoapify=100']
+        scale: Multiplier applied to every median (e.g. 0.1 for quick runs)
+        seed: Random seed, for repeatable latency sequences
+
+    Raises:
+        ValueError: On an unknown profile or provider, or a malformed override
+    """
+    if profile not in LATENCY_PROFILES:
+        raise ValueError(f"Unknown latency profile '{profile}' (use one of {', '.join(LATENCY_PROFILES)})")
+    settings = dict(LATENCY_PROFILES[profile])
+
+    for override in overrides or []:
+        provider, _, value = override.partition('=')
+        if provider not in PROVIDERS or not value:
+            raise ValueError(f"Bad latency override '{override}' (expected provider=median_ms[:sigma])")
+        median, _, sigma = value.partition(':')
+        settings[provider] = (float(median), float(sigma) if sigma else settings[provider][1])
+
+    return {
+        provider: Latency(median * scale, sigma, seed=None if seed is None else seed + i)
+        for i, (provider, (median, sigma)) in enumerate(sorted(settings.items()))
+    }
+
+
+def _template_prefixes() -> List[Tuple[str, str]]:
+    """(literal text before the first field, prompt name), longest first"""
+    prefixes = []
+    for name, prompt in PROMPTS.items():
+        literal = next(iter(Formatter().parse(prompt.template)), ('',))[0]
+        prefixes.append((literal, name))
+    return sorted(prefixes, key=lambda item: len(item[0]), reverse=True)
+
+
+def _apply_field_mask(record: Dict[str, Any], mask: Optional[str]) -> Dict[str, Any]:
+    """Keep only the top-level fields a Google X-Goog-FieldMask asks for"""
+    if not mask or mask == '*':
+        return record
+    fields = {f.split('.', 1)[1] if f.startswith('places.') else f for f in mask.split(',')}
+    return {k: v for k, v in record.items() if k.split('.')[0] in fields}
+
+
+def _distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dy = (lat2 - lat1) * 111_320
+    dx = (lon2 - lon1) * 111_320 * math.cos(math.radians(lat1))
+    return math.hypot(dx, dy)
+
+
+class Fixtures:
+    """Recorded upstream responses, looked up the way each API answers"""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        self._lock = threading.Lock()
+        self.geoapify: Dict[str, Any] = data.get('geoapify', {'type': 'FeatureCollection', 'features': []})
+        self.google_places: Dict[str, Dict[str, Any]] = {
+            place['id']: place for place in data.get('google_places', {}).get('places', [])
+        }
+        anthropic = data.get('anthropic', {})
+        self.responses: Dict[str, str] = dict(anthropic.get('responses', {}))
+        self.classify: Dict[str, bool] = dict(anthropic.get('classify', {}))
+        self._prefixes = _template_prefixes()
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_FIXTURES) -> 'Fixtures':
+        path = Path(path)
+        return cls(json.loads(path.read_text(encoding='utf-8')) if path.exists() else None)
+
+    def save(self, path: Path = DEFAULT_FIXTURES) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                'geoapify': self.geoapify,
+                'google_places': {'places': list(self.google_places.values())},
+                'anthropic': {'responses': self.responses, 'classify': self.classify},
+            }
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+    def restaurants(self) -> List[Dict[str, Any]]:
+        """(name, lat, lon, place_id) of every Geoapify restaurant, for driving /api/pitch"""
+        with self._lock:
+            features = list(self.geoapify.get('features', []))
+        restaurants = []
+        for feature in features:
+            props = feature.get('properties', {})
+            lon, lat = feature.get('geometry', {}).get('coordinates', [None, None])
+            if props.get('name') and lat is not None:
+                restaurants.append({'name': props['name'], 'lat': lat, 'lon': lon, 'place_id': props.get('place_id')})
+        return restaurants
+
+    def prompt_name(self, prompt: str) -> Optional[str]:
+        """Registry name of the prompt template a rendered prompt came from"""
+        for literal, name in self._prefixes:
+            if literal and prompt.startswith(literal):
+                return name
+        return None
+
+    # Geoapify -------------------------------------------------------------
+
+    def places(self, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        limit = int(query.get('limit', ['20'])[0])
+        with self._lock:
+            return {**self.geoapify, 'features': self.geoapify.get('features', [])[:limit]}
+
+    def record_places(self, response: Dict[str, Any]) -> None:
+        with self._lock:
+            known = {f.get('properties', {}).get('place_id') for f in self.geoapify.get('features', [])}
+            self.geoapify.setdefault('features', []).extend(
+                f for f in response.get('features', []) if f.get('properties', {}).get('place_id') not in known
+            )
+
+    # Google Places --------------------------------------------------------
+
+    def text_search(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Closest place whose name matches the query best"""
+        query = (body.get('textQuery') or '').lower()
+        center = body.get('locationBias', {}).get('circle', {}).get('center', {})
+        with self._lock:
+            places = list(self.google_places.values())
+
+        def rank(place):
+            name = place.get('displayName', {}).get('text', '').lower()
+            exact = name == query
+            partial = bool(query) and (query in name or name in query)
+            location = place.get('location', {})
+            distance = _distance_m(center.get('latitude', 0), center.get('longitude', 0),
+                                   location.get('latitude', 0), location.get('longitude', 0)) if center else 0
+            return (not exact, not partial, distance)
+
+        ranked = sorted(places, key=rank)
+        if ranked and rank(ranked[0])[1]:
+            return []  # Nothing with that name
+        return ranked[:body.get('maxResultCount', 1)]
+
+    def nearby_search(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        circle = body.get('locationRestriction', {}).get('circle', {})
+        center, radius = circle.get('center', {}), circle.get('radius', 50000)
+        with self._lock:
+            places = list(self.google_places.values())
+        within = []
+        for place in places:
+            location = place.get('location', {})
+            distance = _distance_m(center.get('latitude', 0), center.get('longitude', 0),
+                                   location.get('latitude', 0), location.get('longitude', 0))
+            if distance <= radius:
+                within.append((distance, place))
+        return [place for _, place in sorted(within, key=lambda item: item[0])][:body.get('maxResultCount', 20)]
+
+    def place(self, place_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.google_places.get(place_id)
+
+    def record_google(self, places: List[Dict[str, Any]]) -> None:
+        """Merge recorded places (later responses can add fields, e.g. reviews)"""
+        with self._lock:
+            for place in places:
+                if place.get('id'):
+                    self.google_places[place['id']] = {**self.google_places.get(place['id'], {}), **place}
+
+    # Anthropic ------------------------------------------------------------
+
+    def message_text(self, prompt: str) -> str:
+        name = self.prompt_name(prompt)
+        if name == 'classify_batch':
+            with self._lock:
+                return '\n'.join(
+                    f"{number}. {'KEEP' if self.classify.get(restaurant, True) else 'EXCLUDE'}"
+                    for number, restaurant in _CLASSIFY_LINE.findall(prompt)
+                )
+        with self._lock:
+            if name in self.responses:
+                return self.responses[name]
+            # Related prompt recorded ('refine:chef' for 'refine:manager'), else anything
+            prefix = (name or '').split(':', 1)[0]
+            related = [text for key, text in self.responses.items() if key.split(':', 1)[0] == prefix]
+            return related[0] if related else next(iter(self.responses.values()), 'OK')
+
+    def record_message(self, prompt: str, text: str) -> None:
+        name = self.prompt_name(prompt) or 'unknown'
+        with self._lock:
+            if name == 'classify_batch':
+                decisions = [line.upper() for line in text.split('\n') if 'KEEP' in line.upper() or 'EXCLUDE' in line.upper()]
+                for (_, restaurant), decision in zip(_CLASSIFY_LINE.findall(prompt), decisions):
+                    self.classify[restaurant] = 'KEEP' in decision
+            else:
+                self.responses.setdefault(name, text)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """One request to a stubbed provider (the server carries the settings)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):  # Keep benchmark output clean
+        pass
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _handle(self, method: str) -> None:
+        server: '_StubServer' = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        if server.record:
+            status, body = self._forward(method, raw)
+        else:
+            delay_ms = server.latency.sample_ms()
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+            status, body = self._answer(method, json.loads(raw) if raw else {})
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        server.count()
+
+    def _answer(self, method: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        server: '_StubServer' = self.server
+        fixtures = server.fixtures
+        url = urlsplit(self.path)
+
+        if server.provider == 'geoapify' and url.path == '/v2/places':
+            return 200, fixtures.places(parse_qs(url.query))
+
+        if server.provider == 'google_places':
+            mask = self.headers.get('X-Goog-FieldMask')
+            if url.path == '/v1/places:searchText':
+                return 200, {'places': [_apply_field_mask(p, mask) for p in fixtures.text_search(body)]}
+            if url.path == '/v1/places:searchNearby':
+                return 200, {'places': [_apply_field_mask(p, mask) for p in fixtures.nearby_search(body)]}
+            if url.path.startswith('/v1/places/') and method == 'GET':
+                place = fixtures.place(url.path[len('/v1/places/'):])
+                if place is None:
+                    return 404, {'error': {'code': 404, 'status': 'NOT_FOUND'}}
+                return 200, _apply_field_mask(place, mask)
+
+        if server.provider == 'anthropic' and url.path == '/v1/messages':
+            prompt = body['messages'][0]['content']
+            text = fixtures.message_text(prompt)
+            return 200, {
+                'id': 'msg_stub',
+                'type': 'message',
+                'role': 'assistant',
+                'model': body.get('model'),
+                'content': [{'type': 'text', 'text': text}],
+                'stop_reason': 'end_turn',
+                # Roughly 4 characters per token
+                'usage': {'input_tokens': len(prompt) // 4, 'output_tokens': len(text) // 4},
+            }
+
+        return 404, {'error': f"No stub for {method} {url.path}"}
+
+    def _forward(self, method: str, raw: bytes) -> Tuple[int, Any]:
+        """Record mode: call the live API and keep its answer"""
+        server: '_StubServer' = self.server
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in ('host', 'content-length', 'connection')}
+        response = requests.request(method, LIVE_BASE_URLS[server.provider] + self.path,
+                                    headers=headers, data=raw or None, timeout=60)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {'error': response.text}
+        if response.status_code != 200:
+            return response.status_code, body
+
+        fixtures = server.fixtures
+        path = urlsplit(self.path).path
+        if server.provider == 'geoapify':
+            fixtures.record_places(body)
+        elif server.provider == 'google_places':
+            fixtures.record_google(body.get('places', [body]) if path.startswith('/v1/places:') else [body])
+        elif server.provider == 'anthropic' and path == '/v1/messages':
+            fixtures.record_message(json.loads(raw)['messages'][0]['content'], body['content'][0]['text'])
+        return response.status_code, body
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, provider: str, fixtures: Fixtures, latency: Latency, record: bool):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.provider = provider
+        self.fixtures = fixtures
+        self.latency = latency
+        self.record = record
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+
+class UpstreamStubs:
+    """The three stub servers, started together"""
+
+    def __init__(
+        self,
+        fixtures_path: Path = DEFAULT_FIXTURES,
+        latency: Optional[Dict[str, Latency]] = None,
+        record: bool = False
+    ):
+        """
+        Args:
+            fixtures_path: Fixture file to serve from (and record into)
+            latency: Injected latency per provider (default: none)
+            record: Proxy to the live APIs and record their responses
+        """
+        self.fixtures_path = Path(fixtures_path)
+        self.fixtures = Fixtures() if record and not self.fixtures_path.exists() else Fixtures.load(self.fixtures_path)
+        self.record = record
+        latency = latency or parse_latency('none')
+        self._servers = {
+            provider: _StubServer(provider, self.fixtures, latency[provider], record) for provider in PROVIDERS
+        }
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> Dict[str, str]:
+        """
+        Start serving
+
+        Returns:
+            Environment variables pointing the app at the stubs
+        """
+        for provider, server in self._servers.items():
+            thread = threading.Thread(target=server.serve_forever, name=f"stub-{provider}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self.env()
+
+    def env(self) -> Dict[str, str]:
+        url = {provider: f"http://127.0.0.1:{server.server_address[1]}" for provider, server in self._servers.items()}
+        return {
+            'GEOAPIFY_BASE_URL': url['geoapify'],
+            'GOOGLE_PLACES_BASE_URL': url['google_places'],
+            'ANTHROPIC_BASE_URL': url['anthropic'],
+        }
+
+    def request_counts(self) -> Dict[str, int]:
+        return {provider: server.requests for provider, server in self._servers.items()}
+
+    def stop(self) -> None:
+        """Stop serving (and save the fixtures when recording)"""
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        if self.record:
+            self.fixtures.save(self.fixtures_path)
+
+    def __enter__(self) -> 'UpstreamStubs':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,175 @@
+"""
+Requests a rep's app makes, built from the fixture restaurants
+
+Shared by the benchmark (one scenario at a time) and the load test
+(a weighted mix), so both exercise the same calls.
+"""
+import math
+import random
+import re
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+import requests
+
+
+# Evanston, the fixtures' territory
+CENTER = (42.0451, -87.6877)
+
+PERSONAS = ['walking', 'chef', 'manager', 'gatekeeper']
+MICRO_TYPES = ['shorten', 'expand', 'casual', 'formal', 'strong_opener']
+
+SAMPLE_PITCH = (
+    "Hi, I'm Hillary from Happy Pastures Creamery. We make small-batch cheese from our own "
+    "grass-fed herd, and two of our wheels would fit your menu. Could I leave a sample with the chef?"
+)
+
+_TIMING_ENTRY = re.compile(r"([^;,\s]+);dur=([0-9.]+)")
+
+
+class Call:
+    """One HTTP request to make: method, path, query params and JSON body"""
+
+    def __init__(self, name: str, method: str, path: str,
+                 params: Optional[Dict[str, Any]] = None, body: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.params = params
+        self.body = body
+
+
+def prospects(rng: random.Random, restaurants: List[Dict[str, Any]]) -> Call:
+    """GPS refresh: the rep moved a little"""
+    return Call('prospects', 'GET', '/api/prospects', params={
+        'lat': round(CENTER[0] + rng.uniform(-0.004, 0.004), 5),
+        'lon': round(CENTER[1] + rng.uniform(-0.004, 0.004), 5),
+    })
+
+
+def pitch(rng: random.Random, restaurants: List[Dict[str, Any]], instant: bool = False,
+          skip_asian_check: bool = False) -> Call:
+    """Tap on a restaurant"""
+    r = rng.choice(restaurants)
+    params = {'name': r['name'], 'lat': r['lat'], 'lon': r['lon'], 'place_id': r['place_id']}
+    if instant:
+        params['instant'] = 'true'
+    if skip_asian_check:
+        params['skip_asian_check'] = 'true'
+    name = 'pitch_skip_asian' if skip_asian_check else 'pitch_instant' if instant else 'pitch'
+    return Call(name, 'GET', '/api/pitch', params=params)
+
+
+def skip_asian_retry(call: Call) -> Call:
+    """The "pitch it anyway" button after an Asian cuisine warning"""
+    return Call('pitch_skip_asian', 'GET', '/api/pitch', params={**call.params, 'skip_asian_check': 'true'})
+
+
+def upgrade(token: str, wait: float = 25) -> Call:
+    """Long poll for the Claude pitch behind an instant pitch (what the frontend does)"""
+    return Call('pitch_upgrade', 'GET', f'/api/pitch/upgrade/{token}', params={'wait': wait})
+
+
+def refine(rng: random.Random, restaurants: List[Dict[str, Any]]) -> Call:
+    """Persona rewrite (a fresh pitch text each time, so it isn't answered from cache)"""
+    r = rng.choice(restaurants)
+    return Call('refine', 'POST', '/api/pitch/refine', body={
+        'original_pitch': f"{SAMPLE_PITCH} ({r['name']} #{rng.randrange(10 ** 9)})",
+        'restaurant_name': r['name'],
+        'cheese_name': 'Smoky Alder',
+        'persona': rng.choice(PERSONAS),
+    })
+
+
+def micro_refine(rng: random.Random, restaurants: List[Dict[str, Any]]) -> Call:
+    """Micro-tweak of a pitch"""
+    r = rng.choice(restaurants)
+    return Call('micro_refine', 'POST', '/api/pitch/micro-refine', body={
+        'current_pitch': f"{SAMPLE_PITCH} ({r['name']} #{rng.randrange(10 ** 9)})",
+        'micro_type': rng.choice(MICRO_TYPES),
+        'restaurant_name': r['name'],
+    })
+
+
+# Scenario name -> builder(rng, restaurants) -> Call
+SCENARIOS: Dict[str, Callable[[random.Random, List[Dict[str, Any]]], Call]] = {
+    'prospects': prospects,
+    'pitch': pitch,
+    'pitch_instant': lambda rng, restaurants: pitch(rng, restaurants, instant=True),
+    'pitch_skip_asian': lambda rng, restaurants: pitch(rng, restaurants, skip_asian_check=True),
+    'refine': refine,
+    'micro_refine': micro_refine,
+}
+
+
+class Result:
+    """Outcome of one request"""
+
+    __slots__ = ('name', 'status', 'latency_ms', 'started', 'stages', 'body', 'error')
+
+    def __init__(self, name: str, status: int, latency_ms: float, started: float,
+                 stages: Dict[str, float], body: Any = None, error: Optional[str] = None):
+        self.name = name
+        self.status = status
+        self.latency_ms = latency_ms
+        self.started = started
+        self.stages = stages
+        self.body = body
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status < 400
+
+
+_sessions = threading.local()
+
+
+def _session() -> requests.Session:
+    # One connection pool per client thread
+    if not hasattr(_sessions, 'session'):
+        _sessions.session = requests.Session()
+    return _sessions.session
+
+
+def server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Stage -> ms from a Server-Timing header (repeated stages are summed)"""
+    stages: Dict[str, float] = {}
+    for name, duration in _TIMING_ENTRY.findall(header or ''):
+        stages[name] = stages.get(name, 0.0) + float(duration)
+    return stages
+
+
+def send(base_url: str, call: Call, timeout: float = 60) -> Result:
+    """Make one request and time it"""
+    started = time.perf_counter()
+    try:
+        response = _session().request(call.method, base_url + call.path, params=call.params,
+                                      json=call.body, timeout=timeout)
+        latency_ms = (time.perf_counter() - started) * 1000
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return Result(call.name, response.status_code, latency_ms, started,
+                      server_timing(response.headers.get('Server-Timing')), body)
+    except requests.RequestException as e:
+        return Result(call.name, 0, (time.perf_counter() - started) * 1000, started, {}, error=type(e).__name__)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0.0 for no values)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def latency_stats(latencies: List[float]) -> Dict[str, float]:
+    return {
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'mean_ms': round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+    }
@@ -0,0 +1,28 @@
+"""
+pytest setup for the backend unit tests
+
+The backend modules import each other by bare name (run from backend/),
+and config.py requires API keys, so dummy keys and a throwaway data
+directory are set before anything is imported. Nothing here calls out.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault('GEOAPIFY_API_KEY', 'test-geoapify-key')
+os.environ.setdefault('GOOGLE_PLACES_API_KEY', 'test-google-key')
+os.environ.setdefault('ANTHROPIC_API_KEY', 'test-anthropic-key')
+os.environ.setdefault('HPC_DATA_DIR', tempfile.mkdtemp(prefix='hpc-tests-'))
+
+# Manual scripts that call the live APIs when imported (run them directly)
+collect_ignore = [
+    'debug_restaurant_filtering.py',
+    'geoapify_test.py',
+    'test_google_places.py',
+    'test_live_sales_pitch.py',
+    'test_sales_pitch.py',
+    'benchmarks',
+]
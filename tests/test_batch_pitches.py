@@ -0,0 +1,140 @@
+"""
+Tests for the nightly batch job, run through LocalBatchQueue with stub clients
+"""
+import json
+
+import pytest
+
+from batch_pitches import LocalBatchQueue, run_territory_batch
+from config import PITCH_CACHE_MAX_AGE_HOURS
+from place_store import PlaceStore
+from prompts import get_prompt
+from sales_pitch_generator import SalesPitchGenerator
+
+
+def restaurant(place_id, name, types, review):
+    return {'place_id': place_id, 'name': name, 'address': '1 Main St', 'phone': None, 'price': '$$',
+            'rating': 4.5, 'types': types, 'reviews': [{'text': review, 'rating': 5}], 'tier': 'reviews'}
+
+
+RESTAURANTS = [
+    restaurant('G-pub', 'Oak Gastropub', ['gastropub', 'bar'], 'Best burgers and beer in town'),
+    restaurant('G-bistro', 'Le Petit Bistro', ['french_restaurant'], 'The duck and the scallops were perfect'),
+    restaurant('G-wok', 'Golden Wok', ['chinese_restaurant'], 'Great dumplings and fried rice'),
+]
+
+
+class StubGeoapify:
+    """Territory search returning one feature per restaurant, no LLM filtering"""
+    anthropic_api_key = None
+
+    def search_places(self, **kwargs):
+        return {'features': [
+            {'properties': {'name': r['name'], 'place_id': f"geo-{r['place_id']}"},
+             'geometry': {'coordinates': [-87.68, 42.04]}}
+            for r in RESTAURANTS
+        ]}
+
+    def filter_results(self, results, target_type='all'):
+        return results
+
+
+class StubGooglePlaces:
+    def __init__(self):
+        self.bulk_calls = []
+
+    def enrich_restaurants_bulk(self, items, max_concurrency=5, budget_usd=None, tier='contact'):
+        self.bulk_calls.append((items, tier))
+        by_name = {r['name']: r for r in RESTAURANTS}
+        return {'results': [{'name': item[0], 'status': 'ok', 'data': dict(by_name[item[0]])} for item in items]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    place_store = PlaceStore(str(tmp_path / 'places.db'))
+    yield place_store
+    place_store.close()
+
+
+def reply(params):
+    """Responder writing a pitch that names the restaurant from the prompt"""
+    name = next(r['name'] for r in RESTAURANTS if r['name'] in params['messages'][0]['content'])
+    return json.dumps({'opening': f"Hi {name}!", 'talking_points': ['Local', 'Grass-fed']})
+
+
+def run(store, queue, google=None):
+    return run_territory_batch(
+        42.04, -87.68, 2000, queue,
+        geo_client=StubGeoapify(),
+        google_client=google or StubGooglePlaces(),
+        pitch_generator=SalesPitchGenerator('test-key'),
+        store=store,
+        poll_interval=0
+    )
+
+
+def test_pitches_are_saved_for_the_pitch_endpoint(store):
+    google = StubGooglePlaces()
+    summary = run(store, LocalBatchQueue(reply), google)
+
+    assert summary['prospects'] == 3
+    assert summary['enriched'] == 3
+    assert summary['skipped_asian'] == 1
+    assert summary['submitted'] == summary['saved'] == 2
+    assert summary['failed'] == 0
+    assert summary['batch_id'] == 'local_batch_1'
+    # Pitches need reviews, like /api/pitch
+    assert google.bulk_calls[0][1] == 'reviews'
+
+    # The same lookup /api/pitch makes before calling Claude
+    generator = SalesPitchGenerator('test-key')
+    pub = RESTAURANTS[0]
+    pitch = store.get_pitch(
+        pub['place_id'],
+        generator.determine_cheese_match(pub)['primary_cheese'],
+        max_age_seconds=PITCH_CACHE_MAX_AGE_HOURS * 3600,
+        prompt_version=get_prompt('pitch').version
+    )
+    assert pitch['opening'] == 'Hi Oak Gastropub!'
+    assert pitch['source'] == 'batch'
+    assert pitch['restaurant']['name'] == 'Oak Gastropub'
+
+    assert store.get_pitch('G-wok', 'smoky_alder') is None
+    assert store.get_pitch('G-wok', 'pasture_bloom') is None
+
+
+def test_fresh_pitches_are_not_regenerated(store):
+    run(store, LocalBatchQueue(reply))
+
+    prompts = []
+    summary = run(store, LocalBatchQueue(lambda params: prompts.append(params) or reply(params)))
+
+    assert summary['already_cached'] == 2
+    assert summary['skipped_asian'] == 1
+    assert summary['submitted'] == 0 and summary['batch_id'] is None
+    assert prompts == []
+
+
+def test_failed_and_unparseable_replies_are_counted(store):
+    def flaky(params):
+        if 'Oak Gastropub' in params['messages'][0]['content']:
+            raise ConnectionError('upstream hung up')
+        return 'Sorry, I cannot help with that.'
+
+    summary = run(store, LocalBatchQueue(flaky))
+
+    assert summary['submitted'] == 2
+    assert summary['failed'] == 2
+    assert summary['saved'] == 0
+
+
+def test_local_queue_answers_on_first_poll():
+    seen = []
+    queue = LocalBatchQueue(lambda params: seen.append(params['model']) or 'ok')
+    batch_id = queue.submit([{'custom_id': 'a', 'params': {'model': 'm1'}},
+                             {'custom_id': 'b', 'params': {'model': 'm2'}}])
+    assert seen == []
+
+    assert queue.is_done(batch_id)
+    assert list(queue.results(batch_id)) == [{'custom_id': 'a', 'text': 'ok'}, {'custom_id': 'b', 'text': 'ok'}]
+    assert seen == ['m1', 'm2']
@@ -0,0 +1,80 @@
+"""
+Tests for the cheese catalog and the lookups it precomputes at load time
+"""
+import copy
+import json
+
+import pytest
+
+from cheese_matching import CheeseScorer
+from cheese_products import (
+    CATALOG_PATH, CHEESE_PRODUCTS, CheeseCatalog, build_cheese_context, catalog, get_cheese_for_embedding,
+)
+
+
+def alpine_tomme():
+    """A third SKU, added through the data file only"""
+    cheese = copy.deepcopy(CHEESE_PRODUCTS['smoky_alder'])
+    cheese.update({
+        'name': 'Alpine Tomme',
+        'target_restaurants': ['Swiss restaurants', 'fondue_restaurant', 'ski lodges'],
+        'pairings': {'proteins': ['Bacon', 'Speck'], 'produce': ['Potatoes'], 'beverages': ['Riesling']},
+        'match_rules': {'type_keywords': ['swiss', 'fondue'], 'menu_keywords': ['fondue', 'raclette'],
+                        'price_levels': ['$$$']},
+    })
+    return cheese
+
+
+@pytest.fixture
+def three_skus(tmp_path):
+    path = tmp_path / 'cheese_catalog.json'
+    products = json.loads(CATALOG_PATH.read_text(encoding='utf-8'))
+    products['alpine_tomme'] = alpine_tomme()
+    path.write_text(json.dumps(products), encoding='utf-8')
+    return CheeseCatalog.load(path)
+
+
+def test_module_catalog_is_the_data_file():
+    assert list(CHEESE_PRODUCTS) == ['pasture_bloom', 'smoky_alder']
+    assert CheeseCatalog.load().products == CHEESE_PRODUCTS
+    assert get_cheese_for_embedding('smoky_alder') == catalog.embedding_texts['smoky_alder']
+    assert get_cheese_for_embedding('cheddar') == ''
+
+
+def test_pairings_are_indexed_case_insensitively(three_skus):
+    assert three_skus.for_pairing('bacon') == ['smoky_alder', 'alpine_tomme']
+    assert three_skus.for_pairing('BACON') == ['smoky_alder', 'alpine_tomme']
+    assert three_skus.for_pairing('Speck') == ['alpine_tomme']
+    assert three_skus.for_pairing('ketchup') == []
+
+    # Callers get a copy, not the index itself
+    three_skus.for_pairing('speck').append('pasture_bloom')
+    assert three_skus.for_pairing('speck') == ['alpine_tomme']
+
+
+def test_restaurant_types_match_free_text_and_type_ids(three_skus):
+    assert three_skus.for_restaurant_type('french_restaurant') == ['pasture_bloom']
+    assert three_skus.for_restaurant_type('Gastropub') == ['smoky_alder']
+    # Plurals and type ids reduce to the same terms as the targets
+    assert three_skus.for_restaurant_type('swiss_restaurant') == ['alpine_tomme']
+    assert three_skus.for_restaurant_type('fondue restaurants') == ['alpine_tomme']
+    # Generic words identify nothing
+    assert three_skus.for_restaurant_type('restaurant') == []
+
+
+def test_contexts_and_embedding_texts_are_precomputed(three_skus):
+    cheese = three_skus.get('alpine_tomme')
+    assert three_skus.context('alpine_tomme') == build_cheese_context(cheese)
+    assert 'Beverages: Riesling' in three_skus.context('alpine_tomme')
+    assert 'Target Restaurants: Swiss restaurants, fondue_restaurant, ski lodges' in \
+        three_skus.embedding_texts['alpine_tomme']
+    assert three_skus.get('cheddar') is None
+    with pytest.raises(KeyError):
+        three_skus.context('cheddar')
+
+
+def test_new_sku_is_scored_without_code_changes(three_skus):
+    scorer = CheeseScorer(three_skus.products)
+    (match,) = scorer.match_batch([{'name': 'Chalet', 'types': ['swiss_restaurant'], 'price': '$$$',
+                                    'reviews': [{'text': 'The raclette and fondue were perfect'}]}])
+    assert match['primary_cheese'] == 'alpine_tomme'
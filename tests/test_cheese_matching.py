@@ -0,0 +1,115 @@
+"""
+Tests for the table-driven cheese scorer
+
+The reference below is the per-restaurant rule loop the scorer replaced,
+driven by the same catalog match_rules: +2 per type keyword found in any
+type, +1 if any menu keyword appears in the first five reviews, +1 for a
+matching price level, substring matching throughout.
+"""
+import random
+
+import pytest
+
+import cheese_matching
+from cheese_matching import DEFAULT_CHEESE, HIGH_CONFIDENCE_SCORE, CheeseScorer
+from cheese_products import CHEESE_PRODUCTS
+
+
+def rule_scores(restaurant):
+    types = [t.lower() for t in restaurant.get('types', [])]
+    menu_text = ' '.join(r.get('text', '').lower() for r in restaurant.get('reviews', [])[:5])
+    scores = {}
+    for cheese_id, cheese in CHEESE_PRODUCTS.items():
+        rules = cheese['match_rules']
+        score = 2 * sum(1 for k in rules['type_keywords'] if any(k in t for t in types))
+        score += 1 if any(k in menu_text for k in rules['menu_keywords']) else 0
+        score += 1 if restaurant.get('price') in rules['price_levels'] else 0
+        if score:
+            scores[cheese_id] = score
+    return scores
+
+
+TYPE_POOL = [
+    'restaurant', 'food', 'french_restaurant', 'italian_restaurant', 'fine_dining_restaurant', 'bistro',
+    'seafood_restaurant', 'bar', 'pub', 'gastropub', 'american_restaurant', 'hamburger_restaurant',
+    'bar_and_grill', 'tavern', 'cafe', 'pizza_restaurant', 'barbecue_restaurant', 'mexican_restaurant',
+]
+WORD_POOL = [
+    'the', 'duck', 'was', 'great', 'scallops', 'lobster', 'tasting', 'menu', 'amuse-bouche', 'champagne',
+    'burgers', 'bacon', 'bbq', 'smoked', 'smokey', 'beer', 'wood-fired', 'charcuterie', 'salad', 'friendly',
+    'pasta', 'service', 'slow', 'cocktails', 'fries', 'brunch', 'barista',
+]
+
+
+def random_restaurants(count, seed=42):
+    rng = random.Random(seed)
+    restaurants = []
+    for i in range(count):
+        restaurants.append({
+            'name': f'Restaurant {i}',
+            'types': rng.sample(TYPE_POOL, rng.randint(0, 4)),
+            'price': rng.choice(['$', '$$', '$$$', '$$$$', 'N/A', None]),
+            'reviews': [
+                {'text': ' '.join(rng.choice(WORD_POOL) for _ in range(rng.randint(3, 15)))}
+                for _ in range(rng.randint(0, 7))
+            ],
+        })
+    return restaurants
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def scorer(request, monkeypatch):
+    """A scorer on the numpy path and on the pure-Python path"""
+    if request.param == 'numpy' and cheese_matching.np is None:
+        pytest.skip('numpy is not installed')
+    if request.param == 'python':
+        monkeypatch.setattr(cheese_matching, 'np', None)
+    return CheeseScorer()
+
+
+def test_scores_match_the_rules(scorer):
+    restaurants = random_restaurants(500)
+    assert scorer.score_batch(restaurants) == [rule_scores(r) for r in restaurants]
+
+
+def test_clear_winner_matches_the_rules(scorer):
+    restaurants = random_restaurants(500, seed=7)
+    for restaurant, match in zip(restaurants, scorer.match_batch(restaurants)):
+        scores = rule_scores(restaurant)
+        best = max(scores.values(), default=0)
+        leaders = [c for c, s in scores.items() if s == best]
+        if best == 0 or len(leaders) > 1:
+            assert match['confidence'] == 'low'
+            continue
+
+        (winner,) = leaders
+        assert match['primary_cheese'] == winner
+        assert match['confidence'] == ('high' if best >= HIGH_CONFIDENCE_SCORE else 'medium')
+        runners_up = [c for c in scores if c != winner]
+        assert match['secondary_cheese'] == (runners_up[0] if runners_up else None)
+
+
+def test_only_reviews_in_the_first_five_count(scorer):
+    reviews = [{'text': 'nice place'}] * 5 + [{'text': 'the lobster was great'}]
+    assert scorer.score_batch([{'types': [], 'reviews': reviews}]) == [{}]
+
+
+def test_match_output_shape(scorer):
+    match = scorer.match({'types': ['gastropub', 'bar'], 'price': '$$',
+                          'reviews': [{'text': 'Best burgers and beer in town'}]})
+    assert match['primary_cheese'] == 'smoky_alder'
+    assert match['confidence'] == 'high'
+    assert match['scores'] == {'pasture_bloom': 0, 'smoky_alder': 2 * 3 + 1 + 1}
+    assert match['top_cheeses'][0] == {'id': 'smoky_alder', 'score': 8}
+
+
+def test_nothing_matched_falls_back_to_the_default(scorer):
+    match = scorer.match({'types': ['restaurant'], 'reviews': []})
+    assert match['confidence'] == 'low'
+    assert match['primary_cheese'] == DEFAULT_CHEESE
+    assert match['secondary_cheese'] is not None
+
+
+def test_empty_batch(scorer):
+    assert scorer.score_batch([]) == []
+    assert scorer.match_batch([]) == []
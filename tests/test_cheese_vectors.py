@@ -0,0 +1,62 @@
+"""
+Tests for local TF-IDF cheese matching (numpy and pure-Python scoring)
+"""
+import pytest
+
+import cheese_vectors
+from cheese_vectors import CheeseVectorIndex, restaurant_profile, tokenize
+
+
+PUB = {'name': 'Oak Gastropub', 'types': ['gastropub', 'bar'],
+       'reviews': [{'text': 'Smoky burgers, craft beer and a great charcuterie board'}]}
+BISTRO = {'name': 'Le Petit Bistro', 'categories': ['catering.restaurant.french'],
+          'reviews': [{'text': 'French tasting menu, the seafood and wines were superb'}]}
+
+
+def test_tokenize_drops_stop_words_and_adds_bigrams():
+    assert tokenize('The burgers and the craft beers') == ['burger', 'craft', 'beer', 'burger craft', 'craft beer']
+    # Words under three letters go; three-letter words and 'ss' endings keep their 's'
+    assert tokenize('A bus of glass') == ['bus', 'glass', 'bus glass']
+
+
+def test_restaurant_profile_reads_google_and_geoapify_fields():
+    assert restaurant_profile(PUB) == 'Oak Gastropub gastropub bar Smoky burgers, craft beer and a great charcuterie board'
+    assert restaurant_profile(BISTRO).startswith('Le Petit Bistro catering restaurant french French tasting')
+    assert restaurant_profile({}) == ''
+
+
+def test_restaurants_match_the_cheese_written_for_them():
+    index = CheeseVectorIndex()
+    pub, bistro = index.match_restaurants([PUB, BISTRO], k=1)
+    assert pub[0][0] == 'smoky_alder'
+    assert bistro[0][0] == 'pasture_bloom'
+    assert 0 < pub[0][1] <= 1
+
+
+def test_top_k_is_best_first_and_skips_unrelated_cheeses():
+    index = CheeseVectorIndex()
+    (ranked,) = index.top_k([restaurant_profile(PUB)], k=5)
+    assert [score for _, score in ranked] == sorted((score for _, score in ranked), reverse=True)
+    assert len(ranked) <= len(index.cheese_ids)
+
+    assert index.top_k(['zzz qqq'], k=2) == [[]]
+    assert index.top_k([]) == []
+
+
+def test_pure_python_scoring_matches_numpy(monkeypatch):
+    pytest.importorskip('numpy')
+    texts = [restaurant_profile(PUB), restaurant_profile(BISTRO), 'wood fired pizza', '']
+    with_numpy = CheeseVectorIndex().similarities(texts)
+
+    monkeypatch.setattr(cheese_vectors, 'np', None)
+    without_numpy = CheeseVectorIndex().similarities(texts)
+
+    assert [set(row) for row in without_numpy] == [set(row) for row in with_numpy]
+    for fast, slow in zip(with_numpy, without_numpy):
+        assert fast == pytest.approx(slow, rel=1e-5)
+
+
+def test_index_over_a_subset_of_the_catalog():
+    index = CheeseVectorIndex(['pasture_bloom'], n_features=256)
+    (ranked,) = index.match_restaurants([BISTRO], k=2)
+    assert [cheese_id for cheese_id, _ in ranked] == ['pasture_bloom']
@@ -0,0 +1,167 @@
+"""
+Tests for circuit breaker state transitions and the guard() wrapper
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreakers, CircuitOpenError, is_failure
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time for the breaker module (perf_counter drives call latency)"""
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker, 'time', SimpleNamespace(monotonic=lambda: now[0], perf_counter=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def breakers(clock):
+    return CircuitBreakers(window_seconds=60, min_calls=4, failure_rate=0.5, slow_rate=0.8,
+                           open_seconds=30, slow_call_ms=1000)
+
+
+def call(breakers, status=200, seconds=0.1, clock=None, raises=None, operation='pitch'):
+    """One guarded call that returns `status` after `seconds`"""
+    with breakers.guard('anthropic', operation) as outcome:
+        if clock is not None:
+            clock[0] += seconds
+        if raises is not None:
+            raise raises
+        outcome.status = status
+
+
+def state(breakers, operation='pitch'):
+    return breakers.get('anthropic', operation).state
+
+
+def test_failure_statuses():
+    assert is_failure('error')
+    assert is_failure(503) and is_failure(429) and is_failure(529)
+    assert not is_failure(200)
+    assert not is_failure(400)  # Our own mistake, not the upstream's
+
+
+def test_stays_closed_below_min_calls(breakers):
+    for _ in range(3):
+        call(breakers, status=500)
+    assert state(breakers) == CLOSED
+
+
+def test_opens_on_failure_rate_and_rejects(breakers):
+    call(breakers, status=200)
+    call(breakers, status=200)
+    call(breakers, status=503)
+    assert state(breakers) == CLOSED
+    call(breakers, status=503)
+    assert state(breakers) == OPEN
+    assert breakers.is_open('anthropic', 'pitch')
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        call(breakers)
+    assert excinfo.value.retry_after == pytest.approx(30)
+    assert breakers.get('anthropic', 'pitch').rejected == 1
+
+
+def test_exceptions_count_as_failures(breakers):
+    for _ in range(4):
+        with pytest.raises(TimeoutError):
+            call(breakers, raises=TimeoutError())
+    assert state(breakers) == OPEN
+
+
+def test_opens_on_slow_calls(breakers, clock):
+    for _ in range(3):
+        call(breakers, seconds=1.5, clock=clock)
+    call(breakers, seconds=0.2, clock=clock)
+    assert state(breakers) == CLOSED  # 3/4 slow, below 80%
+    call(breakers, seconds=1.5, clock=clock)
+    assert state(breakers) == OPEN  # 4/5 slow
+
+
+def test_old_calls_leave_the_window(breakers, clock):
+    for _ in range(3):
+        call(breakers, status=500)
+    clock[0] += 61
+    call(breakers, status=500)
+    assert state(breakers) == CLOSED
+
+
+def open_breaker(breakers):
+    for _ in range(4):
+        call(breakers, status=500)
+    assert state(breakers) == OPEN
+
+
+def test_half_open_probe_success_closes(breakers, clock):
+    open_breaker(breakers)
+    clock[0] += 30
+    assert not breakers.is_open('anthropic', 'pitch')
+
+    call(breakers, status=200)
+    assert state(breakers) == CLOSED
+    # The failures from before are forgotten
+    call(breakers, status=500)
+    assert state(breakers) == CLOSED
+
+
+def test_half_open_probe_failure_reopens(breakers, clock):
+    open_breaker(breakers)
+    clock[0] += 30
+    call(breakers, status=503)
+    assert state(breakers) == OPEN
+    with pytest.raises(CircuitOpenError):
+        call(breakers)
+
+    clock[0] += 30
+    call(breakers, seconds=2.0, clock=clock)  # Slow probe counts as failed too
+    assert state(breakers) == OPEN
+
+
+def test_one_probe_at_a_time(breakers, clock):
+    open_breaker(breakers)
+    clock[0] += 30
+    breaker = breakers.get('anthropic', 'pitch')
+    breaker.acquire()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    # A probe that never reports back is replaced after open_seconds
+    clock[0] += 31
+    breaker.acquire()
+    breaker.record(failed=False, slow=False)
+    assert breaker.state == CLOSED
+
+
+def test_operations_have_separate_breakers(breakers):
+    open_breaker(breakers)
+    call(breakers, operation='classify_batch')
+    assert state(breakers, 'classify_batch') == CLOSED
+
+
+def test_disabled_breakers_never_reject(clock):
+    breakers = CircuitBreakers(enabled=False, min_calls=1)
+    for _ in range(10):
+        call(breakers, status=500)
+    assert not breakers.is_open('anthropic', 'pitch')
+    assert breakers.summary() == {'enabled': False, 'providers': {}}
+
+
+def test_summary(breakers, clock):
+    open_breaker(breakers)
+    clock[0] += 10
+    summary = breakers.summary()['providers']['anthropic']['pitch']
+    assert summary['state'] == OPEN
+    assert summary['window_calls'] == 4
+    assert summary['window_failures'] == 4
+    assert summary['times_opened'] == 1
+    assert summary['retry_in_seconds'] == 20.0
+
+
+def test_configure_resets_breakers(breakers):
+    open_breaker(breakers)
+    breakers.configure(min_calls=4)
+    assert state(breakers) == CLOSED
@@ -0,0 +1,143 @@
+"""
+Tests for the cost ledger: pricing, per-endpoint attribution and budgets
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import geoapify_client
+from cost_ledger import BudgetExceededError, CostLedger, anthropic_cost, end_request, start_request
+
+
+SONNET = 'claude-sonnet-4-5-20250929'
+
+
+@pytest.fixture
+def request_scope():
+    """Run the test body as if inside an API request to /api/pitch"""
+    token = start_request('/api/pitch')
+    yield
+    end_request(token)
+
+
+def test_anthropic_cost_per_million_tokens():
+    usage = {'input_tokens': 1_000_000, 'output_tokens': 100_000}
+    assert anthropic_cost(SONNET, usage) == pytest.approx(3.00 + 1.50)
+
+
+def test_anthropic_cost_counts_cache_tokens_and_batch_discount():
+    usage = {'cache_read_input_tokens': 1_000_000, 'cache_creation_input_tokens': 1_000_000}
+    assert anthropic_cost(SONNET, usage) == pytest.approx(0.30 + 3.75)
+    assert anthropic_cost(SONNET, usage, batch=True) == pytest.approx((0.30 + 3.75) / 2)
+
+
+def test_unknown_model_costs_nothing():
+    assert anthropic_cost('some-other-model', {'input_tokens': 10 ** 6}) == 0.0
+
+
+def test_unlimited_by_default():
+    ledger = CostLedger()
+    ledger.record('anthropic', SONNET, cost_usd=1000.0)
+    assert ledger.within_budget()
+    ledger.check_budget()
+
+
+def test_daily_budget(request_scope):
+    ledger = CostLedger(daily_budget_usd=1.0)
+    ledger.record('google_places', 'text_search:contact', cost_usd=0.6)
+    assert ledger.within_budget()
+
+    ledger.record('anthropic', SONNET, cost_usd=0.4)
+    assert ledger.spent_today() == pytest.approx(1.0)
+    assert not ledger.within_budget()
+    with pytest.raises(BudgetExceededError):
+        ledger.check_budget()
+
+
+def test_request_budget_applies_per_request():
+    ledger = CostLedger(request_budget_usd=0.05)
+
+    token = start_request('/api/pitch')
+    ledger.record('anthropic', SONNET, cost_usd=0.05)
+    assert ledger.spent_this_request() == pytest.approx(0.05)
+    assert not ledger.within_budget()
+    end_request(token)
+
+    # A new request starts from zero; outside a request there's no request cap
+    assert ledger.within_budget()
+    token = start_request('/api/pitch')
+    assert ledger.within_budget()
+    end_request(token)
+
+
+def test_spend_in_worker_threads_counts_for_the_request(request_scope):
+    ledger = CostLedger(request_budget_usd=0.1)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for _ in range(4):
+            executor.submit(contextvars.copy_context().run, ledger.record, 'google_places', 'nearby', cost_usd=0.025)
+
+    assert ledger.spent_this_request() == pytest.approx(0.1)
+    assert not ledger.within_budget()
+
+
+def test_configure_changes_caps():
+    ledger = CostLedger()
+    ledger.record('anthropic', SONNET, cost_usd=0.5)
+    ledger.configure(daily_budget_usd=0.25)
+    assert not ledger.within_budget()
+    ledger.configure(daily_budget_usd=None)
+    assert ledger.within_budget()
+
+
+def test_summary_aggregates_by_provider_endpoint_and_prompt(request_scope):
+    ledger = CostLedger(daily_budget_usd=10.0)
+    ledger.record('anthropic', SONNET, cost_usd=0.02, latency_ms=100, input_tokens=500, output_tokens=200,
+                  operation='pitch', prompt_version='v2')
+    ledger.record('anthropic', SONNET, cost_usd=0.04, latency_ms=300, input_tokens=700, output_tokens=100,
+                  operation='pitch', prompt_version='v2')
+    ledger.record('google_places', 'text_search:contact', cost_usd=0.035, latency_ms=50)
+
+    summary = ledger.summary()
+    (day,) = summary['by_day'].values()
+    assert day['total']['calls'] == 3
+    assert day['total']['cost_usd'] == pytest.approx(0.095)
+    assert day['by_provider']['anthropic']['input_tokens'] == 1200
+    assert day['by_provider']['anthropic']['avg_latency_ms'] == 200.0
+    assert summary['by_endpoint']['/api/pitch']['calls'] == 3
+    assert list(summary['by_prompt']) == ['pitch@v2']
+    assert summary['by_prompt']['pitch@v2']['calls'] == 2
+    assert summary['budgets']['spent_today_usd'] == pytest.approx(0.095)
+    assert summary['budgets']['within_budget'] is True
+    assert summary['recent_calls'][-1]['sku'] == 'text_search:contact'
+
+
+def test_calls_outside_a_request_are_background():
+    ledger = CostLedger()
+    ledger.record('geoapify', 'places', cost_usd=0.0)
+    assert list(ledger.summary()['by_endpoint']) == ['background']
+
+
+def test_llm_filter_keyword_filters_the_rest_once_the_budget_runs_out(monkeypatch):
+    def restaurant(name, category='catering.restaurant'):
+        return {'properties': {'name': name, 'categories': [category]}}
+
+    first_batch = [restaurant(f'Supper Club {i}') for i in range(20)]
+    rest = [restaurant('Le Bistro'), restaurant('Main Street Grill'), restaurant('Taco Town')]
+    calls = []
+
+    def call_anthropic(*args, **kwargs):
+        calls.append(kwargs['operation'])
+        if len(calls) > 1:
+            raise BudgetExceededError('request budget of $0.05 reached')
+        return SimpleNamespace(status_code=200, json=lambda: {'content': [{'text': 'KEEP\n' * 20}]})
+
+    monkeypatch.setattr(geoapify_client, 'call_anthropic', call_anthropic)
+    client = geoapify_client.GeoapifyClient('test-key', anthropic_api_key='test-key')
+    filtered = client.filter_results_with_llm({'features': first_batch + rest}, target_type='upscale')
+
+    # The rest gets the strict fine-dining keyword filter, not a blanket keep
+    names = [f['properties']['name'] for f in filtered['features']]
+    assert names == [f'Supper Club {i}' for i in range(20)] + ['Le Bistro']
+    assert calls == ['classify_batch', 'classify_batch']
@@ -0,0 +1,133 @@
+"""
+Tests for hedged Claude calls (requests.post stubbed, fake router latencies)
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import llm_client
+from circuit_breaker import CircuitBreakers
+from llm_client import HedgePolicy, call_anthropic
+
+
+class FakeRouter:
+    """Routes everything to one model with a fixed latency percentile"""
+
+    def __init__(self, percentile_ms):
+        self.percentile_ms = percentile_ms
+
+    def choose(self, operation):
+        return 'claude-test'
+
+    def route_for(self, operation):
+        return ('fast', 60_000)
+
+    def percentile(self, operation, model, pct):
+        return self.percentile_ms
+
+    def observe(self, operation, model, latency_ms, prompt_version=None):
+        pass
+
+
+class FakeAnthropic:
+    """requests.post stand-in answering the n-th call after `script[n]` = (seconds, status)"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        with self._lock:
+            attempt = self.calls
+            self.calls += 1
+        seconds, status = self.script[attempt]
+        time.sleep(seconds)
+        body = {'content': [{'text': f'attempt {attempt}'}], 'usage': {}}
+        return SimpleNamespace(status_code=status, json=lambda: body)
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    """A fresh, enabled hedge policy hedging after 50ms"""
+    policy = HedgePolicy(enabled=True, budget_ratio=1.0)
+    monkeypatch.setattr(llm_client, 'hedging', policy)
+    monkeypatch.setattr(llm_client, 'router', FakeRouter(percentile_ms=50))
+    monkeypatch.setattr(llm_client, 'breakers', CircuitBreakers(enabled=False))
+    return policy
+
+
+def stub_anthropic(monkeypatch, *script):
+    fake = FakeAnthropic(script)
+    monkeypatch.setattr(llm_client.requests, 'post', fake.post)
+    return fake
+
+
+def call(timeout=5.0):
+    return call_anthropic('test-key', 'Write a pitch', max_tokens=10, timeout=timeout, operation='pitch')
+
+
+def test_hedge_fires_after_the_delay_and_the_faster_response_wins(hedging, monkeypatch):
+    anthropic = stub_anthropic(monkeypatch, (1.0, 200), (0.0, 200))
+
+    start = time.monotonic()
+    response = call()
+    elapsed = time.monotonic() - start
+
+    assert response.json()['content'][0]['text'] == 'attempt 1'
+    assert 0.05 <= elapsed < 0.5
+    assert anthropic.calls == 2
+    assert hedging.summary()['hedged_calls'] == 1
+    assert hedging.summary()['hedge_wins'] == 1
+
+
+def test_fast_primary_is_not_hedged(hedging, monkeypatch):
+    anthropic = stub_anthropic(monkeypatch, (0.0, 200))
+    assert call().json()['content'][0]['text'] == 'attempt 0'
+    assert anthropic.calls == 1
+    assert hedging.summary()['hedged_calls'] == 0
+
+
+def test_budget_ratio_caps_hedges(hedging, monkeypatch):
+    hedging.configure(enabled=True, budget_ratio=0.5)
+    stub_anthropic(monkeypatch, *[(0.15, 200)] * 8)
+    for _ in range(4):
+        assert call().status_code == 200
+
+    summary = hedging.summary()
+    assert summary['eligible_calls'] == 4
+    assert summary['hedged_calls'] == 2
+
+
+def test_no_latency_history_means_no_hedge(hedging, monkeypatch):
+    monkeypatch.setattr(llm_client, 'router', FakeRouter(percentile_ms=None))
+    anthropic = stub_anthropic(monkeypatch, (0.1, 200))
+    assert call().status_code == 200
+    assert anthropic.calls == 1
+    assert hedging.summary()['eligible_calls'] == 0
+
+
+def test_timeout_is_a_deadline_for_the_whole_call(hedging, monkeypatch):
+    stub_anthropic(monkeypatch, (2.0, 200), (2.0, 200))
+
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        call(timeout=0.3)
+    assert time.monotonic() - start < 1.0
+
+
+def test_failed_primary_falls_back_to_the_hedge(hedging, monkeypatch):
+    # The primary fails after the hedge went out; the slower hedge still wins
+    stub_anthropic(monkeypatch, (0.15, 529), (0.3, 200))
+    response = call()
+    assert response.status_code == 200
+    assert response.json()['content'][0]['text'] == 'attempt 1'
+    assert hedging.summary()['hedge_wins'] == 1
+
+
+def test_both_failing_returns_the_primary_response(hedging, monkeypatch):
+    stub_anthropic(monkeypatch, (0.1, 529), (0.0, 500))
+    assert call().status_code == 529
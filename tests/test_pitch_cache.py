@@ -0,0 +1,159 @@
+"""
+Tests for the persona pre-render cache, and the micro-refinement cache
+with its undo / redo version chain
+"""
+import threading
+import time
+
+import pitch_cache
+from cost_ledger import CostLedger, current_endpoint
+from pitch_cache import MicroRefinementCache, PersonaVariantCache, text_hash
+
+
+ORIGINAL = "Hi Chef! Our Smoky Alder melts beautifully on your burgers and brings real alder smoke."
+SHORTER = "Hi Chef! Smoky Alder melts beautifully on burgers."
+CASUAL = "Hey! Smoky Alder on your burgers? Trust me."
+
+
+def test_text_hash_ignores_surrounding_whitespace():
+    assert text_hash(f"  {ORIGINAL}\n") == text_hash(ORIGINAL)
+    assert text_hash(ORIGINAL) != text_hash(SHORTER)
+
+
+def test_miss_before_anything_is_recorded():
+    cache = MicroRefinementCache()
+    assert cache.get(ORIGINAL, 'shorten', 'v1') is None
+    assert cache.version(text_hash(ORIGINAL)) is None
+
+
+def test_record_then_hit():
+    cache = MicroRefinementCache()
+    recorded = cache.record(ORIGINAL, 'shorten', 'v1', SHORTER)
+    assert recorded['refined_text'] == SHORTER
+    assert recorded['micro_type'] == 'shorten'
+    assert recorded['parent_hash'] == text_hash(ORIGINAL)
+    assert recorded['redo_hash'] is None
+
+    assert cache.get(ORIGINAL, 'shorten', 'v1') == recorded
+
+
+def test_cache_key_includes_tweak_and_prompt_version():
+    cache = MicroRefinementCache()
+    cache.record(ORIGINAL, 'shorten', 'v1', SHORTER)
+    assert cache.get(ORIGINAL, 'casual', 'v1') is None
+    assert cache.get(ORIGINAL, 'shorten', 'v2') is None
+
+
+def test_chain_runs_from_the_original_down():
+    cache = MicroRefinementCache()
+    cache.record(ORIGINAL, 'shorten', 'v1', SHORTER)
+    latest = cache.record(SHORTER, 'casual', 'v1', CASUAL)
+
+    assert latest['chain'] == [text_hash(ORIGINAL), text_hash(SHORTER), text_hash(CASUAL)]
+
+    # Undo: step to the parent, which points forward again for redo
+    previous = cache.version(latest['parent_hash'])
+    assert previous['refined_text'] == SHORTER
+    assert previous['redo_hash'] == text_hash(CASUAL)
+
+    root = cache.version(previous['parent_hash'])
+    assert root['refined_text'] == ORIGINAL
+    assert root['parent_hash'] is None
+    assert root['micro_type'] is None
+    assert root['chain'] == [text_hash(ORIGINAL)]
+    assert root['redo_hash'] == text_hash(SHORTER)
+
+
+def test_latest_branch_is_the_redo_target():
+    cache = MicroRefinementCache()
+    cache.record(ORIGINAL, 'shorten', 'v1', SHORTER)
+    cache.record(ORIGINAL, 'casual', 'v1', CASUAL)
+    assert cache.version(text_hash(ORIGINAL))['redo_hash'] == text_hash(CASUAL)
+
+    # Re-applying the first tweak (served from cache) makes it the redo target again
+    cache.get(ORIGINAL, 'shorten', 'v1')
+    assert cache.version(text_hash(ORIGINAL))['redo_hash'] == text_hash(SHORTER)
+
+
+def test_tweak_that_returns_an_earlier_version_does_not_loop():
+    cache = MicroRefinementCache()
+    cache.record(ORIGINAL, 'shorten', 'v1', SHORTER)
+    # 'formal' on the short version happens to give back the original text
+    back = cache.record(SHORTER, 'formal', 'v1', ORIGINAL)
+
+    # The original keeps its place as the root of the chain
+    assert back['parent_hash'] is None
+    assert back['chain'] == [text_hash(ORIGINAL)]
+    assert cache.get(SHORTER, 'formal', 'v1')['pitch_hash'] == text_hash(ORIGINAL)
+
+
+def test_chain_stops_at_an_evicted_version():
+    cache = MicroRefinementCache(maxsize=2)
+    cache.record(ORIGINAL, 'shorten', 'v1', SHORTER)
+    latest = cache.record(SHORTER, 'casual', 'v1', CASUAL)  # evicts the original's version entry
+
+    assert cache.version(text_hash(ORIGINAL)) is None
+    assert cache.version(latest['pitch_hash'])['chain'] == [text_hash(ORIGINAL), text_hash(SHORTER), text_hash(CASUAL)]
+
+
+class FakePitchGenerator:
+    """refine_pitch_for_persona stand-in; a persona in `failing` raises"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def refine_pitch_for_persona(self, original_pitch, restaurant_name, cheese_name, persona):
+        with self._lock:
+            self.calls.append((persona, current_endpoint()))
+        if persona in self.failing:
+            raise Exception('API error: 529')
+        return {'persona': persona, 'restaurant_name': restaurant_name, 'cheese_name': cheese_name,
+                'refined_text': f"{persona}: {original_pitch}"}
+
+
+def test_prerendered_variants_are_found_by_pitch_text():
+    cache = PersonaVariantCache(max_concurrency=2)
+    generator = FakePitchGenerator()
+    assert cache.prerender(generator, ORIGINAL, 'Oak Tavern', 'Smoky Alder', ['walking', 'chef']) == 2
+
+    chef = cache.lookup(f"{ORIGINAL}\n", 'chef').result(timeout=5)
+    assert chef['refined_text'] == f"chef: {ORIGINAL}"
+    assert cache.lookup(ORIGINAL, 'walking').result(timeout=5)['persona'] == 'walking'
+    assert cache.lookup(ORIGINAL, 'manager') is None
+    assert cache.lookup(SHORTER, 'chef') is None
+    # Background spend has its own ledger context
+    assert {endpoint for _, endpoint in generator.calls} == {'prerender:persona'}
+
+
+def test_cached_variants_are_not_rendered_again():
+    cache = PersonaVariantCache()
+    generator = FakePitchGenerator()
+    cache.prerender(generator, ORIGINAL, 'Oak Tavern', 'Smoky Alder', ['chef'])
+    cache.lookup(ORIGINAL, 'chef').result(timeout=5)
+
+    assert cache.prerender(generator, ORIGINAL, 'Oak Tavern', 'Smoky Alder', ['chef', 'manager']) == 1
+    cache.lookup(ORIGINAL, 'manager').result(timeout=5)
+    assert sorted(persona for persona, _ in generator.calls) == ['chef', 'manager']
+
+
+def test_failed_renders_are_dropped():
+    cache = PersonaVariantCache()
+    cache.prerender(FakePitchGenerator(failing={'gatekeeper'}), ORIGINAL, 'Oak Tavern', 'Smoky Alder',
+                    ['gatekeeper'])
+    # The done callback runs just after the failure is set: give it a moment
+    deadline = time.monotonic() + 5
+    while cache.lookup(ORIGINAL, 'gatekeeper') is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.lookup(ORIGINAL, 'gatekeeper') is None
+
+
+def test_nothing_is_prerendered_over_budget(monkeypatch):
+    ledger = CostLedger(daily_budget_usd=1.0)
+    ledger.record('anthropic', 'claude-sonnet-4-5-20250929', cost_usd=1.0)
+    monkeypatch.setattr(pitch_cache, 'ledger', ledger)
+    generator = FakePitchGenerator()
+
+    assert PersonaVariantCache().prerender(generator, ORIGINAL, 'Oak Tavern', 'Smoky Alder', ['chef']) == 0
+    assert generator.calls == []
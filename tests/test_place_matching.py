@@ -0,0 +1,164 @@
+"""
+Tests for Geoapify <-> Google entity resolution and area coverage planning
+"""
+import math
+import random
+
+import pytest
+
+from google_places_client import GooglePlacesClient
+from place_matching import match_places, name_similarity, normalize_name, plan_coverage
+from place_store import haversine_m
+
+
+def google_place(place_id, name, latitude, longitude):
+    return {'id': place_id, 'displayName': {'text': name}, 'location': {'latitude': latitude, 'longitude': longitude}}
+
+
+def test_normalize_name_drops_filler_and_punctuation():
+    assert normalize_name("The Oak & Barrel Kitchen") == 'oak barrel'
+    assert normalize_name("Luigi's") == 'luigis'
+    # Nothing but filler: keep it rather than return an empty name
+    assert normalize_name('The Kitchen') == 'the kitchen'
+
+
+def test_name_similarity():
+    assert name_similarity('Oceanique', 'Oceanique Restaurant & Bar') == 1.0
+    assert name_similarity('Oceanique', 'Oceanique Seafood Bistro') >= 0.9
+    assert name_similarity('Le Bistro', 'Oak Gastropub') < 0.5
+    assert name_similarity('', 'Anything') == 0.0
+
+
+def test_match_places_pairs_by_name_and_distance():
+    restaurants = [('Le Bistro', 42.0400, -87.6800), ('Oak Gastropub', 42.0410, -87.6810)]
+    places = [
+        google_place('G-oak', 'The Oak Gastropub', 42.0411, -87.6811),
+        google_place('G-bistro', 'Le Bistro Restaurant', 42.0401, -87.6801),
+    ]
+    matches = match_places(restaurants, places)
+    assert {i: p['id'] for i, p in matches.items()} == {0: 'G-bistro', 1: 'G-oak'}
+
+
+def test_match_places_rejects_far_or_dissimilar_places():
+    restaurants = [('Le Bistro', 42.04, -87.68), ('Oak Gastropub', 42.04, -87.68)]
+    places = [
+        google_place('G-far', 'Le Bistro', 42.05, -87.68),  # ~1.1 km away
+        google_place('G-other', 'Sushi Zen', 42.0401, -87.6801),
+    ]
+    assert match_places(restaurants, places) == {}
+
+
+def test_match_places_is_one_to_one():
+    # Two chains with the same name: each place goes to the closest restaurant
+    restaurants = [('Burger Barn', 42.0400, -87.6800), ('Burger Barn', 42.0408, -87.6800)]
+    places = [google_place('G1', 'Burger Barn', 42.0400, -87.6800)]
+    matches = match_places(restaurants, places)
+    assert list(matches) == [0]
+
+
+def test_match_places_with_nothing_to_match():
+    assert match_places([], [google_place('G1', 'X', 42, -87)]) == {}
+    assert match_places([('X', 42, -87)], []) == {}
+
+
+def random_prospects(count, spread_deg, seed=7):
+    rng = random.Random(seed)
+    return [
+        (f'Restaurant {i}', 42.04 + rng.uniform(-spread_deg, spread_deg), -87.68 + rng.uniform(-spread_deg, spread_deg))
+        for i in range(count)
+    ]
+
+
+def assert_covers(restaurants, circles):
+    covered = sorted(i for circle in circles for i in circle['indexes'])
+    assert covered == list(range(len(restaurants)))
+    for circle in circles:
+        for i in circle['indexes']:
+            _, latitude, longitude = restaurants[i]
+            assert haversine_m(circle['latitude'], circle['longitude'], latitude, longitude) <= circle['radius_m']
+
+
+def test_plan_coverage_empty():
+    assert plan_coverage([]) == []
+
+
+def test_small_cluster_is_one_circle():
+    restaurants = random_prospects(8, 0.003)
+    circles = plan_coverage(restaurants)
+    assert len(circles) == 1
+    assert_covers(restaurants, circles)
+
+
+@pytest.mark.parametrize('count', [11, 20, 45])
+def test_circles_stay_under_the_result_cap(count):
+    restaurants = random_prospects(count, 0.01)
+    circles = plan_coverage(restaurants, max_results=20, places_per_prospect=2.0)
+    assert_covers(restaurants, circles)
+    assert all(len(c['indexes']) * 2.0 <= 20 for c in circles)
+    # Median splits keep groups balanced: the circles needed, rounded up to a power of two
+    needed = math.ceil(count * 2.0 / 20)
+    assert len(circles) <= 2 ** math.ceil(math.log2(needed))
+
+
+def test_fewer_places_per_prospect_means_fewer_circles():
+    restaurants = random_prospects(30, 0.01)
+    dense = plan_coverage(restaurants, places_per_prospect=4.0)
+    sparse = plan_coverage(restaurants, places_per_prospect=1.0)
+    assert len(sparse) < len(dense)
+
+
+def test_spread_out_prospects_get_their_own_circles():
+    restaurants = [('A', 42.0, -87.0), ('B', 42.5, -87.0), ('C', 42.0, -88.0)]
+    circles = plan_coverage(restaurants, max_radius_m=2000)
+    assert len(circles) == 3
+    assert all(c['radius_m'] <= 2000 for c in circles)
+    assert_covers(restaurants, circles)
+
+
+def test_restaurants_at_one_spot_are_not_split_forever():
+    restaurants = [('Food Hall Stall', 42.04, -87.68)] * 30
+    circles = plan_coverage(restaurants)
+    assert len(circles) == 1
+    assert circles[0]['radius_m'] == 150.0
+
+
+@pytest.fixture
+def offline_client(monkeypatch):
+    """Places client whose Nearby and per-name searches are recorded, not sent"""
+    client = GooglePlacesClient('test-key')
+    client.nearby_calls = []
+    client.name_searches = []
+
+    def search_nearby(latitude, longitude, radius, tier='contact'):
+        client.nearby_calls.append((latitude, longitude, radius))
+        return [google_place(f'G{i}', name, lat, lon) for i, (name, lat, lon) in enumerate(client.world)
+                if haversine_m(latitude, longitude, lat, lon) <= radius]
+
+    def enrich_restaurants_bulk(items, max_concurrency=5, budget_usd=None, tier='contact'):
+        client.name_searches += [item[0] for item in items]
+        return {'results': [client._bulk_result(item, 'not_found', None) for item in items],
+                'summary': {'estimated_cost_usd': 0.035 * len(items)}}
+
+    monkeypatch.setattr(client, 'search_nearby', search_nearby)
+    monkeypatch.setattr(client, 'enrich_restaurants_bulk', enrich_restaurants_bulk)
+    return client
+
+
+def test_enrich_area_matches_a_cluster_with_few_calls(offline_client):
+    offline_client.world = [(f'Area Test Bistro {i}', lat, lon) for i, (_, lat, lon) in
+                            enumerate(random_prospects(20, 0.008, seed=11))]
+    result = offline_client.enrich_area(offline_client.world)
+
+    # 20 prospects at 2 places each fit in 2 circles, 4 at most
+    assert 2 <= len(offline_client.nearby_calls) <= 4
+    assert result['summary']['matched_in_area'] + result['summary']['fallback_searches'] == 20
+    assert result['summary']['matched_in_area'] >= 15
+
+
+def test_enrich_area_searches_by_name_when_circles_would_cost_more(offline_client):
+    offline_client.world = [('Area Test Tavern A', 42.0, -87.0), ('Area Test Tavern B', 42.5, -87.0)]
+    result = offline_client.enrich_area(offline_client.world)
+
+    assert offline_client.nearby_calls == []
+    assert offline_client.name_searches == ['Area Test Tavern A', 'Area Test Tavern B']
+    assert result['summary']['nearby_calls'] == 0
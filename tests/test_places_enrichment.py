@@ -0,0 +1,175 @@
+"""
+Tests for bulk Google Places enrichment: budget reservations, per-item
+statuses, cache hits, and the remembered place id -> Place Details path
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import google_places_client
+from google_places_client import DETAILS_COST, SEARCH_COST, GooglePlacesClient
+from place_store import PlaceStore, geoapify_source_key
+from ttl_cache import TTLCache
+
+
+def response(status_code, body=None):
+    return SimpleNamespace(status_code=status_code, json=lambda: body, text='')
+
+
+class FakeGoogle:
+    """Text Search and Place Details over a dict of {name: place}"""
+
+    def __init__(self, places):
+        self.places = {name: {'id': place_id, 'displayName': {'text': name},
+                              'location': {'latitude': 42.04, 'longitude': -87.68}}
+                       for name, place_id in places.items()}
+        self.searches = []
+        self.details = []
+        self.gone = set()
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.searches.append(json['textQuery'])
+        place = self.places.get(json['textQuery'])
+        return response(200, {'places': [dict(place)] if place else []})
+
+    def get(self, url, headers=None, timeout=None):
+        place_id = url.rsplit('/', 1)[-1]
+        self.details.append(place_id)
+        if place_id in self.gone:
+            return response(404)
+        place = next(p for p in self.places.values() if p['id'] == place_id)
+        return response(200, {**place, 'reviews': [{'text': {'text': 'Great burgers'}, 'rating': 5}]})
+
+
+@pytest.fixture
+def google(monkeypatch):
+    fake = FakeGoogle({f'Bistro {i}': f'G{i}' for i in range(6)})
+    monkeypatch.setattr(google_places_client, 'requests', fake)
+    # The caches are shared by every client instance
+    monkeypatch.setattr(GooglePlacesClient, '_place_cache', TTLCache(maxsize=100, ttl=None))
+    monkeypatch.setattr(GooglePlacesClient, '_reviews_cache', TTLCache(maxsize=100, ttl=None))
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    place_store = PlaceStore(str(tmp_path / 'places.db'))
+    yield place_store
+    place_store.close()
+
+
+def item(i):
+    return (f'Bistro {i}', 42.04, -87.68, f'geo-{i}')
+
+
+def source_key(i):
+    return geoapify_source_key(*item(i))
+
+
+def test_budget_cuts_off_the_rest(google):
+    client = GooglePlacesClient('test-key')
+    result = client.enrich_restaurants_bulk([item(i) for i in range(5)], max_concurrency=1,
+                                            budget_usd=SEARCH_COST['contact'] * 3)
+
+    assert [r['status'] for r in result['results']] == ['ok', 'ok', 'ok', 'skipped_budget', 'skipped_budget']
+    assert google.searches == ['Bistro 0', 'Bistro 1', 'Bistro 2']
+    assert result['summary']['skipped_budget'] == 2
+    assert result['summary']['estimated_cost_usd'] == pytest.approx(SEARCH_COST['contact'] * 3, abs=1e-3)
+
+
+def test_per_item_statuses(google, monkeypatch):
+    client = GooglePlacesClient('test-key')
+    enrich = client.enrich_restaurant_data
+
+    def failing_enrich(name, latitude, longitude, **kwargs):
+        if name == 'Bistro 2':
+            raise OSError('connection reset')
+        return enrich(name, latitude, longitude, **kwargs)
+
+    monkeypatch.setattr(client, 'enrich_restaurant_data', failing_enrich)
+    result = client.enrich_restaurants_bulk([item(0), ('Nowhere Diner', 42.0, -87.0), item(2)])
+
+    assert [r['status'] for r in result['results']] == ['ok', 'not_found', 'error']
+    assert result['results'][0]['data']['name'] == 'Bistro 0'
+    assert result['results'][2]['error'] == 'connection reset'
+    assert result['summary']['enriched'] == 1
+    assert result['summary']['not_found'] == 1
+    assert result['summary']['errors'] == 1
+
+
+def test_cache_hits_are_served_without_spending_the_budget(google):
+    client = GooglePlacesClient('test-key')
+    client.enrich_restaurants_bulk([item(0), item(1)])
+    google.searches.clear()
+
+    # Budget for a single search: the two cached restaurants still come back
+    result = client.enrich_restaurants_bulk([item(0), item(1), item(2), item(3)], max_concurrency=1,
+                                            budget_usd=SEARCH_COST['contact'])
+
+    assert [r['status'] for r in result['results']] == ['ok', 'ok', 'ok', 'skipped_budget']
+    assert google.searches == ['Bistro 2']
+    assert result['summary']['estimated_cost_usd'] == pytest.approx(SEARCH_COST['contact'], abs=1e-3)
+
+
+def test_known_place_ids_reserve_the_details_price(google, store):
+    for i in range(3):
+        store.set_google_place_id(source_key(i), f'G{i}')
+    client = GooglePlacesClient('test-key', place_store=store)
+
+    # Enough for two Place Details calls, not for two searches
+    result = client.enrich_restaurants_bulk([item(0), item(1), item(2)], max_concurrency=1,
+                                            budget_usd=DETAILS_COST['contact'] * 2)
+
+    assert [r['status'] for r in result['results']] == ['ok', 'ok', 'skipped_budget']
+    assert google.details == ['G0', 'G1'] and google.searches == []
+    assert result['summary']['estimated_cost_usd'] == pytest.approx(DETAILS_COST['contact'] * 2, abs=1e-3)
+
+
+def test_spend_is_settled_against_what_was_billed(google, store):
+    store.set_google_place_id(source_key(0), 'G0')
+    google.gone.add('G0')
+    client = GooglePlacesClient('test-key', place_store=store)
+
+    # The stale id costs a search on top of the (unbilled) 404
+    result = client.enrich_restaurants_bulk([item(0), ('Nowhere Diner', 42.0, -87.0)], max_concurrency=1)
+
+    assert [r['status'] for r in result['results']] == ['ok', 'not_found']
+    assert result['summary']['estimated_cost_usd'] == pytest.approx(SEARCH_COST['contact'] * 2, abs=1e-3)
+
+
+def test_remembered_id_goes_straight_to_place_details(google, store):
+    client = GooglePlacesClient('test-key', place_store=store)
+    client.enrich_restaurant_data('Bistro 0', 42.04, -87.68, tier='contact', geoapify_place_id='geo-0')
+    assert store.get_google_place_id(source_key(0)) == 'G0'
+
+    # A fresh process: nothing in memory, but the store remembers the id
+    GooglePlacesClient._place_cache.clear()
+    data = client.enrich_restaurant_data('Bistro 0', 42.04, -87.68, tier='contact', geoapify_place_id='geo-0')
+
+    assert data['place_id'] == 'G0'
+    assert google.searches == ['Bistro 0'] and google.details == ['G0']
+
+
+def test_gone_place_is_forgotten_and_searched_again(google, store):
+    store.set_google_place_id(source_key(1), 'G-retired')
+    google.gone.add('G-retired')
+    client = GooglePlacesClient('test-key', place_store=store)
+
+    data = client.enrich_restaurant_data('Bistro 1', 42.04, -87.68, tier='contact', geoapify_place_id='geo-1')
+
+    assert data['place_id'] == 'G1'
+    assert google.details == ['G-retired'] and google.searches == ['Bistro 1']
+    assert store.get_google_place_id(source_key(1)) == 'G1'
+
+
+def test_failed_details_call_keeps_the_mapping(google, store, monkeypatch):
+    store.set_google_place_id(source_key(1), 'G1')
+    monkeypatch.setattr(google, 'get', lambda url, **kwargs: response(503))
+    client = GooglePlacesClient('test-key', place_store=store)
+
+    data = client.enrich_restaurant_data('Bistro 1', 42.04, -87.68, tier='contact', geoapify_place_id='geo-1')
+
+    # Falls back to a search this time, but a 503 isn't proof the place is gone
+    assert data['place_id'] == 'G1'
+    assert google.searches == ['Bistro 1']
+    assert store.get_google_place_id(source_key(1)) == 'G1'
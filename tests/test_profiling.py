@@ -0,0 +1,116 @@
+"""
+Tests for the sampling CPU profiler exports and tracemalloc snapshot diffs
+"""
+import json
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from profiling import CPUProfile, MemorySnapshots, ProfilerBusyError, RequestProfiler, short_path
+
+
+HANDLER = ('pitch', 'api.py', 10)
+SCORE = ('score', 'cheese_matching.py', 120)
+FETCH = ('fetch', 'google_places_client.py', 300)
+
+
+def profile(stacks, interval=0.005):
+    """A CPUProfile over hand-written samples ({(thread, stack): count})"""
+    sampler = SimpleNamespace(interval=interval, duration=0.5, samples=sum(stacks.values()) + 3,
+                              idle_samples=3, stacks=Counter(stacks))
+    return CPUProfile(sampler, 'GET /api/pitch')
+
+
+STACKS = {
+    ('MainThread', (HANDLER, SCORE)): 5,
+    ('MainThread', (HANDLER,)): 1,
+    ('places;pool', (FETCH,)): 12,
+}
+
+
+def test_collapsed_stacks_are_heaviest_first():
+    assert profile(STACKS).collapsed() == (
+        'places,pool;fetch (google_places_client.py:300) 12\n'
+        'MainThread;pitch (api.py:10);score (cheese_matching.py:120) 5\n'
+        'MainThread;pitch (api.py:10) 1\n'
+    )
+
+
+def test_speedscope_profiles_per_thread_share_frames():
+    document = profile(STACKS).speedscope()
+
+    assert document['name'] == 'GET /api/pitch'
+    assert document['shared']['frames'] == [
+        {'name': 'pitch', 'file': 'api.py', 'line': 10},
+        {'name': 'score', 'file': 'cheese_matching.py', 'line': 120},
+        {'name': 'fetch', 'file': 'google_places_client.py', 'line': 300},
+    ]
+    places, main = document['profiles']
+    assert places['name'] == 'places;pool' and places['endValue'] == 60.0
+    assert main['samples'] == [[0, 1], [0]]
+    assert main['weights'] == [25.0, 5.0]
+    assert main['endValue'] == 30.0
+
+
+def test_render_formats():
+    body, media_type = profile(STACKS).render('speedscope')
+    assert media_type == 'application/json'
+    assert json.loads(body)['activeProfileIndex'] == 0
+    assert profile(STACKS).render('collapsed')[1].startswith('text/plain')
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profiler_samples_the_running_code():
+    profiler = RequestProfiler(interval_ms=1)
+    sampler = profiler.start()
+    with pytest.raises(ProfilerBusyError):
+        profiler.start()
+    busy_loop(0.2)
+    result = profiler.stop(sampler, label='test')
+
+    assert result.samples > 0
+    assert 'busy_loop (test_profiling.py:' in result.collapsed()
+    # Free for the next request
+    profiler.stop(profiler.start())
+
+
+def test_short_path():
+    assert short_path('/usr/lib/python3/site-packages/requests/api.py') == 'requests/api.py'
+    assert short_path('/somewhere/else/module.py') == 'module.py'
+
+
+@pytest.fixture
+def snapshots():
+    memory = MemorySnapshots(max_snapshots=3)
+    yield memory
+    memory.reset()
+
+
+def test_diff_shows_what_grew_between_snapshots(snapshots):
+    base = snapshots.take(limit=5)
+    assert base['tracing_started']
+
+    held = [bytearray(1024) for _ in range(2000)]  # ~2 MB from this line
+    diff = snapshots.diff(base['id'])
+
+    assert diff['base'] == base['id'] and diff['current'] == base['id'] + 1
+    assert diff['size_diff_kb'] > 1500
+    top = diff['top'][0]
+    assert top['location'].startswith('test_profiling.py:')
+    assert top['size_diff_kb'] > 1500 and top['count_diff'] >= 2000
+    del held
+
+
+def test_oldest_snapshots_are_dropped(snapshots):
+    ids = [snapshots.take(limit=0)['id'] for _ in range(4)]
+    assert [s['id'] for s in snapshots.status()['snapshots']] == ids[1:]
+    with pytest.raises(KeyError):
+        snapshots.diff(ids[0], ids[3])
+    assert snapshots.diff(ids[1], ids[3])['current'] == ids[3]
@@ -0,0 +1,59 @@
+"""
+Tests for the prompt registry: compiled templates and their content-hash versions
+"""
+import hashlib
+
+import pytest
+
+from place_store import PlaceStore
+from prompts import PROMPTS, PromptTemplate, get_prompt, prompt_versions, version_of
+
+
+def test_version_is_a_hash_of_the_template():
+    prompt = PromptTemplate('test', 'Pitch {cheese} to {restaurant}')
+    assert prompt.version == hashlib.sha256(b'Pitch {cheese} to {restaurant}').hexdigest()[:12]
+    assert prompt.fields == {'cheese', 'restaurant'}
+
+    # Same text, same version, whatever the name; any edit gives a new one
+    assert PromptTemplate('other', 'Pitch {cheese} to {restaurant}').version == prompt.version
+    assert PromptTemplate('test', 'Pitch {cheese} to {restaurant}!').version != prompt.version
+
+
+def test_render_fills_fields_and_keeps_literal_braces():
+    prompt = PromptTemplate('test', 'Hi {name}. Reply as JSON: {{"ok": true}}')
+    assert prompt.fields == {'name'}
+    assert prompt.render(name='Chef') == 'Hi Chef. Reply as JSON: {"ok": true}'
+
+
+def test_render_names_missing_fields():
+    prompt = PromptTemplate('test', '{a} {b} {c}')
+    with pytest.raises(KeyError, match='missing: a, c'):
+        prompt.render(b='x')
+
+
+@pytest.mark.parametrize('template', ['Pitch {} now', 'Pitch {0} now', 'Pitch {cheese.name}', 'Pitch {a[0]}'])
+def test_positional_and_attribute_fields_are_rejected(template):
+    with pytest.raises(ValueError, match='invalid field'):
+        PromptTemplate('test', template)
+
+
+def test_registry_lookups():
+    assert get_prompt('pitch') is PROMPTS['pitch']
+    assert version_of('refine:chef') == PROMPTS['refine:chef'].version
+    assert version_of('refine:sommelier') is None
+    with pytest.raises(KeyError):
+        get_prompt('refine:sommelier')
+
+    versions = prompt_versions()
+    assert list(versions) == sorted(PROMPTS)
+    assert versions['pitch'] == get_prompt('pitch').version
+
+
+def test_stored_pitches_from_another_version_are_ignored(tmp_path):
+    store = PlaceStore(str(tmp_path / 'places.db'))
+    pitch = {'cheese': {'id': 'smoky_alder'}, 'opening': 'Hi Chef!'}
+    store.save_pitch('G-pub', pitch, prompt_version='aaaaaaaaaaaa')
+
+    assert store.get_pitch('G-pub', 'smoky_alder', prompt_version='aaaaaaaaaaaa')['opening'] == 'Hi Chef!'
+    assert store.get_pitch('G-pub', 'smoky_alder', prompt_version='bbbbbbbbbbbb') is None
+    store.close()
@@ -0,0 +1,108 @@
+"""
+Tests for the /api/prospects field projection and columnar format
+"""
+import pytest
+from fastapi import HTTPException
+
+from api import (
+    PROSPECT_FIELDS, ColumnarProspectsResponse, ProjectedProspectsResponse, RestaurantProspect, app,
+    parse_prospect_fields, shape_prospects,
+)
+
+
+def make_prospect(name, distance_km, **overrides):
+    fields = {
+        'name': name,
+        'address': f'{name} St',
+        'distance_km': distance_km,
+        'rating': 4.5,
+        'latitude': 42.04,
+        'longitude': -87.68,
+        'recommended_cheese_id': 'smoky_alder',
+        'recommended_cheese_name': 'Smoky Alder',
+        'cheese_subtitle': 'Washed-rind',
+        'cheese_price': '$24-28/lb',
+        'match_confidence': 'high',
+    }
+    fields.update(overrides)
+    return RestaurantProspect(**fields)
+
+
+PROSPECTS = [
+    make_prospect('Oak Gastropub', 0.9),
+    make_prospect('Le Bistro', 0.5, rating=None, recommended_cheese_id='pasture_bloom'),
+]
+
+
+def test_no_projection_requested():
+    assert parse_prospect_fields(None) is None
+    assert parse_prospect_fields('') is None
+    assert parse_prospect_fields(' , ') is None
+
+
+def test_fields_keep_order_and_drop_duplicates():
+    assert parse_prospect_fields('name, distance_km,name,latitude') == ['name', 'distance_km', 'latitude']
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        parse_prospect_fields('name,menu')
+    assert excinfo.value.status_code == 400
+    assert 'menu' in excinfo.value.detail
+
+
+def test_objects_keep_only_requested_fields():
+    body = shape_prospects(PROSPECTS, ['name', 'distance_km'], 'objects')
+    assert body == {'prospects': [
+        {'name': 'Oak Gastropub', 'distance_km': 0.9},
+        {'name': 'Le Bistro', 'distance_km': 0.5},
+    ]}
+
+
+def test_objects_without_fields_have_every_field():
+    body = shape_prospects(PROSPECTS, None, 'objects')
+    assert [list(p) for p in body['prospects']] == [PROSPECT_FIELDS, PROSPECT_FIELDS]
+    assert body['prospects'][0] == PROSPECTS[0].model_dump()
+
+
+def test_columnar_has_one_array_per_field():
+    body = shape_prospects(PROSPECTS, ['name', 'rating', 'recommended_cheese_id'], 'columnar')
+    assert body == {
+        'format': 'columnar',
+        'fields': ['name', 'rating', 'recommended_cheese_id'],
+        'columns': {
+            'name': ['Oak Gastropub', 'Le Bistro'],
+            'rating': [4.5, None],
+            'recommended_cheese_id': ['smoky_alder', 'pasture_bloom'],
+        }
+    }
+
+
+def test_columnar_rows_line_up_with_objects():
+    columnar = shape_prospects(PROSPECTS, None, 'columnar')
+    objects = shape_prospects(PROSPECTS, None, 'objects')['prospects']
+    rows = [dict(zip(columnar['fields'], values)) for values in zip(*columnar['columns'].values())]
+    assert rows == objects
+
+
+def test_columnar_with_no_prospects():
+    body = shape_prospects([], ['name'], 'columnar')
+    assert body['columns'] == {'name': []}
+
+
+SEARCH = {'total': 2, 'search_center': {'lat': 42.04, 'lon': -87.68}, 'search_radius_km': 2.5}
+
+
+def test_shaped_bodies_match_their_documented_models():
+    projected = {**shape_prospects(PROSPECTS, ['name', 'distance_km'], 'objects'), **SEARCH}
+    assert ProjectedProspectsResponse.model_validate(projected).model_dump() == projected
+
+    columnar = {**shape_prospects(PROSPECTS, ['name', 'rating'], 'columnar'), **SEARCH}
+    assert ColumnarProspectsResponse.model_validate(columnar).model_dump() == columnar
+
+
+def test_openapi_documents_every_prospects_shape():
+    schema = app.openapi()['paths']['/api/prospects']['get']['responses']['200']['content']['application/json']
+    assert [ref['$ref'].rsplit('/', 1)[-1] for ref in schema['schema']['anyOf']] == [
+        'ProspectsResponse', 'ProjectedProspectsResponse', 'ColumnarProspectsResponse',
+    ]
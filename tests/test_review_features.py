@@ -0,0 +1,198 @@
+"""
+Tests for the single-pass review feature extractor
+
+The references below are the keyword scans the extractor replaced:
+substring matching for cuisine signals (name, types, the first five
+reviews joined) and menu hints, a longest-phrase-first whole-word regex
+(plural 's' / 'es' allowed) for dishes and pairing terms, and a word
+split for menu and filler words.
+"""
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from cheese_products import CHEESE_PRODUCTS
+from review_features import (
+    ASIAN_KEYWORDS, ASIAN_TYPES, DISH_LEXICON, FILLER_WORDS, FOOD_KEYWORDS, MENU_WORDS, ReviewFeatureExtractor,
+)
+
+
+def old_asian(restaurant):
+    name = restaurant.get('name', '').lower()
+    types = [t.lower() for t in restaurant.get('types', [])]
+    menu_text = ' '.join(r.get('text', '').lower() for r in restaurant.get('reviews', [])[:5])
+
+    reasons, score = [], 0
+    for asian_type in ASIAN_TYPES:
+        if any(asian_type in t for t in types):
+            reasons.append(f"Restaurant type: {asian_type}")
+            score += 10
+    for keyword in ASIAN_KEYWORDS['strong']:
+        if keyword in name:
+            reasons.append(f"Name contains: {keyword}")
+            score += 5
+            break
+    strong = [kw for kw in ASIAN_KEYWORDS['strong'] if kw in menu_text]
+    if len(strong) >= 3:
+        reasons.append(f"Menu mentions: {', '.join(strong[:3])}")
+        score += len(strong)
+    if len([kw for kw in ASIAN_KEYWORDS['moderate'] if kw in menu_text]) >= 2:
+        score += 1
+    return {'is_asian': score >= 5, 'confidence': 'high' if score >= 10 else 'medium' if score >= 5 else 'low',
+            'score': score, 'reasons': reasons}
+
+
+def old_menu_hints(reviews):
+    hints = []
+    for review in reviews:
+        text = review.get('text', '').lower()
+        for sentence in text.replace('!', '.').replace('?', '.').split('.'):
+            sentence = sentence.strip()
+            if any(food in sentence for food in FOOD_KEYWORDS) and 10 < len(sentence) < 150:
+                hints.append(sentence.capitalize())
+    return list(dict.fromkeys(hints))[:10]
+
+
+def phrase_pattern(terms):
+    return re.compile(r"\b(" + '|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True)) + r")(?:e?s)?\b")
+
+
+DISH_PATTERN = phrase_pattern(DISH_LEXICON)
+
+
+def old_dishes(reviews):
+    counts, first_seen = Counter(), {}
+    for review in reviews:
+        for match in DISH_PATTERN.finditer(review.get('text', '').lower()):
+            label, category = DISH_LEXICON[match.group(1)]
+            counts[(label, category)] += 1
+            first_seen.setdefault(label, len(first_seen))
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], first_seen[item[0][0]]))
+    return [(label, category, count) for (label, category), count in ranked]
+
+
+PAIRING_TERMS = set(DISH_LEXICON)
+for cheese in CHEESE_PRODUCTS.values():
+    PAIRING_TERMS.update(v.lower() for values in cheese['pairings'].values() for v in values)
+    PAIRING_TERMS.update(use.lower() for use in cheese['ideal_uses'])
+PAIRING_PATTERN = phrase_pattern(PAIRING_TERMS)
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD = re.compile(r"[a-z][a-z'-]*")
+
+
+def old_sentences(reviews):
+    sentences = []
+    for review in reviews:
+        for sentence in SENTENCE_SPLIT.split(review.get('text', '')):
+            if not sentence:
+                continue
+            lowered = sentence.lower()
+            words = WORD.findall(lowered)
+            sentences.append((sentence, len(PAIRING_PATTERN.findall(lowered)),
+                              sum(1 for w in words if w in MENU_WORDS),
+                              sum(1 for w in words if w in FILLER_WORDS)))
+    return sentences
+
+
+NAME_POOL = ['Oak', 'Tavern', 'Golden', 'Wok', 'Siam', 'Garden', 'Sushi', 'Bistro', 'Phoenix', 'House', 'Le',
+             'Petit', 'Grill', 'Barrel', 'Kitchen', 'Corner', 'Maison', 'Smoke', 'Harbor', 'Supper', 'Club']
+TYPE_POOL = ['restaurant', 'food', 'chinese_restaurant', 'thai_restaurant', 'asian_fusion_restaurant',
+             'french_restaurant', 'gastropub', 'bar', 'pub', 'bistro', 'seafood_restaurant',
+             'fine_dining_restaurant', 'american_restaurant', 'steak_house', 'wine_bar', 'bakery', 'cafe']
+# Cuisine keywords, some inside longer words ("phone", "sakes", "woks")
+CUISINE_POOL = [
+    'sushi', 'ramen', 'pho', 'phone', 'pad thai', 'dim sum', 'curry', 'tofu', 'dumplings', 'noodles', 'woks',
+    'bao', 'sake', 'sakes', 'edamame', 'wasabi', 'ginger', 'soy sauce', 'sesame', 'rice bowl', 'stir fry',
+]
+WORD_POOL = [
+    # Dishes and pairing terms, plurals and longer phrases
+    'mac and cheese', 'mac & cheese', 'grilled cheese', 'cheeseburgers', 'burger', 'burgers', 'fries', 'scallops',
+    'lobster', 'duck', 'short rib', 'short ribs', 'pulled pork', 'pork chop', 'figs', 'fig', 'tarts', 'tartare',
+    'charcuterie', 'cheese plates', 'brisket', 'pickles', 'ipa', 'stout', 'mushrooms', 'truffle', 'salads',
+    'soufflé', 'crepes', 'pizzas', 'bbq', 'bbq sauce', 'champagne',
+    # Menu and filler words
+    'menu', 'ordered', 'dishes', 'chef', 'delicious', 'house-made', 'crispy', 'wine', 'beer', 'steak', 'fish',
+    'service', 'staff', 'waited', 'parking', 'anniversary', 'friendly', 'recommend', 'loud',
+    # Plain words
+    'the', 'was', 'great', 'and', 'we', 'had', 'really', 'good', 'very', 'a', 'with', 'our', 'again',
+]
+ENDINGS = [' ', ' ', ' ', '. ', '! ', '? ', '.\n', '\n\n', ', ']
+
+
+def random_text(rng):
+    words = []
+    for _ in range(rng.randint(0, 40)):
+        words.append(rng.choice(CUISINE_POOL if rng.random() < 0.03 else WORD_POOL))
+        words.append(rng.choice(ENDINGS))
+    return ''.join(words).strip().capitalize()
+
+
+def random_restaurants(count, seed=44):
+    rng = random.Random(seed)
+    return [{
+        'name': ' '.join(rng.sample(NAME_POOL, rng.randint(1, 2))),
+        'types': rng.sample(TYPE_POOL, rng.randint(0, 2)),
+        'price': rng.choice(['$', '$$', '$$$', None]),
+        'reviews': [{'text': random_text(rng)} for _ in range(rng.randint(0, 7))],
+    } for _ in range(count)]
+
+
+@pytest.fixture
+def extractor():
+    return ReviewFeatureExtractor()
+
+
+def test_asian_detection_matches_the_old_scan(extractor):
+    for restaurant in random_restaurants(400):
+        assert extractor.extract(restaurant)['asian'] == old_asian(restaurant), restaurant
+
+
+def test_menu_hints_match_the_old_scan(extractor):
+    for restaurant in random_restaurants(400, seed=45):
+        assert extractor.extract(restaurant)['menu_hints'] == old_menu_hints(restaurant['reviews'])
+
+
+def test_dishes_match_the_old_regex(extractor):
+    for restaurant in random_restaurants(400, seed=46):
+        assert extractor.extract(restaurant)['dishes'] == old_dishes(restaurant['reviews'])
+
+
+def test_sentence_counts_match_the_old_scoring(extractor):
+    for restaurant in random_restaurants(400, seed=47):
+        assert extractor.extract(restaurant)['sentences'] == old_sentences(restaurant['reviews'])
+
+
+def test_keywords_match_inside_longer_words(extractor):
+    features = extractor.extract({'name': 'Siamese Phone Repair', 'types': ['thai_restaurant'],
+                                  'reviews': [{'text': 'Wokking great sakes'}]})
+    # Shorter keywords at the same position count too ('sake' in 'sakes')
+    assert {'siam', 'pho'} <= features['name_hits']
+    assert {'thai'} <= features['type_hits']
+    assert {'wok', 'sake'} <= features['menu_hits']
+
+
+def test_overlapping_keywords_all_count(extractor):
+    features = extractor.extract({'reviews': [{'text': 'The pad thai and the cheeseburger'}]})
+    assert {'pad thai', 'thai', 'cheeseburger', 'cheese', 'burger'} <= features['menu_hits']
+    # Dishes are whole words, longest phrase first: no separate 'burger' inside 'cheeseburger'
+    assert features['dishes'] == [('Burgers', 'sandwich', 1)]
+
+
+def test_only_the_first_five_reviews_feed_menu_hits(extractor):
+    reviews = [{'text': 'nice'}] * 5 + [{'text': 'sushi'}]
+    features = extractor.extract({'reviews': reviews})
+    assert 'sushi' not in features['menu_hits']
+
+
+def test_features_are_cached_by_content(extractor):
+    restaurant = {'name': 'Oak Tavern', 'types': ['pub'], 'reviews': [{'text': 'Great burgers.'}]}
+    assert extractor.extract(restaurant) is extractor.extract(dict(restaurant))
+    changed = {**restaurant, 'reviews': [{'text': 'Great fries.'}]}
+    assert extractor.extract(changed)['dishes'] == [('Fries', 'side', 1)]
+
+
+def test_batch_matches_one_by_one(extractor):
+    restaurants = random_restaurants(30, seed=48)
+    assert extractor.extract_batch(restaurants) == [ReviewFeatureExtractor().extract(r) for r in restaurants]
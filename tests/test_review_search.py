@@ -0,0 +1,100 @@
+"""
+Tests for local review search over the place store (FTS5 and the LIKE fallback)
+"""
+import pytest
+
+from place_store import PlaceStore, haversine_m, parse_search_terms
+
+CENTER = (42.0450, -87.6880)
+
+
+def place(place_id, name, latitude, longitude, *reviews):
+    return {'place_id': place_id, 'name': name, 'address': f'{name} address', 'latitude': latitude,
+            'longitude': longitude, 'types': ['restaurant'], 'price': '$$', 'rating': 4.5,
+            'reviews': [{'text': text, 'rating': 5, 'author': 'A'} for text in reviews]}
+
+
+@pytest.fixture(params=['fts', 'like'])
+def store(request, tmp_path):
+    """A store searched with FTS5, and the same store searched with LIKE"""
+    place_store = PlaceStore(str(tmp_path / 'places.db'))
+    if request.param == 'fts' and not place_store.has_fts:
+        pytest.skip('SQLite was built without FTS5')
+    place_store.has_fts = request.param == 'fts'
+
+    place_store.save_place(place('G-near', 'Oak Gastropub', 42.0455, -87.6880,
+                                 'The burgers are huge', 'Great charcuterie board', 'More burgers please',
+                                 'Burgers again', 'burgers burgers'))
+    place_store.save_place(place('G-mid', 'Le Bistro', 42.0500, -87.6880, 'Duck confit and a charcuterie plate'))
+    place_store.save_place(place('G-far', 'Far Tavern', 42.0650, -87.6880, 'Best burgers in the county'))
+    # Inside the bounding box of a 1 km search, but ~1.3 km away on the diagonal
+    place_store.save_place(place('G-corner', 'Corner Grill', 42.0450 + 0.0081, -87.6880 + 0.0109,
+                                 'Smash burgers'))
+    place_store.save_place(place('G-quiet', 'Quiet Cafe', 42.0451, -87.6881, 'Lovely espresso'))
+    yield place_store
+    place_store.close()
+
+
+def names(results):
+    return [r['name'] for r in results]
+
+
+def test_parse_search_terms():
+    assert parse_search_terms('Burgers or Charcuterie') == ['burgers', 'charcuterie']
+    assert parse_search_terms('burgers, charcuterie, burgers') == ['burgers', 'charcuterie']
+    assert parse_search_terms("fish-and-chips mention chef's") == ['fish-and-chips', "chef's"]
+    assert parse_search_terms('the and or') == []
+
+
+def test_any_term_matches_and_closest_come_first(store):
+    results = store.search_reviews('burgers or charcuterie', *CENTER, radius_m=1000)
+    assert names(results) == ['Oak Gastropub', 'Le Bistro']
+    assert results[0]['distance_km'] == pytest.approx(0.06, abs=0.01)
+    assert results[1]['place_id'] == 'G-mid' and results[1]['types'] == ['restaurant']
+
+
+def test_match_count_and_at_most_three_snippets(store):
+    (pub,) = store.search_reviews('burgers', *CENTER, radius_m=200)
+    assert pub['match_count'] == 4
+    assert len(pub['snippets']) == 3
+    assert all('burgers' in snippet.lower() for snippet in pub['snippets'])
+
+
+def test_radius_is_a_circle_not_the_bounding_box(store):
+    corner = store.search_reviews('smash', *CENTER, radius_m=1000)
+    assert corner == []
+    assert haversine_m(*CENTER, 42.0450 + 0.0081, -87.6880 + 0.0109) > 1000
+
+    wider = store.search_reviews('smash', *CENTER, radius_m=1500)
+    assert names(wider) == ['Corner Grill']
+
+
+def test_limit_and_far_places(store):
+    assert 'Far Tavern' not in names(store.search_reviews('burgers', *CENTER, radius_m=1000))
+    assert names(store.search_reviews('burgers', *CENTER, radius_m=3000, limit=2)) == ['Oak Gastropub', 'Corner Grill']
+
+
+def test_stemming_with_fts(store):
+    if not store.has_fts:
+        pytest.skip('LIKE matches substrings only')
+    assert names(store.search_reviews('burger', *CENTER, radius_m=200)) == ['Oak Gastropub']
+
+
+@pytest.mark.parametrize('query', [
+    '', 'the and or', 'burgers AND', 'NOT burgers', 'NEAR(burgers', '"burgers', 'burgers*', 'text:burgers',
+    "chef's", '%', '_', "'; DROP TABLE places; --",
+])
+def test_malformed_and_operator_queries_do_not_raise(store, query):
+    results = store.search_reviews(query, *CENTER, radius_m=200)
+    assert isinstance(results, list)
+    assert store.get_place('G-near') is not None
+
+
+def test_saving_a_place_again_replaces_its_reviews(store):
+    store.save_place(place('G-near', 'Oak Gastropub', 42.0455, -87.6880, 'Now serving fondue'))
+    assert store.search_reviews('burgers', *CENTER, radius_m=200) == []
+    assert names(store.search_reviews('fondue', *CENTER, radius_m=200)) == ['Oak Gastropub']
+
+    # Contact-level updates keep the reviews already indexed
+    store.save_place(place('G-near', 'Oak Gastropub', 42.0455, -87.6880), replace_reviews=False)
+    assert names(store.search_reviews('fondue', *CENTER, radius_m=200)) == ['Oak Gastropub']
@@ -0,0 +1,96 @@
+"""
+Tests for request-tagged structured logging and per-request DEBUG sampling
+"""
+import io
+import json
+import logging
+
+import pytest
+
+import structured_logging
+from cost_ledger import end_request, start_request
+from structured_logging import (
+    RequestContextFilter, bind_request_id, configure_logging, reset_request_id, shutdown_logging,
+)
+
+
+def record(level, msg='hello'):
+    return logging.LogRecord('test', level, __file__, 1, msg, None, None)
+
+
+def kept(log_filter, request_id, level=logging.DEBUG):
+    token = bind_request_id(request_id) if request_id else None
+    try:
+        return log_filter.filter(record(level))
+    finally:
+        if token:
+            reset_request_id(token)
+
+
+def test_records_are_tagged_with_the_request():
+    request = start_request('/api/pitch')
+    token = bind_request_id('req-1')
+    try:
+        entry = record(logging.INFO)
+        assert RequestContextFilter().filter(entry)
+    finally:
+        reset_request_id(token)
+        end_request(request)
+    assert entry.request_id == 'req-1'
+    assert entry.endpoint == '/api/pitch'
+
+    outside = record(logging.INFO)
+    RequestContextFilter().filter(outside)
+    assert outside.request_id is None and outside.endpoint == 'background'
+
+
+def test_debug_sampling_is_all_or_nothing_per_request():
+    log_filter = RequestContextFilter(debug_sample_rate=0.25)
+    request_ids = [f'req-{i}' for i in range(400)]
+    sampled = [rid for rid in request_ids if kept(log_filter, rid)]
+
+    # Roughly the configured share of requests...
+    assert 50 < len(sampled) < 150
+    # ...and the same decision for every record of a request
+    assert all(kept(log_filter, rid) for rid in sampled)
+    assert not any(kept(log_filter, rid) for rid in set(request_ids) - set(sampled))
+
+
+def test_info_and_above_are_never_sampled_out():
+    log_filter = RequestContextFilter(debug_sample_rate=0.0)
+    assert not kept(log_filter, 'req-1')
+    assert kept(log_filter, 'req-1', logging.INFO)
+    assert kept(log_filter, 'req-1', logging.WARNING)
+    # DEBUG outside any request is only kept when nothing is sampled
+    assert not kept(RequestContextFilter(0.5), None)
+    assert kept(RequestContextFilter(1.0), None)
+
+
+@pytest.fixture
+def log_stream():
+    root = logging.getLogger()
+    level = root.level
+    stream = io.StringIO()
+    yield stream
+    shutdown_logging()
+    for handler in list(root.handlers):
+        if isinstance(handler, structured_logging._DroppingQueueHandler):
+            root.removeHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_lines_carry_request_context_and_extra_fields(log_stream):
+    configure_logging(level='DEBUG', fmt='json', stream=log_stream)
+    token = bind_request_id('req-9')
+    try:
+        logging.getLogger('batch_pitches').info('Submitted batch %s', 'b1', extra={'batch_size': 2})
+    finally:
+        reset_request_id(token)
+    shutdown_logging()
+
+    (line,) = [json.loads(line) for line in log_stream.getvalue().splitlines()
+               if json.loads(line)['logger'] == 'batch_pitches']
+    assert line['msg'] == 'Submitted batch b1'
+    assert line['level'] == 'INFO'
+    assert line['request_id'] == 'req-9'
+    assert line['batch_size'] == 2
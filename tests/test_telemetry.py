@@ -0,0 +1,150 @@
+"""
+Tests for request spans, Server-Timing and the Prometheus rendering
+"""
+import contextvars
+import threading
+
+import pytest
+
+import telemetry
+from pitch_cache import PitchUpgrades
+from telemetry import MetricsRegistry, current_trace, detach_trace, end_trace, span, start_trace
+
+
+@pytest.fixture
+def trace():
+    """Collect spans as if inside a request"""
+    token = start_trace()
+    yield current_trace()
+    end_trace(token)
+
+
+def parse_samples(text):
+    """{sample line name+labels: value} for every non-comment line"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_empty_registry_renders_a_newline():
+    assert MetricsRegistry().render() == '\n'
+
+
+def test_counter_rendering():
+    registry = MetricsRegistry()
+    registry.describe('hpc_test_total', 'counter', 'Things that happened')
+    registry.inc('hpc_test_total', route='/api/pitch', status=200)
+    registry.inc('hpc_test_total', 2, status=200, route='/api/pitch')
+    registry.inc('hpc_test_total', 0.5, route='/a"b\\c\nd', status=500)
+
+    assert registry.render().splitlines() == [
+        '# HELP hpc_test_total Things that happened',
+        '# TYPE hpc_test_total counter',
+        'hpc_test_total{route="/a\\"b\\\\c\\nd",status="500"} 0.5',
+        'hpc_test_total{route="/api/pitch",status="200"} 3',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.describe('hpc_test_seconds', 'histogram', 'Test latency')
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        registry.observe('hpc_test_seconds', seconds, stage='search')
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# HELP hpc_test_seconds Test latency', '# TYPE hpc_test_seconds histogram']
+    samples = parse_samples(registry.render())
+    assert samples == {
+        'hpc_test_seconds_bucket{stage="search",le="0.1"}': 2,
+        'hpc_test_seconds_bucket{stage="search",le="1"}': 3,
+        'hpc_test_seconds_bucket{stage="search",le="+Inf"}': 4,
+        'hpc_test_seconds_sum{stage="search"}': pytest.approx(3.65),
+        'hpc_test_seconds_count{stage="search"}': 4,
+    }
+
+
+def test_metrics_without_help_or_labels():
+    registry = MetricsRegistry(buckets=(1.0,))
+    registry.inc('hpc_plain_total')
+    registry.observe('hpc_plain_seconds', 2.0)
+    assert registry.render().splitlines() == [
+        '# TYPE hpc_plain_seconds histogram',
+        'hpc_plain_seconds_bucket{le="1"} 0',
+        'hpc_plain_seconds_bucket{le="+Inf"} 1',
+        'hpc_plain_seconds_sum 2',
+        'hpc_plain_seconds_count 1',
+        '# TYPE hpc_plain_total counter',
+        'hpc_plain_total 1',
+    ]
+
+
+def test_spans_go_into_server_timing(trace):
+    with span('search'):
+        pass
+    with span('llm batch', description='batch "1"/2'):
+        pass
+
+    header = trace.server_timing(total_ms=12.34)
+    entries = header.split(', ')
+    assert entries[0].startswith('search;dur=')
+    assert entries[1].startswith('llm_batch;dur=') and entries[1].endswith(';desc="batch \'1\'/2"')
+    assert entries[2] == 'total;dur=12.3'
+
+
+def test_span_outside_a_request_only_feeds_metrics(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(telemetry, 'metrics', registry)
+    assert current_trace() is None
+    with span('match'):
+        pass
+    assert 'hpc_stage_duration_seconds_count{stage="match"} 1' in registry.render()
+
+
+def test_failed_span_is_counted_and_reraised(trace, monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(telemetry, 'metrics', registry)
+    with pytest.raises(ValueError):
+        with span('enrich'):
+            raise ValueError('boom')
+    assert 'hpc_stage_errors_total{stage="enrich"} 1' in registry.render()
+    assert trace.server_timing().startswith('enrich;dur=')
+
+
+def test_worker_threads_in_a_copied_context_add_to_the_trace(trace):
+    context = contextvars.copy_context()
+
+    def run():
+        with span('enrich'):
+            pass
+
+    worker = threading.Thread(target=context.run, args=(run,))
+    worker.start()
+    worker.join()
+    assert trace.server_timing().startswith('enrich;dur=')
+
+
+def test_detached_background_work_stays_out_of_the_trace(trace):
+    def background():
+        detach_trace()
+        with span('llm_pitch'):
+            pass
+        return current_trace()
+
+    assert contextvars.copy_context().run(background) is None
+    assert trace.server_timing() == ''
+    # The request itself still has its trace
+    assert current_trace() is trace
+
+
+def test_pitch_upgrades_run_without_the_request_trace(trace):
+    def generate():
+        with span('llm_pitch'):
+            pass
+        return {'trace': current_trace()}
+
+    _, future = PitchUpgrades(max_concurrency=1).submit(generate)
+    assert future.result(timeout=5) == {'trace': None}
+    assert trace.server_timing() == ''
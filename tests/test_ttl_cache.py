@@ -0,0 +1,89 @@
+"""
+Tests for the in-memory TTL / LRU cache
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import ttl_cache
+from ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_get_returns_default_when_missing():
+    cache = TTLCache()
+    assert cache.get('missing') is None
+    assert cache.get('missing', 'fallback') == 'fallback'
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = TTLCache(ttl=10)
+    cache.set('key', 'value')
+    clock[0] += 9.9
+    assert cache.get('key') == 'value'
+    clock[0] += 0.2
+    assert cache.get('key') is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TTLCache(ttl=10)
+    cache.set('short', 1, ttl=1)
+    cache.set('long', 2)
+    clock[0] += 5
+    assert 'short' not in cache
+    assert cache.get('long') == 2
+
+
+def test_no_ttl_never_expires(clock):
+    cache = TTLCache(ttl=None)
+    cache.set('key', 'value')
+    clock[0] += 10 ** 9
+    assert cache.get('key') == 'value'
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')  # 'b' is now the least recently used
+    cache.set('c', 3)
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache
+    assert len(cache) == 2
+
+
+def test_setting_again_replaces_value_and_refreshes_expiry(clock):
+    cache = TTLCache(ttl=10)
+    cache.set('key', 'old')
+    clock[0] += 8
+    cache.set('key', 'new')
+    clock[0] += 8
+    assert cache.get('key') == 'new'
+
+
+def test_falsy_values_are_cached():
+    cache = TTLCache()
+    cache.set('empty', [])
+    cache.set('none', None)
+    assert cache.get('empty', 'missing') == []
+    assert 'empty' in cache
+    # None can't be told apart from a miss by get(), but membership can
+    assert 'none' in cache
+
+
+def test_pop_and_clear():
+    cache = TTLCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'gone') == 'gone'
+    cache.clear()
+    assert len(cache) == 0